@@ -1,19 +1,30 @@
 import os
 import sys
-import subprocess
+import threading
+import uuid
 import pandas as pd
 import io
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional, List
 
+@asynccontextmanager
+async def lifespan(app):
+    # Navigateurs démarrés dès le lancement de l'API : la première demande n'attend pas leur démarrage
+    scraper.pool_partage().prechauffer()
+    yield
+    scraper.pool_partage().fermer()
+
 app = FastAPI(
     title="Plouf Prospect API",
     description="API de scraping et d'enrichissement de prospects",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS enabled for React frontend
@@ -37,93 +48,137 @@ SCRAPPING_DIR = os.path.join(ROOT_DIR, "scrapping")
 if SCRAPPING_DIR not in sys.path:
     sys.path.append(SCRAPPING_DIR)
 
-# Chemins des fichiers dans le dossier scrapping
-MOTS_CLES_CSV = os.path.join(SCRAPPING_DIR, "mots_cles.csv")
-RESULTATS_DIR_RAW = os.path.join(SCRAPPING_DIR, "resultats")
-RESULTATS_DIR_ENRICHED = os.path.join(SCRAPPING_DIR, "resultats_enrichis")
-RESULTATS_DIR_DIRIGEANTS = os.path.join(SCRAPPING_DIR, "resultats_dirigeants")
+import consolidation_prospects
+import pipeline
+import scraper
+from workspace import Workspace, WORKSPACES_DIR
 
+# Base consolidée partagée (historique complet, alimentée par chaque job)
 RESULTATS_DIR_CONSOLIDATED = os.path.join(SCRAPPING_DIR, "resultats_consolides")
-
-FICHIER_RAW = os.path.join(RESULTATS_DIR_RAW, "resultats_complets.csv")
-FICHIER_ENRICHI = os.path.join(RESULTATS_DIR_ENRICHED, "resultats_enrichis_complets.csv")
-FICHIER_DIRIGEANTS = os.path.join(RESULTATS_DIR_DIRIGEANTS, "resultats_dirigeants.csv")
-FICHIER_GMB = os.path.join(RESULTATS_DIR_DIRIGEANTS, "resultats_dirigeants_enrichis_gmb.csv")
-FICHIER_WHOIS = os.path.join(RESULTATS_DIR_DIRIGEANTS, "resultats_finaux_complets.csv")
 FICHIER_CONSOLIDE = os.path.join(RESULTATS_DIR_CONSOLIDATED, "base_prospects_finale.csv")
 
 # Ensure directories exist
-for d in [RESULTATS_DIR_RAW, RESULTATS_DIR_ENRICHED, RESULTATS_DIR_DIRIGEANTS, RESULTATS_DIR_CONSOLIDATED]:
+for d in [RESULTATS_DIR_CONSOLIDATED, WORKSPACES_DIR]:
     os.makedirs(d, exist_ok=True)
 
+# La base partagée est le seul fichier commun à tous les jobs
+BASE_CONSOLIDEE_LOCK = threading.Lock()
+
+# --- CONFIGURATION DES JOBS ---
+# Nombre de pipelines exécutés en parallèle (chacun dans son propre workspace)
+MAX_JOBS_PARALLELES = int(os.environ.get("PLOUF_MAX_JOBS", "2"))
+# Nombre de jobs terminés conservés en mémoire (les plus anciens sont oubliés)
+MAX_JOBS_CONSERVES = int(os.environ.get("PLOUF_MAX_JOBS_CONSERVES", "200"))
+
+STATUT_EN_ATTENTE = "en_attente"
+STATUT_EN_COURS = "en_cours"
+STATUT_TERMINE = "termine"
+STATUT_ERREUR = "erreur"
+
 class ProcessRequest(BaseModel):
     keyword: str
     zipcode: str
     max_fiches: Optional[int] = 5
 
-def run_workflow(queries: List[str], max_fiches: int = 5):
+def run_workflow(queries: List[str], max_fiches: int = 5, workspace: Optional[Workspace] = None):
     """
     Exécute le workflow complet : Scraping -> Web -> Dirigeants -> GMB -> Whois -> Consolidation
+    Les étapes tournent dans ce processus (pipeline.py) ; le résultat du job est écrit dans son workspace.
     """
-    # 1. Sauvegarder les mots-clés
-    df_queries = pd.DataFrame({"mot_cle": queries})
-    df_queries.to_csv(MOTS_CLES_CSV, index=False)
-    
-    # 2. Nettoyer les anciens fichiers intermédiaires (Garder le consolidé !)
-    for f in [FICHIER_RAW, FICHIER_ENRICHI, FICHIER_DIRIGEANTS, FICHIER_GMB, FICHIER_WHOIS]:
-        if os.path.exists(f):
-            try:
-                os.remove(f)
-            except:
-                pass
-    
-    # 3. Lancer le Scraping (+ Enrichissement sites web)
-    try:
-        print(f"DEBUG: Démarrage du scraping dans {SCRAPPING_DIR}...")
-        subprocess.run([sys.executable, os.path.join(SCRAPPING_DIR, "scraper.py"), str(max_fiches)], 
-                       cwd=SCRAPPING_DIR, check=True)
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Erreur durant le scraping: {str(e)}")
-    
-    # 4. Lancer la recherche de dirigeants
-    try:
-        print("DEBUG: Recherche des dirigeants...")
-        # Import dynamique du module dans le dossier scrapping
-        import recherche_dirigeants
-        # On force le rechargement si nécessaire ou on s'assure que le path est bon
-        success = recherche_dirigeants.process_file(FICHIER_ENRICHI, FICHIER_DIRIGEANTS)
-        if not success:
-            raise Exception("La recherche de dirigeants a échoué")
-    except Exception as e:
-        raise Exception(f"Erreur durant la recherche de dirigeants: {str(e)}")
+    workspace = (workspace or Workspace()).creer()
 
-    # 5. Lancer l'enrichissement GMB
     try:
-        print("DEBUG: Enrichissement GMB...")
-        subprocess.run([sys.executable, os.path.join(SCRAPPING_DIR, "enrichisseur_gmb.py")], 
-                       cwd=SCRAPPING_DIR, check=True)
+        prospects = pipeline.executer_pipeline(queries, max_fiches, workspace)
     except Exception as e:
-        print(f"⚠️ Alerte: L'enrichissement GMB a échoué. Erreur: {e}")
+        raise Exception(f"Erreur durant le pipeline: {str(e)}")
 
-    # 6. Lancer l'enrichissement Whois
-    try:
-        print("DEBUG: Enrichissement Whois...")
-        subprocess.run([sys.executable, os.path.join(SCRAPPING_DIR, "enrichisseur_whois.py")], 
-                       cwd=SCRAPPING_DIR, check=True)
-    except Exception as e:
-        print(f"⚠️ Alerte: L'enrichissement Whois a échoué. Erreur: {e}")
+    # Alimenter la base consolidée partagée (utilisée par /results)
+    with BASE_CONSOLIDEE_LOCK:
+        consolidation_prospects.ajouter_prospects(prospects, FICHIER_CONSOLIDE)
+    return workspace
 
-    # 7. Lancer la consolidation finale
-    try:
-        print("DEBUG: Consolidation finale...")
-        subprocess.run([sys.executable, os.path.join(SCRAPPING_DIR, "consolidation_prospects.py")], 
-                       cwd=SCRAPPING_DIR, check=True)
-    except Exception as e:
-        print(f"⚠️ Alerte: La consolidation a échoué. Erreur: {e}")
+class JobManager:
+    """
+    File de jobs en mémoire : chaque soumission reçoit un identifiant immédiatement,
+    le pipeline est exécuté par un pool de workers borné (hors de la boucle asyncio).
+    """
+
+    def __init__(self, max_workers=1, max_conserves=200):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="plouf-job")
+        self.max_conserves = max_conserves
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def soumettre(self, queries, max_fiches, nom_fichier):
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "statut": STATUT_EN_ATTENTE,
+            "nb_requetes": len(queries),
+            "max_fiches": max_fiches,
+            "nom_fichier": nom_fichier,
+            "fichier_resultat": None,
+            "erreur": None,
+            "cree_le": datetime.now().isoformat(),
+            "demarre_le": None,
+            "termine_le": None,
+        }
+        with self.lock:
+            self.jobs[job_id] = job
+            self._purger()
+        self.executor.submit(self._executer, job_id, queries, max_fiches)
+        return self.obtenir(job_id)
+
+    def obtenir(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def en_cours(self):
+        with self.lock:
+            return sum(1 for j in self.jobs.values() if j["statut"] in (STATUT_EN_ATTENTE, STATUT_EN_COURS))
+
+    def _maj(self, job_id, **champs):
+        with self.lock:
+            if job_id in self.jobs:
+                self.jobs[job_id].update(champs)
+
+    def _purger(self):
+        """Oublie les jobs terminés les plus anciens au-delà de max_conserves."""
+        termines = [j for j in self.jobs.values() if j["statut"] in (STATUT_TERMINE, STATUT_ERREUR)]
+        for job in termines[:max(0, len(termines) - self.max_conserves)]:
+            self.jobs.pop(job["id"], None)
+            Workspace(job["id"]).supprimer()
+
+    def _executer(self, job_id, queries, max_fiches):
+        self._maj(job_id, statut=STATUT_EN_COURS, demarre_le=datetime.now().isoformat())
+        try:
+            workspace = run_workflow(queries, max_fiches, Workspace(job_id))
+
+            fichier_job = workspace.fichier_consolide
+            if not os.path.exists(fichier_job):
+                raise Exception("Aucun fichier de résultat n'a été généré.")
+
+            self._maj(job_id, statut=STATUT_TERMINE, fichier_resultat=fichier_job,
+                      termine_le=datetime.now().isoformat())
+        except Exception as e:
+            print(f"⚠️ Job {job_id} en erreur : {e}")
+            self._maj(job_id, statut=STATUT_ERREUR, erreur=str(e), termine_le=datetime.now().isoformat())
+
+jobs = JobManager(max_workers=MAX_JOBS_PARALLELES, max_conserves=MAX_JOBS_CONSERVES)
+
+def reponse_job(job, status_code=200):
+    job = {k: v for k, v in job.items() if k != "fichier_resultat"}
+    job["url_statut"] = f"/jobs/{job['id']}"
+    job["url_resultat"] = f"/jobs/{job['id']}/result"
+    return JSONResponse(status_code=status_code, content=job)
 
 @app.get("/health")
 def health():
-    return {"status": "ok", "timestamp": datetime.now().isoformat()}
+    return {"status": "ok", "timestamp": datetime.now().isoformat(), "jobs_en_cours": jobs.en_cours(),
+            "navigateurs": scraper.pool_partage().statistiques(),
+            "demarrage_navigateurs": scraper.navigateur.STATS_DEMARRAGE.resume(),
+            "memoire_navigateurs": scraper.pool_partage().surveillance.metriques()}
 
 @app.get("/results")
 def get_results():
@@ -132,13 +187,6 @@ def get_results():
     """
     final_file = FICHIER_CONSOLIDE
     
-    if not os.path.exists(final_file):
-        # Fallback si pas de fichier consolidé, on essaie le fichier intermédiaire le plus avancé
-        for f in [FICHIER_WHOIS, FICHIER_GMB, FICHIER_DIRIGEANTS]:
-             if os.path.exists(f):
-                 final_file = f
-                 break
-    
     if not os.path.exists(final_file):
         print(f"DEBUG: No final file found.")
         return []
@@ -155,25 +203,13 @@ def get_results():
         print(f"DEBUG: Error reading CSV: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/process")
+@app.post("/process", status_code=202)
 async def process_single(request: ProcessRequest):
     query = f"{request.keyword} {request.zipcode} FR"
-    try:
-        run_workflow([query], request.max_fiches)
-        
-        if os.path.exists(FICHIER_CONSOLIDE):
-            return FileResponse(
-                path=FICHIER_CONSOLIDE, 
-                filename=f"prospects_{request.zipcode}.csv",
-                media_type="text/csv"
-            )
-        else:
-            raise HTTPException(status_code=500, detail="Aucun fichier de résultat consolidé n'a été généré.")
-            
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    job = jobs.soumettre([query], request.max_fiches, f"prospects_{request.zipcode}.csv")
+    return reponse_job(job, status_code=202)
 
-@app.post("/process_csv")
+@app.post("/process_csv", status_code=202)
 async def process_batch(
     file: UploadFile = File(...), 
     max_fiches: int = Form(5)
@@ -197,25 +233,42 @@ async def process_batch(
         
         queries = (df_upload[col_soc] + " " + df_upload[col_code] + " FR").tolist()
         
-        run_workflow(queries, max_fiches)
-        
-        final_file = FICHIER_CONSOLIDE
-        if not os.path.exists(final_file):
-             # Fallback
-             final_file = FICHIER_GMB if os.path.exists(FICHIER_GMB) else FICHIER_DIRIGEANTS
-        
-        if os.path.exists(final_file):
-            return FileResponse(
-                path=final_file, 
-                filename="prospects_batch.csv",
-                media_type="text/csv"
-            )
-        else:
-            raise HTTPException(status_code=500, detail="Fichier non généré.")
-            
+        if not queries:
+            raise HTTPException(status_code=400, detail="Aucune ligne exploitable dans le fichier.")
+
+        job = jobs.soumettre(queries, max_fiches, "prospects_batch.csv")
+        return reponse_job(job, status_code=202)
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors du traitement : {str(e)}")
 
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = jobs.obtenir(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job introuvable.")
+    return reponse_job(job)
+
+@app.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    job = jobs.obtenir(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job introuvable.")
+    if job["statut"] == STATUT_ERREUR:
+        raise HTTPException(status_code=500, detail=job["erreur"] or "Le job a échoué.")
+    if job["statut"] != STATUT_TERMINE:
+        raise HTTPException(status_code=409, detail=f"Job non terminé (statut : {job['statut']}).")
+    if not job["fichier_resultat"] or not os.path.exists(job["fichier_resultat"]):
+        raise HTTPException(status_code=410, detail="Le fichier de résultat n'est plus disponible.")
+
+    return FileResponse(
+        path=job["fichier_resultat"],
+        filename=job["nom_fichier"],
+        media_type="text/csv"
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
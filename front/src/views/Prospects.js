@@ -16,6 +16,9 @@ import {
 } from "reactstrap";
 
 const API_URL = "http://localhost:8000";
+const JOB_POLL_INTERVAL_MS = 3000;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
 
 function Prospects() {
     const [results, setResults] = useState([]);
@@ -40,17 +43,28 @@ function Prospects() {
         }
     };
 
+    // Le traitement est asynchrone côté API : on interroge le job jusqu'à sa fin
+    const waitForJob = async (jobId) => {
+        while (true) {
+            const { data: job } = await axios.get(`${API_URL}/jobs/${jobId}`);
+            if (job.statut === "termine") return job;
+            if (job.statut === "erreur") throw new Error(job.erreur);
+            await sleep(JOB_POLL_INTERVAL_MS);
+        }
+    };
+
     const handleProcess = async (e) => {
         e.preventDefault();
         if (!searchTerm || !zipCode) return;
 
         setIsProcessing(true);
         try {
-            await axios.post(`${API_URL}/process`, {
+            const { data: job } = await axios.post(`${API_URL}/process`, {
                 keyword: searchTerm,
                 zipcode: zipCode,
                 max_fiches: 20,
             });
+            await waitForJob(job.id);
             fetchResults();
         } catch (error) {
             console.error("Erreur lors du traitement:", error);
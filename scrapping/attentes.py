@@ -0,0 +1,115 @@
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# === ATTENTES CONDITIONNELLES (SELENIUM) ===
+# Remplace les time.sleep fixes : on attend qu'une condition soit remplie,
+# avec une durée maximale, et on mesure le temps réellement passé à attendre.
+
+# Fréquence de vérification des conditions (secondes)
+INTERVALLE = 0.1
+
+# Liens vers les fiches Google Maps
+SELECTEUR_FICHES = "a[href*='/maps/place/']"
+
+class StatistiquesAttente:
+    """Temps cumulé, nombre d'attentes et dépassements par type d'attente. Thread-safe."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.donnees = {}
+
+    def enregistrer(self, nom, duree, depassement):
+        with self.lock:
+            total, nombre, depassements = self.donnees.get(nom, (0.0, 0, 0))
+            self.donnees[nom] = (total + duree, nombre + 1, depassements + (1 if depassement else 0))
+
+    def resume(self):
+        with self.lock:
+            if not self.donnees:
+                return "aucune attente"
+            return " | ".join(
+                f"{nom} : {total:.1f}s / {nombre} (moy. {total / nombre:.2f}s, {depassements} max atteint)"
+                for nom, (total, nombre, depassements) in sorted(self.donnees.items())
+            )
+
+    def reinitialiser(self):
+        with self.lock:
+            self.donnees = {}
+
+STATS = StatistiquesAttente()
+
+def attendre(driver, nom, condition, maximum):
+    """
+    Attend que condition(driver) soit vraie, au plus `maximum` secondes.
+    Retourne la valeur de la condition, ou None si la durée maximale est atteinte.
+    """
+    debut = time.monotonic()
+    try:
+        resultat = WebDriverWait(driver, maximum, poll_frequency=INTERVALLE).until(condition)
+        STATS.enregistrer(nom, time.monotonic() - debut, False)
+        return resultat
+    except TimeoutException:
+        STATS.enregistrer(nom, time.monotonic() - debut, True)
+        return None
+
+def _script(driver, script, *args):
+    try:
+        return driver.execute_script(script, *args)
+    except Exception:
+        return None
+
+# --- Conditions ---
+
+def resultats_prets(driver):
+    """Page de recherche exploitable : liste de résultats, fiche unique (h1) ou page de consentement."""
+    return _script(driver, """
+        return document.readyState === 'complete' && !!(
+            document.querySelector("div[role='feed']") ||
+            document.querySelector(arguments[0]) ||
+            document.querySelector('h1') ||
+            location.href.indexOf('consent') !== -1
+        );
+    """, SELECTEUR_FICHES)
+
+def nombre_fiches(driver):
+    return _script(driver, "return document.querySelectorAll(arguments[0]).length;", SELECTEUR_FICHES) or 0
+
+def nouvelles_fiches(nombre_avant):
+    """Plus de fiches chargées qu'avant le scroll (ou fin de liste affichée)."""
+    def condition(driver):
+        return _script(driver, """
+            return document.querySelectorAll(arguments[0]).length > arguments[1] ||
+                   !!document.querySelector("div[role='feed'] span.HlvSq");
+        """, SELECTEUR_FICHES, nombre_avant)
+    return condition
+
+def fiche_prete(driver):
+    """Panneau de fiche affiché : titre h1 non vide."""
+    return _script(driver, """
+        var h1 = document.querySelector('h1');
+        return !!(h1 && h1.textContent.trim());
+    """)
+
+def consentement_passe(driver):
+    """La page de consentement a été quittée (ou le bouton a disparu)."""
+    try:
+        return "consent" not in driver.current_url
+    except Exception:
+        return False
+
+# --- Raccourcis ---
+
+def attendre_resultats(driver, maximum):
+    return attendre(driver, "résultats", resultats_prets, maximum)
+
+def attendre_nouvelles_fiches(driver, nombre_avant, maximum):
+    return attendre(driver, "scroll", nouvelles_fiches(nombre_avant), maximum)
+
+def attendre_fiche(driver, maximum):
+    return attendre(driver, "fiche", fiche_prete, maximum)
+
+def attendre_consentement(driver, maximum):
+    return attendre(driver, "consentement", consentement_passe, maximum)
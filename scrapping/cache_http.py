@@ -0,0 +1,148 @@
+import os
+import sqlite3
+import threading
+import time
+
+# === CONFIGURATION ===
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+FICHIER_CACHE_HTTP = os.path.join(CACHE_DIR, "http.sqlite")
+
+# Durée pendant laquelle une page est réutilisée sans contacter le site (7 jours par défaut)
+TTL_SECONDES = int(os.environ.get("PLOUF_CACHE_HTTP_TTL", str(7 * 24 * 3600)))
+# Taille maximale du contenu conservé ; au-delà, les pages les moins récemment lues sont supprimées
+BUDGET_OCTETS = int(os.environ.get("PLOUF_CACHE_HTTP_BUDGET", str(500 * 1024 * 1024)))
+# PLOUF_CACHE_HTTP=0 désactive le cache
+CACHE_ACTIF = os.environ.get("PLOUF_CACHE_HTTP", "1") != "0"
+
+class CacheHTTP:
+    """
+    Cache disque (SQLite) des pages web, indexé par URL.
+    - une page plus récente que le TTL est servie sans requête ;
+    - au-delà, la requête est refaite avec If-None-Match / If-Modified-Since
+      et une réponse 304 prolonge simplement l'entrée ;
+    - le contenu total est borné : éviction LRU sur la date de dernière lecture.
+    Utilisable depuis plusieurs threads (une connexion protégée par un verrou).
+    """
+
+    def __init__(self, chemin=FICHIER_CACHE_HTTP, ttl=TTL_SECONDES, budget_octets=BUDGET_OCTETS):
+        self.chemin = chemin
+        self.ttl = ttl
+        self.budget_octets = budget_octets
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        self.connexion = sqlite3.connect(chemin, check_same_thread=False)
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        self.connexion.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                contenu TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                date_stockage REAL NOT NULL,
+                dernier_acces REAL NOT NULL,
+                taille INTEGER NOT NULL
+            )
+        """)
+        self.connexion.execute("CREATE INDEX IF NOT EXISTS idx_pages_acces ON pages(dernier_acces)")
+        self.connexion.commit()
+        self.taille_totale = self.connexion.execute("SELECT COALESCE(SUM(taille), 0) FROM pages").fetchone()[0]
+
+    def preparer(self, url):
+        """
+        À appeler avant la requête.
+        Retourne (contenu, en_tetes) : contenu non vide si la page en cache est encore fraîche
+        (aucune requête à faire), sinon les en-têtes conditionnels à envoyer.
+        """
+        with self.lock:
+            entree = self.connexion.execute(
+                "SELECT contenu, etag, last_modified, date_stockage FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if entree is None:
+                return None, {}
+            contenu, etag, last_modified, date_stockage = entree
+            maintenant = time.time()
+            if maintenant - date_stockage < self.ttl:
+                self.connexion.execute("UPDATE pages SET dernier_acces = ? WHERE url = ?", (maintenant, url))
+                self.connexion.commit()
+                return contenu, {}
+        en_tetes = {}
+        if etag:
+            en_tetes["If-None-Match"] = etag
+        if last_modified:
+            en_tetes["If-Modified-Since"] = last_modified
+        return None, en_tetes
+
+    def recevoir(self, url, statut, contenu, en_tetes):
+        """
+        À appeler après la requête. Retourne le contenu à utiliser :
+        celui du cache sur un 304, sinon celui reçu (mis en cache si statut 200).
+        Retourne None sur un 304 dont l'entrée a disparu entre-temps (éviction, vider()) :
+        la page est alors à redemander sans en-têtes conditionnels.
+        """
+        maintenant = time.time()
+        with self.lock:
+            if statut == 304:
+                entree = self.connexion.execute("SELECT contenu FROM pages WHERE url = ?", (url,)).fetchone()
+                if entree is not None:
+                    self.connexion.execute(
+                        "UPDATE pages SET date_stockage = ?, dernier_acces = ? WHERE url = ?",
+                        (maintenant, maintenant, url)
+                    )
+                    self.connexion.commit()
+                    return entree[0]
+                return None
+            if statut != 200:
+                return contenu
+
+            taille = len(contenu.encode("utf-8"))
+            if taille > self.budget_octets:
+                return contenu
+            ancienne = self.connexion.execute("SELECT taille FROM pages WHERE url = ?", (url,)).fetchone()
+            self.connexion.execute(
+                "INSERT OR REPLACE INTO pages (url, contenu, etag, last_modified, date_stockage, dernier_acces, taille) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, contenu, en_tetes.get("ETag"), en_tetes.get("Last-Modified"), maintenant, maintenant, taille)
+            )
+            self.taille_totale += taille - (ancienne[0] if ancienne else 0)
+            self._evincer()
+            self.connexion.commit()
+        return contenu
+
+    def _evincer(self):
+        """Supprime les pages les moins récemment lues jusqu'à repasser sous le budget (verrou déjà pris)."""
+        while self.taille_totale > self.budget_octets:
+            lignes = self.connexion.execute(
+                "SELECT url, taille FROM pages ORDER BY dernier_acces ASC LIMIT 100"
+            ).fetchall()
+            if not lignes:
+                self.taille_totale = 0
+                break
+            for url, taille in lignes:
+                self.connexion.execute("DELETE FROM pages WHERE url = ?", (url,))
+                self.taille_totale -= taille
+                if self.taille_totale <= self.budget_octets:
+                    break
+
+    def vider(self):
+        with self.lock:
+            self.connexion.execute("DELETE FROM pages")
+            self.connexion.commit()
+            self.taille_totale = 0
+
+    def fermer(self):
+        with self.lock:
+            self.connexion.close()
+
+_cache_partage = None
+_cache_lock = threading.Lock()
+
+def cache_partage():
+    """Cache commun à tous les enrichisseurs du processus (None si désactivé)."""
+    global _cache_partage
+    if not CACHE_ACTIF:
+        return None
+    with _cache_lock:
+        if _cache_partage is None:
+            _cache_partage = CacheHTTP()
+        return _cache_partage
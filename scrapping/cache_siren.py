@@ -0,0 +1,119 @@
+import os
+import re
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+
+# === CONFIGURATION ===
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+FICHIER_CACHE_SIREN = os.path.join(CACHE_DIR, "siren.sqlite")
+
+# Entreprise trouvée : 30 jours ; non trouvée : 3 jours (elle peut apparaître, ou une API était indisponible)
+TTL_TROUVE = int(os.environ.get("PLOUF_CACHE_SIREN_TTL", str(30 * 24 * 3600)))
+TTL_NON_TROUVE = int(os.environ.get("PLOUF_CACHE_SIREN_TTL_ABSENT", str(3 * 24 * 3600)))
+# PLOUF_CACHE_SIREN=0 désactive le cache
+CACHE_ACTIF = os.environ.get("PLOUF_CACHE_SIREN", "1") != "0"
+
+def normaliser_requete(query):
+    """Clé de cache : minuscules, sans accents ni ponctuation, espaces normalisés."""
+    texte = unicodedata.normalize("NFKD", str(query)).encode("ascii", "ignore").decode("ascii")
+    texte = re.sub(r"[^\w\s]", " ", texte.lower())
+    return re.sub(r"\s+", " ", texte).strip()
+
+class CacheSIREN:
+    """
+    Mémo persistant (SQLite) des recherches d'entreprise de recherche_dirigeants,
+    indexé par requête normalisée (nom nettoyé + code postal).
+    Les résultats négatifs sont aussi conservés, avec une durée de vie plus courte.
+    """
+
+    def __init__(self, chemin=FICHIER_CACHE_SIREN, ttl_trouve=TTL_TROUVE, ttl_non_trouve=TTL_NON_TROUVE):
+        self.chemin = chemin
+        self.ttl_trouve = ttl_trouve
+        self.ttl_non_trouve = ttl_non_trouve
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        self.connexion = sqlite3.connect(chemin, check_same_thread=False)
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        self.connexion.execute("""
+            CREATE TABLE IF NOT EXISTS recherches (
+                cle TEXT PRIMARY KEY,
+                resultat TEXT,
+                date_stockage REAL NOT NULL
+            )
+        """)
+        self.connexion.commit()
+
+    def obtenir(self, query):
+        """Retourne (present, resultat) ; resultat vaut None pour une recherche négative en cache."""
+        cle = normaliser_requete(query)
+        with self.lock:
+            entree = self.connexion.execute(
+                "SELECT resultat, date_stockage FROM recherches WHERE cle = ?", (cle,)
+            ).fetchone()
+        if entree is None:
+            return False, None
+        resultat, date_stockage = entree
+        ttl = self.ttl_trouve if resultat is not None else self.ttl_non_trouve
+        if time.time() - date_stockage >= ttl:
+            return False, None
+        return True, json.loads(resultat) if resultat is not None else None
+
+    def enregistrer(self, query, resultat):
+        cle = normaliser_requete(query)
+        valeur = json.dumps(resultat, ensure_ascii=False) if resultat is not None else None
+        with self.lock:
+            self.connexion.execute(
+                "INSERT OR REPLACE INTO recherches (cle, resultat, date_stockage) VALUES (?, ?, ?)",
+                (cle, valeur, time.time())
+            )
+            self.connexion.commit()
+
+    def invalider(self, query=None, non_trouves=False):
+        """
+        Supprime des entrées et retourne leur nombre :
+        - invalider(query) : une requête ;
+        - invalider(non_trouves=True) : toutes les recherches négatives ;
+        - invalider() : tout le cache.
+        """
+        with self.lock:
+            if query is not None:
+                curseur = self.connexion.execute("DELETE FROM recherches WHERE cle = ?", (normaliser_requete(query),))
+            elif non_trouves:
+                curseur = self.connexion.execute("DELETE FROM recherches WHERE resultat IS NULL")
+            else:
+                curseur = self.connexion.execute("DELETE FROM recherches")
+            self.connexion.commit()
+            return curseur.rowcount
+
+    def purger_expirees(self):
+        """Supprime les entrées dont le TTL est dépassé."""
+        maintenant = time.time()
+        with self.lock:
+            curseur = self.connexion.execute(
+                "DELETE FROM recherches WHERE (resultat IS NOT NULL AND date_stockage < ?) "
+                "OR (resultat IS NULL AND date_stockage < ?)",
+                (maintenant - self.ttl_trouve, maintenant - self.ttl_non_trouve)
+            )
+            self.connexion.commit()
+            return curseur.rowcount
+
+    def fermer(self):
+        with self.lock:
+            self.connexion.close()
+
+_cache_partage = None
+_cache_lock = threading.Lock()
+
+def cache_partage():
+    """Cache commun au processus (None si désactivé)."""
+    global _cache_partage
+    if not CACHE_ACTIF:
+        return None
+    with _cache_lock:
+        if _cache_partage is None:
+            _cache_partage = CacheSIREN()
+        return _cache_partage
@@ -0,0 +1,139 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+# === CONFIGURATION ===
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+FICHIER_CACHE_WHOIS = os.path.join(CACHE_DIR, "whois.sqlite")
+
+# Domaine trouvé : conservé jusqu'à sa date d'expiration (renouvellement possible), au plus 90 jours
+# et au moins 1 jour (expiration dépassée ou imminente : le renouvellement peut être en cours)
+TTL_MAX = int(os.environ.get("PLOUF_CACHE_WHOIS_TTL", str(90 * 24 * 3600)))
+TTL_MIN = int(os.environ.get("PLOUF_CACHE_WHOIS_TTL_MIN", str(24 * 3600)))
+# Le registre a répondu sans données : 7 jours ; l'interrogation a échoué (timeout, registre désactivé) : 1 heure
+TTL_NON_TROUVE = int(os.environ.get("PLOUF_CACHE_WHOIS_TTL_ABSENT", str(7 * 24 * 3600)))
+TTL_ECHEC = int(os.environ.get("PLOUF_CACHE_WHOIS_TTL_ECHEC", str(3600)))
+# PLOUF_CACHE_WHOIS=0 désactive le cache
+CACHE_ACTIF = os.environ.get("PLOUF_CACHE_WHOIS", "1") != "0"
+
+def date_expiration(valeur):
+    """Date d'expiration d'un enregistrement ('YYYY-MM-DD...') -> timestamp, ou None."""
+    if not valeur:
+        return None
+    try:
+        return datetime.strptime(str(valeur)[:10], "%Y-%m-%d").timestamp()
+    except ValueError:
+        return None
+
+class CacheWhois:
+    """
+    Mémo persistant (SQLite) des données WHOIS / RDAP par domaine (résultat de extract_domain),
+    partagé entre les lignes d'un même fichier (franchises, site commun à plusieurs boutiques) et entre exécutions.
+    Chaque entrée porte sa propre date limite : la date d'expiration du domaine pour un résultat trouvé,
+    une durée courte pour un domaine sans données ou une interrogation en échec.
+    """
+
+    def __init__(self, chemin=FICHIER_CACHE_WHOIS, ttl_max=TTL_MAX, ttl_min=TTL_MIN,
+                 ttl_non_trouve=TTL_NON_TROUVE, ttl_echec=TTL_ECHEC):
+        self.chemin = chemin
+        self.ttl_max = ttl_max
+        self.ttl_min = ttl_min
+        self.ttl_non_trouve = ttl_non_trouve
+        self.ttl_echec = ttl_echec
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        self.connexion = sqlite3.connect(chemin, check_same_thread=False)
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        self.connexion.execute("""
+            CREATE TABLE IF NOT EXISTS domaines (
+                domaine TEXT PRIMARY KEY,
+                resultat TEXT,
+                echec INTEGER NOT NULL DEFAULT 0,
+                date_stockage REAL NOT NULL,
+                expire_le REAL NOT NULL
+            )
+        """)
+        self.connexion.commit()
+
+    def duree_validite(self, resultat, expiration=None, echec=False):
+        """Durée de conservation (secondes) d'un résultat."""
+        if resultat is None:
+            return self.ttl_echec if echec else self.ttl_non_trouve
+        expire_le = date_expiration(expiration)
+        if expire_le is None:
+            return self.ttl_max
+        return max(self.ttl_min, min(self.ttl_max, expire_le - time.time()))
+
+    def obtenir(self, domaine):
+        """Retourne (present, resultat) ; resultat vaut None pour un domaine sans données en cache."""
+        with self.lock:
+            entree = self.connexion.execute(
+                "SELECT resultat, expire_le FROM domaines WHERE domaine = ?", (domaine,)
+            ).fetchone()
+        if entree is None:
+            return False, None
+        resultat, expire_le = entree
+        if time.time() >= expire_le:
+            return False, None
+        return True, json.loads(resultat) if resultat is not None else None
+
+    def enregistrer(self, domaine, resultat, expiration=None, echec=False):
+        """
+        Mémorise le résultat d'un domaine : resultat (dict) trouvé, valable jusqu'à expiration (date du registre) ;
+        None sans données (echec=True si l'interrogation n'a pas abouti : conservé moins longtemps).
+        """
+        valeur = json.dumps(resultat, ensure_ascii=False) if resultat is not None else None
+        maintenant = time.time()
+        expire_le = maintenant + self.duree_validite(resultat, expiration, echec)
+        with self.lock:
+            self.connexion.execute(
+                "INSERT OR REPLACE INTO domaines (domaine, resultat, echec, date_stockage, expire_le) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (domaine, valeur, int(echec), maintenant, expire_le)
+            )
+            self.connexion.commit()
+
+    def invalider(self, domaine=None, non_trouves=False):
+        """
+        Supprime des entrées et retourne leur nombre :
+        - invalider(domaine) : un domaine ;
+        - invalider(non_trouves=True) : tous les résultats négatifs (sans données ou en échec) ;
+        - invalider() : tout le cache.
+        """
+        with self.lock:
+            if domaine is not None:
+                curseur = self.connexion.execute("DELETE FROM domaines WHERE domaine = ?", (domaine,))
+            elif non_trouves:
+                curseur = self.connexion.execute("DELETE FROM domaines WHERE resultat IS NULL")
+            else:
+                curseur = self.connexion.execute("DELETE FROM domaines")
+            self.connexion.commit()
+            return curseur.rowcount
+
+    def purger_expirees(self):
+        """Supprime les entrées dont la date limite est dépassée."""
+        with self.lock:
+            curseur = self.connexion.execute("DELETE FROM domaines WHERE expire_le <= ?", (time.time(),))
+            self.connexion.commit()
+            return curseur.rowcount
+
+    def fermer(self):
+        with self.lock:
+            self.connexion.close()
+
+_cache_partage = None
+_cache_lock = threading.Lock()
+
+def cache_partage():
+    """Cache commun au processus (None si désactivé)."""
+    global _cache_partage
+    if not CACHE_ACTIF:
+        return None
+    with _cache_lock:
+        if _cache_partage is None:
+            _cache_partage = CacheWhois()
+        return _cache_partage
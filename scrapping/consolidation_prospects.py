@@ -2,6 +2,7 @@
 import csv
 import os
 import re
+import argparse
 
 # === CONFIGURATION ===
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -15,17 +16,6 @@ CANDIDATE_INPUT_FILES = [
     os.path.join(BASE_DIR, "resultats", "resultats_complets.csv")                             # 5. Raw Scraping
 ]
 
-INPUT_FILE = None
-for f in CANDIDATE_INPUT_FILES:
-    if os.path.exists(f):
-        INPUT_FILE = f
-        print(f"✅ Fichier d'entrée trouvé pour consolidation : {os.path.basename(INPUT_FILE)}")
-        break
-
-if not INPUT_FILE:
-    # Fallback par défaut pour affichage d'erreur plus tard
-    INPUT_FILE = CANDIDATE_INPUT_FILES[0]
-
 OUTPUT_FILE = os.path.join(BASE_DIR, "resultats_consolides", "base_prospects_finale.csv")
 
 def clean_phone(phone):
@@ -41,118 +31,139 @@ def is_mobile(phone):
         return True
     return False
 
-def main():
+def trouver_fichier_entree(candidats=CANDIDATE_INPUT_FILES):
+    """Retourne le fichier le plus enrichi disponible parmi les candidats (par ordre de priorité)."""
+    for f in candidats:
+        if os.path.exists(f):
+            print(f"✅ Fichier d'entrée trouvé pour consolidation : {os.path.basename(f)}")
+            return f
+    # Fallback par défaut pour affichage d'erreur plus tard
+    return candidats[0]
+
+def consolider_ligne(row):
+    """Construit le prospect consolidé (meilleur téléphone, email, dirigeant) d'une ligne enrichie."""
+    # Les lignes en mémoire peuvent contenir des None (pas encore passées par un CSV)
+    row = {k: ("" if v is None else v) for k, v in row.items()}
+    
+    # 1. Priorisation Téléphone
+    # Ordre de préférence : Mobile Site > Mobile Whois > Mobile GMB > Fixe Site > Fixe Whois > Fixe GMB
+    tel_gmb = row.get('Téléphone', '').strip()
+    tel_site = row.get('Téléphone trouvé sur site', '').strip()
+    tel_whois = row.get('Whois_Phone', '').strip()
+
+    # Nettoyer tel_whois (il peut y en avoir plusieurs séparés par des virgules)
+    tels_whois_list = [t.strip() for t in tel_whois.split(',')] if tel_whois else []
+
+    # Trouver le meilleur tel whois (mobile en priorité)
+    best_tel_whois = ""
+    for t in tels_whois_list:
+        if is_mobile(t):
+            best_tel_whois = t
+            break
+    if not best_tel_whois and tels_whois_list:
+        best_tel_whois = tels_whois_list[0]
+
+    # Algorithme de sélection
+    tels_candidats = [
+        ('site', tel_site),
+        ('whois', best_tel_whois),
+        ('gmb', tel_gmb)
+    ]
+
+    telephone = ""
+    telephone_secondaire = ""
+
+    # 1. Chercher un mobile
+    for source, tel in tels_candidats:
+        if tel and is_mobile(tel):
+            if not telephone:
+                telephone = tel
+            elif not telephone_secondaire and tel != telephone:
+                telephone_secondaire = tel
+
+    # 2. Si pas de mobile principal, prendre un fixe
+    if not telephone:
+        for source, tel in tels_candidats:
+            if tel:
+                telephone = tel
+                break
+
+    # 3. Remplir le secondaire si vide
+    if not telephone_secondaire:
+         for source, tel in tels_candidats:
+            if tel and tel != telephone:
+                telephone_secondaire = tel
+                break
+
+    # 2. Priorisation Email
+    # Email du site > Email Whois
+    email_site = row.get('Email trouvé', '').strip()
+    email = email_site
+    email_whois = row.get('Mail Whois', '').strip()
+
+    if not email and email_whois:
+        # Whois peut contenir une liste, on prend le premier qui ne soit pas "abuse" ou "tech" si possible
+        parts = [e.strip() for e in email_whois.split(',')]
+        valid_emails = [e for e in parts if 'abuse' not in e and 'tech' not in e]
+        if valid_emails:
+            email = valid_emails[0]
+        elif parts:
+            email = parts[0]
+
+    # 3. Dirigeant
+    dirigeant = row.get('Dirigeants', '').strip()
+    if dirigeant == "Non listé" or dirigeant == "Voir sur Pappers":
+        dirigeant = ""
+
+    # Création de l'objet prospect consolidé
+    prospect = {
+        "Nom Entreprise": row.get('Nom', ''),
+        "Activité": row.get('Mot-clé', ''), # Ou Code NAF si dispo
+        "Dirigeant": dirigeant,
+        "Email": email,
+        "Email Site": email_site,
+        "Mail Whois": email_whois,
+        "Téléphone": telephone,
+        "Téléphone Secondaire": telephone_secondaire,
+        "Site Web": row.get('Site web', ''),
+        "Adresse": row.get('Adresse', ''),
+        "Code Postal": row.get('Whois_Zipcode', '') or row.get('Adresse', '')[-5:] if row.get('Adresse') and row.get('Adresse')[-1].isdigit() else "", # Tentative simple
+        "Ville": row.get('Whois_City', ''),
+        "SIRET": row.get('SIRET', ''),
+        "Date Création": row.get('Whois_Creation_Date', ''),
+        "Lien Pappers": row.get('Lien Pappers', '')
+    }
+    return prospect
+
+def consolider_lignes(rows):
+    """Version en mémoire de la consolidation (utilisée par pipeline.py)."""
+    return [consolider_ligne(row) for row in rows]
+
+def consolider(candidats=CANDIDATE_INPUT_FILES, output_file=OUTPUT_FILE):
     print("🚀 Consolidation de la base prospects...")
     
-    if not os.path.exists(INPUT_FILE):
-        print(f"❌ Fichier d'entrée non trouvé : {INPUT_FILE}")
+    input_file = trouver_fichier_entree(candidats)
+    if not os.path.exists(input_file):
+        print(f"❌ Fichier d'entrée non trouvé : {input_file}")
         return
 
-    prospects = []
-    
-    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            # 1. Priorisation Téléphone
-            # Ordre de préférence : Mobile Site > Mobile Whois > Mobile GMB > Fixe Site > Fixe Whois > Fixe GMB
-            tel_gmb = row.get('Téléphone', '').strip()
-            tel_site = row.get('Téléphone trouvé sur site', '').strip()
-            tel_whois = row.get('Whois_Phone', '').strip()
-            
-            # Nettoyer tel_whois (il peut y en avoir plusieurs séparés par des virgules)
-            tels_whois_list = [t.strip() for t in tel_whois.split(',')] if tel_whois else []
-            
-            # Trouver le meilleur tel whois (mobile en priorité)
-            best_tel_whois = ""
-            for t in tels_whois_list:
-                if is_mobile(t):
-                    best_tel_whois = t
-                    break
-            if not best_tel_whois and tels_whois_list:
-                best_tel_whois = tels_whois_list[0]
-            
-            # Algorithme de sélection
-            tels_candidats = [
-                ('site', tel_site),
-                ('whois', best_tel_whois),
-                ('gmb', tel_gmb)
-            ]
-            
-            telephone = ""
-            telephone_secondaire = ""
-            
-            # 1. Chercher un mobile
-            for source, tel in tels_candidats:
-                if tel and is_mobile(tel):
-                    if not telephone:
-                        telephone = tel
-                    elif not telephone_secondaire and tel != telephone:
-                        telephone_secondaire = tel
-            
-            # 2. Si pas de mobile principal, prendre un fixe
-            if not telephone:
-                for source, tel in tels_candidats:
-                    if tel:
-                        telephone = tel
-                        break
-            
-            # 3. Remplir le secondaire si vide
-            if not telephone_secondaire:
-                 for source, tel in tels_candidats:
-                    if tel and tel != telephone:
-                        telephone_secondaire = tel
-                        break
-
-            # 2. Priorisation Email
-            # Email du site > Email Whois
-            email_site = row.get('Email trouvé', '').strip()
-            email = email_site
-            email_whois = row.get('Mail Whois', '').strip()
-            
-            if not email and email_whois:
-                # Whois peut contenir une liste, on prend le premier qui ne soit pas "abuse" ou "tech" si possible
-                parts = [e.strip() for e in email_whois.split(',')]
-                valid_emails = [e for e in parts if 'abuse' not in e and 'tech' not in e]
-                if valid_emails:
-                    email = valid_emails[0]
-                elif parts:
-                    email = parts[0]
-            
-            # 3. Dirigeant
-            dirigeant = row.get('Dirigeants', '').strip()
-            if dirigeant == "Non listé" or dirigeant == "Voir sur Pappers":
-                dirigeant = ""
-                
-            # Création de l'objet prospect consolidé
-            prospect = {
-                "Nom Entreprise": row.get('Nom', ''),
-                "Activité": row.get('Mot-clé', ''), # Ou Code NAF si dispo
-                "Dirigeant": dirigeant,
-                "Email": email,
-                "Email Site": email_site,
-                "Mail Whois": email_whois,
-                "Téléphone": telephone,
-                "Téléphone Secondaire": telephone_secondaire,
-                "Site Web": row.get('Site web', ''),
-                "Adresse": row.get('Adresse', ''),
-                "Code Postal": row.get('Whois_Zipcode', '') or row.get('Adresse', '')[-5:] if row.get('Adresse') and row.get('Adresse')[-1].isdigit() else "", # Tentative simple
-                "Ville": row.get('Whois_City', ''),
-                "SIRET": row.get('SIRET', ''),
-                "Date Création": row.get('Whois_Creation_Date', ''),
-                "Lien Pappers": row.get('Lien Pappers', '')
-            }
-            
-            prospects.append(prospect)
+    with open(input_file, 'r', encoding='utf-8') as f:
+        prospects = consolider_lignes(csv.DictReader(f))
+
+    return ajouter_prospects(prospects, output_file)
 
-    # Sauvegarde
-    # Sauvegarde avec ajout (INSERT) sans doublons
+def ajouter_prospects(prospects, output_file=OUTPUT_FILE):
+    """
+    Ajoute les prospects au fichier de sortie (INSERT) sans doublons (clé SIRET ou Nom).
+    Retourne la liste des prospects réellement ajoutés.
+    """
     existing_keys = set()
-    file_exists = os.path.exists(OUTPUT_FILE)
+    file_exists = os.path.exists(output_file)
 
     # 1. Charger les clés existantes pour dédoublonnage (SIRET ou Nom)
     if file_exists:
         try:
-            with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
+            with open(output_file, 'r', encoding='utf-8') as f:
                 reader = csv.DictReader(f)
                 for row in reader:
                     key = row.get('SIRET') or row.get('Nom Entreprise')
@@ -177,8 +188,10 @@ def main():
         # Vérification des headers si le fichier existe déjà
         # (Pour éviter des incohérences si les colonnes changent, mais on suppose ici que la structure est stable)
         
+        if os.path.dirname(output_file):
+            os.makedirs(os.path.dirname(output_file), exist_ok=True)
         mode = 'a' if file_exists else 'w'
-        with open(OUTPUT_FILE, mode, encoding='utf-8', newline='') as f:
+        with open(output_file, mode, encoding='utf-8', newline='') as f:
             writer = csv.DictWriter(f, fieldnames=fieldnames)
             
             if not file_exists:
@@ -187,9 +200,25 @@ def main():
             writer.writerows(new_prospects)
             
         print(f"✅ Consolidation terminée ! {len(new_prospects)} nouveaux prospects ajoutés.")
-        print(f"💾 Fichier final : {OUTPUT_FILE}")
+        print(f"💾 Fichier final : {output_file}")
     else:
         print("⚠️ Aucun nouveau prospect à ajouter (tous déjà présents ou liste vide).")
+    return new_prospects
+
+def lire_prospects(fichier):
+    """Relit un fichier de prospects consolidés (liste de dictionnaires)."""
+    if not os.path.exists(fichier):
+        return []
+    with open(fichier, 'r', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+def main():
+    parser = argparse.ArgumentParser(description="Consolidation de la base prospects")
+    parser.add_argument("--entree", nargs="+", default=CANDIDATE_INPUT_FILES,
+                        help="Fichiers d'entrée candidats, du plus enrichi au moins enrichi")
+    parser.add_argument("--sortie", default=OUTPUT_FILE, help="Base consolidée (ajout sans doublons)")
+    args = parser.parse_args()
+    consolider(args.entree, args.sortie)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,46 @@
+import threading
+from functools import lru_cache
+
+import tldextract
+
+# === EXTRACTION DES DOMAINES ===
+# Domaine enregistré (example.co.uk) d'une URL ou d'un email, pour toutes les étapes qui en ont besoin
+# (enrichissement WHOIS). La liste des suffixes publics est celle livrée avec tldextract
+# (instantané figé avec le paquet) : jamais de téléchargement ni de cache disque, une seule lecture
+# par processus, et chaque valeur n'est analysée qu'une fois.
+
+# Nombre de valeurs (URL, email) mémorisées
+TAILLE_MEMO = 65536
+
+_extracteur = None
+_extracteur_lock = threading.Lock()
+
+def extracteur():
+    """Extracteur tldextract hors ligne, commun au processus (créé au premier appel)."""
+    global _extracteur
+    with _extracteur_lock:
+        if _extracteur is None:
+            _extracteur = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None)
+        return _extracteur
+
+def extract_domain(url_or_email):
+    """Extrait le domaine principal d'une URL ou d'un email (None si aucun, ou si ce n'est pas du texte : NaN pandas...)."""
+    # Vérifié avant le cache : une valeur non hachable (liste, dict) ferait échouer lru_cache
+    if not url_or_email or not isinstance(url_or_email, str):
+        return None
+    return _extract_domain(url_or_email)
+
+@lru_cache(maxsize=TAILLE_MEMO)
+def _extract_domain(url_or_email):
+    # Nettoyage basique
+    url_or_email = url_or_email.strip().lower()
+
+    # Si c'est un email
+    if "@" in url_or_email and not url_or_email.startswith("http"):
+        return url_or_email.split("@")[-1]
+
+    # Si c'est une URL
+    extracted = extracteur()(url_or_email)
+    if extracted.domain and extracted.suffix:
+        return f"{extracted.domain}.{extracted.suffix}"
+    return None
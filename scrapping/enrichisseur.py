@@ -1,9 +1,15 @@
 import re
 import csv
 import os
-import requests
+import argparse
+import asyncio
+import threading
+import urllib.parse
+import httpx
 from bs4 import BeautifulSoup
 import glob
+import cache_http
+import http_client
 from datetime import datetime
 
 # ========== CONFIGURATION ==========
@@ -13,18 +19,30 @@ ENRICHIS_DIR = os.path.join(BASE_DIR, "resultats_enrichis")
 FICHIER_RESULTAT = os.path.join(RESULTATS_DIR, "resultats_complets.csv")
 FICHIER_ENRICHI = os.path.join(ENRICHIS_DIR, "resultats_enrichis_complets.csv")
 
-# Créer le dossier de résultats enrichis s'il n'existe pas
-if not os.path.exists(ENRICHIS_DIR):
-    os.makedirs(ENRICHIS_DIR)
+# Moteur asynchrone : connexions simultanées au total et par site
+CONCURRENCE_GLOBALE = 50
+CONCURRENCE_PAR_HOTE = 2
+TIMEOUT_PAGE = 10
+HEADERS = {"User-Agent": "Mozilla/5.0"}
 
 # ========== FONCTIONS ==========
 
 def get_page_text(url):
     try:
-        headers = {"User-Agent": "Mozilla/5.0"}
-        res = requests.get(url, headers=headers, timeout=10)
-        res.raise_for_status()
-        soup = BeautifulSoup(res.text, 'html.parser')
+        # Cache disque partagé : page fraîche servie sans requête, sinon requête conditionnelle
+        cache = cache_http.cache_partage()
+        html, en_tetes = cache.preparer(url) if cache else (None, {})
+        if html is None:
+            res = http_client.get_site(url, headers=en_tetes)
+            if res.status_code != 304:
+                res.raise_for_status()
+            html = cache.recevoir(url, res.status_code, res.text, res.headers) if cache else res.text
+            if html is None:
+                # 304 mais page évincée du cache entre-temps : requête complète
+                res = http_client.get_site(url)
+                res.raise_for_status()
+                html = cache.recevoir(url, res.status_code, res.text, res.headers)
+        soup = BeautifulSoup(html, 'html.parser')
         return soup.get_text()
     except Exception as e:
         print(f"⚠️ Erreur lors de la récupération de {url} : {e}")
@@ -47,85 +65,251 @@ def extract_email_and_phone_from_text(text):
     
     return emails[0] if emails else "", phones[0] if phones else ""
 
-def extract_from_site(base_url):
-    urls_to_check = [
+def pages_candidates(base_url):
+    """Pages visitées pour un site, par ordre de priorité."""
+    return [
         base_url,
         f"{base_url}/contact" if not base_url.endswith('/') else f"{base_url}contact",
         f"{base_url}/mentions-legales" if not base_url.endswith('/') else f"{base_url}mentions-legales"
     ]
 
-    for url in urls_to_check:
+def extract_from_site(base_url):
+    for url in pages_candidates(base_url):
         text = get_page_text(url)
         email, phone = extract_email_and_phone_from_text(text)
         if email or phone:
             return email, phone
     return "", ""
 
+# ========== MOTEUR ASYNCHRONE ==========
+class MoteurEnrichissement:
+    """
+    Client HTTP asynchrone partagé (pool de connexions keep-alive) avec un plafond global
+    de requêtes simultanées et une limite par site. Les pages passent par le cache disque (cache_http).
+    Les trois pages candidates d'un site sont téléchargées en parallèle, mais la règle
+    reste « la première page (dans l'ordre) qui contient un contact gagne ».
+
+    Utilisable en async (async with / await extraire_site) ou depuis des threads :
+    demarrer() lance une boucle dédiée et enrichir(row) est alors bloquant.
+    """
+
+    def __init__(self, concurrence_globale=CONCURRENCE_GLOBALE, concurrence_par_hote=CONCURRENCE_PAR_HOTE,
+                 timeout=TIMEOUT_PAGE):
+        self.concurrence_globale = concurrence_globale
+        self.concurrence_par_hote = concurrence_par_hote
+        self.timeout = timeout
+        self.cache = cache_http.cache_partage()
+        self.client = None
+        self.semaphore = None
+        self.semaphores_hotes = {}
+        self.boucle = None
+        self.thread = None
+
+    async def ouvrir(self):
+        self.client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.concurrence_globale,
+                                max_keepalive_connections=self.concurrence_globale),
+        )
+        self.semaphore = asyncio.Semaphore(self.concurrence_globale)
+        return self
+
+    async def fermer(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def __aenter__(self):
+        return await self.ouvrir()
+
+    async def __aexit__(self, *exc):
+        await self.fermer()
+
+    def _semaphore_hote(self, url):
+        hote = urllib.parse.urlparse(url).netloc.lower()
+        if hote not in self.semaphores_hotes:
+            self.semaphores_hotes[hote] = asyncio.Semaphore(self.concurrence_par_hote)
+        return self.semaphores_hotes[hote]
+
+    async def texte_page(self, url):
+        try:
+            html, en_tetes = await asyncio.to_thread(self.cache.preparer, url) if self.cache else (None, {})
+            if html is None:
+                async with self.semaphore, self._semaphore_hote(url):
+                    res = await self.client.get(url, headers=en_tetes)
+                    if res.status_code != 304:
+                        res.raise_for_status()
+                    html = res.text
+                if self.cache:
+                    html = await asyncio.to_thread(self.cache.recevoir, url, res.status_code, html, res.headers)
+                if html is None:
+                    # 304 mais page évincée du cache entre-temps : requête complète
+                    async with self.semaphore, self._semaphore_hote(url):
+                        res = await self.client.get(url)
+                        res.raise_for_status()
+                        html = res.text
+                    html = await asyncio.to_thread(self.cache.recevoir, url, res.status_code, html, res.headers)
+            # Le parsing HTML est fait hors de la boucle pour ne pas bloquer les autres requêtes
+            return await asyncio.to_thread(lambda: BeautifulSoup(html, 'html.parser').get_text())
+        except Exception as e:
+            print(f"⚠️ Erreur lors de la récupération de {url} : {e}")
+            return ""
+
+    async def extraire_site(self, base_url):
+        taches = [asyncio.ensure_future(self.texte_page(url)) for url in pages_candidates(base_url)]
+        try:
+            for tache in taches:
+                email, phone = extract_email_and_phone_from_text(await tache)
+                if email or phone:
+                    return email, phone
+            return "", ""
+        finally:
+            # Les pages suivantes ne servent plus une fois un contact trouvé
+            for tache in taches:
+                tache.cancel()
+
+    async def enrichir_ligne(self, row, position=""):
+        url = (row.get("Site web") or "").strip()
+        email_trouve, telephone_trouve = "", ""
+        if url:
+            email_trouve, telephone_trouve = await self.extraire_site(url)
+            print(f"  🔎 {position}{url} ➜ Email : {email_trouve} | Téléphone : {telephone_trouve}")
+        else:
+            print(f"  ⏭️ {position}Pas de site web")
+        return ligne_enrichie(row, url, email_trouve, telephone_trouve)
+
+    async def enrichir_lignes(self, rows):
+        return await asyncio.gather(*[
+            self.enrichir_ligne(row, f"[{i+1}/{len(rows)}] ") for i, row in enumerate(rows)
+        ])
+
+    # --- Utilisation depuis des threads (pipeline en flux) ---
+    def demarrer(self):
+        self.boucle = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.boucle.run_forever, name="moteur-enrichissement", daemon=True)
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self.ouvrir(), self.boucle).result()
+        return self
+
+    def enrichir(self, row):
+        return asyncio.run_coroutine_threadsafe(self.enrichir_ligne(row), self.boucle).result()
+
+    def arreter(self):
+        if self.boucle is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.fermer(), self.boucle).result()
+        self.boucle.call_soon_threadsafe(self.boucle.stop)
+        self.thread.join()
+        self.boucle.close()
+        self.boucle = None
+
+async def _enrichir_lignes_async(rows):
+    async with MoteurEnrichissement() as moteur:
+        return await moteur.enrichir_lignes(rows)
+
 # ========== TRAITEMENT DU FICHIER ==========
-# Vérifier si le fichier de résultats existe
-if not os.path.exists(FICHIER_RESULTAT):
-    print(f"⚠️ Le fichier de résultats {FICHIER_RESULTAT} n'existe pas.")
-    
-    # Si le fichier unique n'existe pas, chercher les anciens fichiers individuels
-    csv_files = glob.glob(f"{RESULTATS_DIR}/*.csv")
-    if not csv_files:
-        print(f"⚠️ Aucun fichier CSV trouvé dans le dossier {RESULTATS_DIR}")
-        exit()
-    
-    print(f"✅ {len(csv_files)} fichiers CSV individuels trouvés à traiter")
-    
-    # Traiter les anciens fichiers individuels
+def lire_resultats(fichier_resultat):
+    """Lit le fichier de résultats unique (ou, à défaut, les anciens fichiers individuels de son dossier)."""
     all_data = []
-    for csv_index, csv_file in enumerate(csv_files):
-        print(f"\n🔍 Lecture du fichier {csv_index+1}/{len(csv_files)}: {csv_file}")
+    # Vérifier si le fichier de résultats existe
+    if not os.path.exists(fichier_resultat):
+        print(f"⚠️ Le fichier de résultats {fichier_resultat} n'existe pas.")
+        
+        # Si le fichier unique n'existe pas, chercher les anciens fichiers individuels
+        resultats_dir = os.path.dirname(fichier_resultat)
+        csv_files = glob.glob(f"{resultats_dir}/*.csv")
+        if not csv_files:
+            print(f"⚠️ Aucun fichier CSV trouvé dans le dossier {resultats_dir}")
+            return None
+        
+        print(f"✅ {len(csv_files)} fichiers CSV individuels trouvés à traiter")
         
-        # Lire les données du fichier CSV
-        with open(csv_file, 'r', newline='', encoding='utf-8') as csvfile:
+        # Traiter les anciens fichiers individuels
+        for csv_index, csv_file in enumerate(csv_files):
+            print(f"\n🔍 Lecture du fichier {csv_index+1}/{len(csv_files)}: {csv_file}")
+            
+            # Lire les données du fichier CSV
+            with open(csv_file, 'r', newline='', encoding='utf-8') as csvfile:
+                reader = csv.DictReader(csvfile)
+                for row in reader:
+                    all_data.append(row)
+        
+        print(f"✅ Total de {len(all_data)} entrées trouvées dans les fichiers individuels")
+    else:
+        print(f"✅ Fichier de résultats unique trouvé: {fichier_resultat}")
+        
+        # Lire les données du fichier CSV unique
+        with open(fichier_resultat, 'r', newline='', encoding='utf-8') as csvfile:
             reader = csv.DictReader(csvfile)
             for row in reader:
                 all_data.append(row)
+        
+        print(f"✅ Total de {len(all_data)} entrées trouvées dans le fichier unique")
+    return all_data
+
+# Colonnes du fichier enrichi
+COLONNES_ENRICHI = ["Mot-clé", "Nom", "Téléphone", "Site web", "Adresse", "Email trouvé", "Téléphone trouvé sur site"]
+
+def ligne_enrichie(row, url, email_trouve, telephone_trouve):
+    return {
+        "Mot-clé": row.get("Mot-clé", ""),
+        "Nom": row.get("Nom", ""),
+        "Téléphone": row.get("Téléphone", ""),
+        "Site web": url,
+        "Adresse": row.get("Adresse", ""),
+        "Email trouvé": email_trouve,
+        "Téléphone trouvé sur site": telephone_trouve
+    }
+
+def enrichir_ligne(row, position=""):
+    """Visite le site web d'une fiche (version synchrone) et retourne la ligne enrichie."""
+    url = (row.get("Site web") or "").strip()
+    email_trouve = ""
+    telephone_trouve = ""
     
-    print(f"✅ Total de {len(all_data)} entrées trouvées dans les fichiers individuels")
-else:
-    print(f"✅ Fichier de résultats unique trouvé: {FICHIER_RESULTAT}")
-    
-    # Lire les données du fichier CSV unique
-    all_data = []
-    with open(FICHIER_RESULTAT, 'r', newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            all_data.append(row)
+    if url:
+        print(f"  🔎 {position}Lecture de : {url}")
+        email_trouve, telephone_trouve = extract_from_site(url)
+        print(f"    ➜ Email : {email_trouve} | Téléphone : {telephone_trouve}")
+    else:
+        print(f"  ⏭️ {position}Pas de site web")
     
-    print(f"✅ Total de {len(all_data)} entrées trouvées dans le fichier unique")
+    return ligne_enrichie(row, url, email_trouve, telephone_trouve)
 
-# Créer le fichier CSV enrichi unique
-with open(FICHIER_ENRICHI, 'w', newline='', encoding='utf-8') as csvfile:
-    fieldnames = ["Mot-clé", "Nom", "Téléphone", "Site web", "Adresse", "Email trouvé", "Téléphone trouvé sur site"]
-    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-    writer.writeheader()
+def enrichir_lignes(rows):
+    """Enrichit une liste de fiches en mémoire, tous les sites en parallèle (moteur asynchrone)."""
+    return asyncio.run(_enrichir_lignes_async(rows))
+
+def enrichir_fichier(fichier_resultat=FICHIER_RESULTAT, fichier_enrichi=FICHIER_ENRICHI):
+    """Visite le site web de chaque fiche et écrit le fichier enrichi (emails / téléphones trouvés)."""
+    all_data = lire_resultats(fichier_resultat)
+    if all_data is None:
+        return False
     
-    # Traiter chaque ligne
-    for i, row in enumerate(all_data):
-        url = row.get("Site web", "").strip()
-        email_trouve = ""
-        telephone_trouve = ""
-        
-        if url:
-            print(f"  🔎 [{i+1}/{len(all_data)}] Lecture de : {url}")
-            email_trouve, telephone_trouve = extract_from_site(url)
-            print(f"    ➜ Email : {email_trouve} | Téléphone : {telephone_trouve}")
-        else:
-            print(f"  ⏭️ [{i+1}/{len(all_data)}] Pas de site web")
-        
-        # Écrire la ligne enrichie
-        writer.writerow({
-            "Mot-clé": row.get("Mot-clé", ""),
-            "Nom": row.get("Nom", ""),
-            "Téléphone": row.get("Téléphone", ""),
-            "Site web": url,
-            "Adresse": row.get("Adresse", ""),
-            "Email trouvé": email_trouve,
-            "Téléphone trouvé sur site": telephone_trouve
-        })
-
-print(f"\n✅ Enrichissement terminé ! Résultats enregistrés dans {FICHIER_ENRICHI}")
+    # Créer le dossier de résultats enrichis s'il n'existe pas
+    if os.path.dirname(fichier_enrichi):
+        os.makedirs(os.path.dirname(fichier_enrichi), exist_ok=True)
+    
+    # Traiter toutes les lignes (sites visités en parallèle)
+    lignes = enrichir_lignes(all_data)
+    
+    # Créer le fichier CSV enrichi unique
+    with open(fichier_enrichi, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=COLONNES_ENRICHI)
+        writer.writeheader()
+        writer.writerows(lignes)
+    
+    print(f"\n✅ Enrichissement terminé ! Résultats enregistrés dans {fichier_enrichi}")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Enrichissement emails / téléphones depuis les sites web")
+    parser.add_argument("--entree", default=FICHIER_RESULTAT, help="Fichier CSV des résultats bruts")
+    parser.add_argument("--sortie", default=FICHIER_ENRICHI, help="Fichier CSV enrichi")
+    args = parser.parse_args()
+    enrichir_fichier(args.entree, args.sortie)
+
+if __name__ == "__main__":
+    main()
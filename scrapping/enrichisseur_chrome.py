@@ -1,9 +1,10 @@
 import re
 import csv
 import os
-import requests
 from bs4 import BeautifulSoup
 import glob
+import cache_http
+import http_client
 from datetime import datetime
 
 # ========== CONFIGURATION ==========
@@ -21,10 +22,20 @@ if not os.path.exists(ENRICHIS_DIR):
 
 def get_page_text(url):
     try:
-        headers = {"User-Agent": "Mozilla/5.0"}
-        res = requests.get(url, headers=headers, timeout=10)
-        res.raise_for_status()
-        soup = BeautifulSoup(res.text, 'html.parser')
+        # Cache disque partagé : page fraîche servie sans requête, sinon requête conditionnelle
+        cache = cache_http.cache_partage()
+        html, en_tetes = cache.preparer(url) if cache else (None, {})
+        if html is None:
+            res = http_client.get_site(url, headers=en_tetes)
+            if res.status_code != 304:
+                res.raise_for_status()
+            html = cache.recevoir(url, res.status_code, res.text, res.headers) if cache else res.text
+            if html is None:
+                # 304 mais page évincée du cache entre-temps : requête complète
+                res = http_client.get_site(url)
+                res.raise_for_status()
+                html = cache.recevoir(url, res.status_code, res.text, res.headers)
+        soup = BeautifulSoup(html, 'html.parser')
         return soup.get_text()
     except Exception as e:
         print(f"⚠️ Erreur lors de la récupération de {url} : {e}")
@@ -1,30 +1,41 @@
 import os
 import csv
 import time
+import argparse
 import random
+import queue
+import threading
 import urllib.parse
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+import attentes
+import extraction_maps
+import journal_resultats
+import navigateur
+import pool_navigateurs
+
 # === CONFIGURATION ===
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 INPUT_FILE = os.path.join(BASE_DIR, "resultats_dirigeants", "resultats_dirigeants.csv")
 OUTPUT_FILE = os.path.join(BASE_DIR, "resultats_dirigeants", "resultats_dirigeants_enrichis_gmb.csv")
 
 MODE_HEADLESS = True
-WAIT_TIME = 2
+WAIT_TIME = 5  # Attente maximale (s) du chargement d'une page Maps (on n'attend que le nécessaire)
+
+# Navigateurs qui cherchent en parallèle (chacun avec sa propre cadence)
+NB_WORKERS = int(os.environ.get("PLOUF_GMB_WORKERS", "3"))
+# Pause aléatoire de chaque worker entre deux recherches, pour éviter le blocage (secondes)
+PAUSE_MIN = 1
+PAUSE_MAX = 2
 
 # === Selenium Setup ===
 def initialiser_driver():
     # 1. Tentative avec Chrome
     try:
         from selenium.webdriver.chrome.options import Options as ChromeOptions
-        from selenium.webdriver.chrome.service import Service as ChromeService
-        from webdriver_manager.chrome import ChromeDriverManager
         
         chrome_options = ChromeOptions()
         if MODE_HEADLESS:
@@ -39,28 +50,24 @@ def initialiser_driver():
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36",
         ]
         chrome_options.add_argument(f"--user-agent={random.choice(user_agents)}")
+        navigateur.options_chrome(chrome_options)
         
         print("🌐 Tentative d'initialisation de Chrome...")
-        service = ChromeService(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        return driver
+        return navigateur.demarrer_chrome(chrome_options)
     except Exception as e:
         print(f"⚠️ Chrome non disponible ou erreur : {e}")
 
     # 2. Tentative avec Firefox
     try:
         from selenium.webdriver.firefox.options import Options as FirefoxOptions
-        from selenium.webdriver.firefox.service import Service as FirefoxService
-        from webdriver_manager.firefox import GeckoDriverManager
         
         firefox_options = FirefoxOptions()
         if MODE_HEADLESS:
             firefox_options.add_argument("-headless")
+        navigateur.options_firefox(firefox_options)
         
         print("🦊 Tentative d'initialisation de Firefox...")
-        service = FirefoxService(GeckoDriverManager().install())
-        driver = webdriver.Firefox(service=service, options=firefox_options)
-        return driver
+        return navigateur.demarrer_firefox(firefox_options)
     except Exception as e:
         print(f"❌ Firefox non disponible ou erreur : {e}")
         
@@ -90,124 +97,196 @@ def get_gmb_phone(driver, query):
         encoded_query = urllib.parse.quote(query)
         url = f"https://www.google.com/maps/search/{encoded_query}"
         driver.get(url)
-        time.sleep(WAIT_TIME)
+        attentes.attendre_resultats(driver, WAIT_TIME)
         
-        handle_cookie_consent(driver)
+        if "consent" in driver.current_url:
+            handle_cookie_consent(driver)
+            attentes.attendre_resultats(driver, WAIT_TIME)
         
         # S'il y a plusieurs résultats, on prend le premier s'il semble correspondre
         # Mais souvent avec une recherche précise "Nom + Ville", on tombe soit sur la fiche directe, soit sur une liste
         
-        # Tentative d'extraire le téléphone sur une fiche directe
-        try:
-            # Sélecteurs pour le téléphone sur Google Maps
-            tel_selectors = [
-                '//button[contains(@aria-label, "Appeler")]',
-                '//button[contains(@data-item-id, "phone:tel:")]',
-                '//div[contains(@aria-label, "Appeler")]'
-            ]
-            for selector in tel_selectors:
-                elements = driver.find_elements(By.XPATH, selector)
-                if elements:
-                    tel = elements[0].get_attribute("aria-label") or elements[0].text
-                    if tel:
-                        # Nettoyer le numéro (enlever "Appeler le ", "Numéro de téléphone: ", etc.)
-                        tel = tel.replace("Appeler le ", "").replace("Appeler ", "").replace("Numéro de téléphone: ", "").replace("Numero de telephone: ", "").strip()
-                        return tel
-        except:
-            pass
-            
-        # Si on est sur une liste de résultats, on clique sur le premier
-        try:
-            results = driver.find_elements(By.XPATH, '//a[contains(@href, "/maps/place/")]')
-            if results:
-                results[0].click()
-                time.sleep(WAIT_TIME)
-                # Ré-essayer d'extraire le téléphone
-                for selector in tel_selectors:
-                    elements = driver.find_elements(By.XPATH, selector)
-                    if elements:
-                        tel = elements[0].get_attribute("aria-label") or elements[0].text
-                        if tel:
-                            tel = tel.replace("Appeler le ", "").replace("Appeler ", "").replace("Numéro de téléphone: ", "").replace("Numero de telephone: ", "").strip()
-                            return tel
-        except:
-            pass
+        # Fiche directe ou liste : toute la page est lue en un seul appel
+        page = extraction_maps.lire_page(driver)
+        tel = extraction_maps.nettoyer_telephone((page.get("fiche") or {}).get("tel", ""))
+        if tel:
+            return tel
+        
+        # Si on est sur une liste de résultats, on ouvre le premier
+        if page.get("urls"):
+            driver.get(page["urls"][0])
+            attentes.attendre_fiche(driver, WAIT_TIME)
+            # Ré-essayer d'extraire le téléphone
+            return extraction_maps.lire_fiche(driver)["tel"]
             
     except Exception as e:
         print(f"⚠️ Erreur lors de la recherche pour '{query}' : {e}")
     
     return ""
     
-def sauvegarder_resultats(file_path, fieldnames, rows):
-    with open(file_path, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+def a_enrichir(row):
+    """Une ligne est à enrichir si elle n'a ni téléphone Maps ni téléphone trouvé sur le site."""
+    tel = (row.get('Téléphone') or '').strip()
+    tel_site = (row.get('Téléphone trouvé sur site') or '').strip()
+    return not tel and not tel_site
 
-def main():
-    if not os.path.exists(INPUT_FILE):
-        print(f"❌ Fichier non trouvé : {INPUT_FILE}")
-        return
+def enrichir_ligne(driver, row):
+    """Cherche le téléphone GMB d'une ligne et met la ligne à jour. Retourne True si trouvé."""
+    nom = row.get('Nom', '')
+    mot_cle = row.get('Mot-clé', '')
+    
+    # Nettoyer le mot-clé pour la recherche (enlever "coiffeurs" si redondant ?)
+    # On va garder Nom + Mot-clé c'est souvent efficace
+    query = f"{nom} {mot_cle}"
+    
+    phone = get_gmb_phone(driver, query)
+    if phone:
+        print(f"  ✅ Téléphone trouvé : {phone}")
+        row['Téléphone'] = phone
+        row['Status Recherche'] = "Enrichi GMB"
+        return True
+    print(f"  ❌ Pas de téléphone trouvé.")
+    return False
 
-    rows = []
-    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-        for row in reader:
-            rows.append(row)
+class SessionGMB:
+    """
+    Enrichissement GMB ligne par ligne (pipeline en flux). Avec un pool (pool_navigateurs.PoolNavigateurs),
+    un navigateur est emprunté pour chaque ligne sans téléphone ; sinon le driver n'est créé
+    qu'à la première ligne sans téléphone, puis réutilisé jusqu'à fermer().
+    """
 
-    print(f"📋 {len(rows)} lignes chargées.")
-    
+    def __init__(self, pool=None):
+        self.pool = pool
+        self.driver = None
+
+    def enrichir(self, row):
+        if not a_enrichir(row):
+            return row
+        print(f"🔎 Recherche GMB pour : {row.get('Nom', '')} {row.get('Mot-clé', '')}")
+        if self.pool is not None:
+            with self.pool.bail() as bail:
+                enrichir_ligne(bail.driver, row)
+        else:
+            if self.driver is None:
+                self.driver = initialiser_driver()
+                if self.driver is None:
+                    raise Exception("Impossible d'initialiser le driver GMB")
+            enrichir_ligne(self.driver, row)
+        # Petite pause pour éviter le blocage
+        time.sleep(random.uniform(PAUSE_MIN, PAUSE_MAX))
+        return row
+
+    def fermer(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except:
+                pass
+            self.driver = None
+
+def enrichir_lignes(rows, driver=None, apres_ligne=None, nb_workers=None, pool=None):
+    """
+    Enrichit en mémoire les lignes sans téléphone avec nb_workers navigateurs en parallèle
+    (NB_WORKERS par défaut), empruntés à pool ou à un pool créé pour l'appel.
+    Avec un driver fourni, un seul worker l'utilise. Les lignes sont mises à jour sur place :
+    l'ordre de sortie est celui de l'entrée, quel que soit l'ordre de traitement.
+    apres_ligne(index, rows) est appelé après chaque ligne modifiée (appels sérialisés).
+    """
     # Identifier les lignes à enrichir
-    to_enrich = []
-    for i, row in enumerate(rows):
-        tel = row.get('Téléphone', '').strip()
-        tel_site = row.get('Téléphone trouvé sur site', '').strip()
-        if not tel and not tel_site:
-            to_enrich.append(i)
+    to_enrich = [i for i, row in enumerate(rows) if a_enrichir(row)]
     
     print(f"🔍 {len(to_enrich)} lignes n'ont pas de téléphone. Début de l'enrichissement GMB...")
     
     if not to_enrich:
         print("✅ Toutes les lignes ont déjà un téléphone.")
-        return
+        return rows
 
-    driver = initialiser_driver()
-    if not driver:
-        return
+    taches = queue.Queue()
+    for idx in to_enrich:
+        taches.put(idx)
+    nb_workers = 1 if driver is not None else max(1, min(nb_workers or NB_WORKERS, len(to_enrich)))
+    pool_local = driver is None and pool is None
+    if pool_local:
+        pool = pool_navigateurs.PoolNavigateurs(initialiser_driver, taille=nb_workers)
+    lock = threading.Lock()
+    compteur = {"traitees": 0}
 
-    try:
-        count = 0
-        for idx in to_enrich:
+    def worker():
+        while True:
+            try:
+                idx = taches.get_nowait()
+            except queue.Empty:
+                return
             row = rows[idx]
-            nom = row.get('Nom', '')
-            mot_cle = row.get('Mot-clé', '')
-            
-            # Nettoyer le mot-clé pour la recherche (enlever "coiffeurs" si redondant ?)
-            # On va garder Nom + Mot-clé c'est souvent efficace
-            query = f"{nom} {mot_cle}"
-            
-            print(f"🔎 [{count+1}/{len(to_enrich)}] Recherche GMB pour : {query}")
-            phone = get_gmb_phone(driver, query)
-            
-            if phone:
-                print(f"  ✅ Téléphone trouvé : {phone}")
-                row['Téléphone'] = phone
-                row['Status Recherche'] = "Enrichi GMB"
-            else:
-                print(f"  ❌ Pas de téléphone trouvé.")
-            
-            count += 1
-            # Sauvegarde incrémentale
-            sauvegarder_resultats(OUTPUT_FILE, fieldnames, rows)
-            
-            # Petite pause pour éviter le blocage
-            time.sleep(random.uniform(1, 2))
+            # Recherche sur une copie : la ligne partagée n'est modifiée que sous le verrou
+            ligne = dict(row)
+            try:
+                if driver is not None:
+                    enrichir_ligne(driver, ligne)
+                else:
+                    with pool.bail() as bail:
+                        enrichir_ligne(bail.driver, ligne)
+            except Exception as e:
+                print(f"⚠️ Erreur GMB pour '{row.get('Nom', '')}' : {e}")
+            with lock:
+                modifiee = ligne != row
+                row.update(ligne)
+                compteur["traitees"] += 1
+                print(f"🔎 [{compteur['traitees']}/{len(to_enrich)}] {row.get('Nom', '')} {row.get('Mot-clé', '')} : "
+                      f"{row.get('Téléphone') or 'pas de téléphone'}")
+                if apres_ligne and modifiee:
+                    apres_ligne(idx, rows)
             
+            # Petite pause pour éviter le blocage (propre à chaque worker)
+            time.sleep(random.uniform(PAUSE_MIN, PAUSE_MAX))
+
+    if nb_workers > 1:
+        print(f"🚀 {nb_workers} navigateurs GMB en parallèle")
+    threads = [threading.Thread(target=worker, name=f"gmb-{numero + 1}", daemon=True) for numero in range(nb_workers)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        if pool_local:
+            pool.fermer()
+    return rows
+
+def enrichir_fichier(input_file=INPUT_FILE, output_file=OUTPUT_FILE, nb_workers=None):
+    if not os.path.exists(input_file):
+        print(f"❌ Fichier non trouvé : {input_file}")
+        return
+
+    rows = []
+    with open(input_file, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames
+        for row in reader:
+            rows.append(row)
+
+    print(f"📋 {len(rows)} lignes chargées.")
+    
+    # Sauvegarde incrémentale : seules les lignes modifiées sont ajoutées au journal,
+    # le CSV est écrit une seule fois à la fin
+    journal = journal_resultats.JournalResultats(output_file)
+    journal.rejouer(rows)
+    try:
+        enrichir_lignes(rows, apres_ligne=lambda index, lignes: journal.ecrire(index, lignes[index]),
+                        nb_workers=nb_workers)
     finally:
-        driver.quit()
+        journal.fermer()
+    journal.compacter(fieldnames, rows)
+
+    print(f"💾 Fin de l'enrichissement. Résultats finaux dans : {output_file}")
 
-    print(f"💾 Fin de l'enrichissement. Résultats finaux dans : {OUTPUT_FILE}")
+def main():
+    parser = argparse.ArgumentParser(description="Enrichissement des téléphones manquants via Google Maps (GMB)")
+    parser.add_argument("--entree", default=INPUT_FILE, help="Fichier CSV issu de la recherche des dirigeants")
+    parser.add_argument("--sortie", default=OUTPUT_FILE, help="Fichier CSV enrichi GMB")
+    parser.add_argument("--workers", type=int, default=NB_WORKERS, help="Navigateurs en parallèle")
+    args = parser.parse_args()
+    enrichir_fichier(args.entree, args.sortie, args.workers)
 
 if __name__ == "__main__":
     main()
@@ -1,49 +1,79 @@
 
 import os
 import csv
-import time
-import requests
-import random
+import argparse
+import threading
+import contextlib
 import whois
-import tldextract
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from whois.exceptions import UnknownTldError, WhoisDomainNotFoundError, WhoisError
+
+import cache_whois
+import domaines
+import http_client
+import journal_resultats
+import limiteur
 
 # === CONFIGURATION ===
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # On prend le fichier enrichi par GMB comme entrée
 INPUT_FILE = os.path.join(BASE_DIR, "resultats_dirigeants", "resultats_dirigeants_enrichis_gmb.csv")
 # Si le fichier GMB n'existe pas, on prend le fichier de base
-if not os.path.exists(INPUT_FILE):
-    INPUT_FILE = os.path.join(BASE_DIR, "resultats_dirigeants", "resultats_dirigeants.csv")
+INPUT_FILE_FALLBACK = os.path.join(BASE_DIR, "resultats_dirigeants", "resultats_dirigeants.csv")
 
 OUTPUT_FILE = os.path.join(BASE_DIR, "resultats_dirigeants", "resultats_finaux_complets.csv")
 
-def extract_domain(url_or_email):
-    """Extrait le domaine principal d'une URL ou d'un email."""
-    if not url_or_email:
-        return None
-    
-    # Nettoyage basique
-    url_or_email = url_or_email.strip().lower()
-    
-    # Si c'est un email
-    if "@" in url_or_email and not url_or_email.startswith("http"):
-        return url_or_email.split("@")[-1]
-    
-    # Si c'est une URL
-    extracted = tldextract.extract(url_or_email)
-    if extracted.domain and extracted.suffix:
-        return f"{extracted.domain}.{extracted.suffix}"
-    return None
+# Domaines interrogés en parallèle (l'attente réseau des registres se recouvre)
+NB_WORKERS = int(os.environ.get("PLOUF_WHOIS_WORKERS", "8"))
+# Délai maximal d'une requête WHOIS (secondes) ; RDAP passe par http_client (timeouts de connexion / lecture)
+TIMEOUT_WHOIS = 10
+# Débits par registre (requêtes / seconde) : RDAP AFNIC pour les .fr, puis un serveur WHOIS par extension
+DEBIT_RDAP_AFNIC = 2
+DEBIT_WHOIS_PAR_EXTENSION = 1
+
+RDAP_AFNIC = limiteur.Fournisseur("RDAP AFNIC", debit=DEBIT_RDAP_AFNIC)
+_registres_whois = {}
+_registres_lock = threading.Lock()
+
+def registre_whois(domain):
+    """Limiteur + disjoncteur du serveur WHOIS de l'extension du domaine (créé à la première utilisation)."""
+    extension = domain.rsplit(".", 1)[-1]
+    with _registres_lock:
+        if extension not in _registres_whois:
+            _registres_whois[extension] = limiteur.Fournisseur(f"WHOIS .{extension}", debit=DEBIT_WHOIS_PAR_EXTENSION)
+        return _registres_whois[extension]
+
+# Domaine principal d'une URL ou d'un email (liste des suffixes hors ligne, mémoïsé)
+extract_domain = domaines.extract_domain
 
 def get_whois_info(domain):
-    """Récupère les infos WHOIS pour un domaine."""
+    """
+    Récupère les infos WHOIS pour un domaine (débit limité par extension, délai maximal TIMEOUT_WHOIS).
+    Retourne None si le domaine est inconnu du registre ; lève une exception si le registre n'a pas répondu.
+    """
+    registre = registre_whois(domain)
+    if not registre.disjoncteur.autoriser():
+        raise limiteur.CircuitOuvert(registre.nom)
+    registre.limiteur.acquerir()
     try:
-        w = whois.whois(domain)
-        return w
-    except Exception as e:
-        # print(f"  ⚠️ Erreur WHOIS pour {domain}: {e}")
+        # ignore_socket_errors=False : un timeout lève une exception au lieu de renvoyer le texte
+        # "Socket not responding", analysé comme une fiche vide
+        w = whois.whois(domain, timeout=TIMEOUT_WHOIS, ignore_socket_errors=False)
+        if not (w.get('domain_name') or w.get('creation_date')):
+            raise WhoisError(f"Réponse WHOIS sans données pour {domain}")
+    except (WhoisDomainNotFoundError, UnknownTldError):
+        # Réponse normale : domaine inconnu ou extension sans serveur WHOIS
+        registre.disjoncteur.succes()
         return None
+    except Exception:
+        # Timeout, refus de connexion, quota atteint, réponse vide : on ralentit cette extension
+        registre.limiteur.penaliser()
+        registre.disjoncteur.echec()
+        raise
+    registre.limiteur.succes()
+    registre.disjoncteur.succes()
+    return w
 
 def format_date(date_obj):
     """Formate une date en string (si c'est une liste, prend la première)."""
@@ -62,14 +92,14 @@ def format_list(item):
 def get_rdap_info_fr(domain):
     """
     Récupère les infos RDAP via l'AFNIC pour les domaines en .fr
-    Retourne un dictionnaire avec les infos trouvées ou None.
+    Retourne un dictionnaire avec les infos trouvées ou None ; lève une exception si l'AFNIC n'a pas répondu.
     """
     if not domain.endswith('.fr'):
         return None
         
     try:
         url = f"https://rdap.nic.fr/domain/{domain}"
-        response = requests.get(url, timeout=5)
+        response = RDAP_AFNIC.executer(lambda: http_client.get(url))
         
         if response.status_code == 200:
             data = response.json()
@@ -156,117 +186,222 @@ def get_rdap_info_fr(domain):
             
     except Exception as e:
         print(f"⚠️ Erreur RDAP pour {domain}: {e}")
+        raise
     
     return None
 
-def sauvegarder_resultats(file_path, fieldnames, rows):
-    with open(file_path, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+# Colonnes ajoutées par l'enrichissement WHOIS
+COLONNES_WHOIS = ['Whois_Domain', 'Whois_Creation_Date', 'Whois_Expiration_Date', 'Whois_Registrar', 'Mail Whois', 'Whois_Name', 'Whois_Org', 'Whois_Address', 'Whois_City', 'Whois_Zipcode', 'Whois_Country', 'Whois_Updated_Date', 'Whois_Phone']
 
-def main():
+def interroger_registres(domain):
+    """
+    Données WHOIS d'un domaine (RDAP AFNIC puis WHOIS standard), sous forme de valeurs des COLONNES_WHOIS.
+    Retourne (valeurs, echec) : valeurs vaut None sans données ; echec indique qu'un registre n'a pas répondu.
+    """
+    echec = False
+
+    # 1. Tentative RDAP (Prioritaire pour .fr)
+    try:
+        rdap_data = get_rdap_info_fr(domain)
+    except Exception:
+        rdap_data = None
+        echec = True
+
+    if rdap_data:
+        print(f"  ✨ RDAP Success (AFNIC) !")
+        return {
+            'Whois_Creation_Date': rdap_data['creation_date'],
+            'Whois_Expiration_Date': rdap_data['expiration_date'],
+            'Whois_Updated_Date': rdap_data['updated_date'],
+            'Whois_Registrar': rdap_data['registrar'],
+            'Mail Whois': format_list(rdap_data['emails']),
+            'Whois_Phone': format_list(rdap_data['phones']),
+            'Whois_Address': format_list(rdap_data['address']),
+            'Whois_City': format_list(rdap_data['city']),
+            'Whois_Zipcode': format_list(rdap_data['zipcode']),
+            'Whois_Country': format_list(rdap_data['country']),
+        }, False
+
+    # 2. Fallback WHOIS Standard
+    try:
+        w_info = get_whois_info(domain)
+    except Exception:
+        return None, True
+
+    if not w_info:
+        return None, echec
+
+    # Tentative de récupération des téléphones (champs variables selon les TLD)
+    phones = []
+    for p_field in ['phone', 'registrant_phone', 'admin_phone', 'tech_phone', 'registrar_phone']:
+        val = getattr(w_info, p_field, None) or w_info.get(p_field)
+        if val:
+            phones.append(str(val))
+
+    return {
+        'Whois_Creation_Date': format_date(w_info.creation_date),
+        'Whois_Expiration_Date': format_date(w_info.expiration_date),
+        'Whois_Registrar': w_info.registrar,
+        'Mail Whois': format_list(w_info.emails),
+        'Whois_Name': format_list(w_info.name),
+        'Whois_Org': format_list(w_info.org),
+        'Whois_Address': format_list(w_info.address),
+        'Whois_City': format_list(w_info.city),
+        'Whois_Zipcode': format_list(w_info.zipcode),
+        'Whois_Country': format_list(w_info.country),
+        'Whois_Updated_Date': format_date(w_info.updated_date),
+        'Whois_Phone': ", ".join(list(set(phones))),
+    }, False
+
+# Un seul thread interroge les registres pour un domaine donné : les lignes qui partagent ce domaine
+# (franchises, site commun à plusieurs boutiques) attendent puis lisent le résultat dans le cache
+_verrous_domaines = {}  # domaine -> [verrou, nombre de threads intéressés]
+_verrous_lock = threading.Lock()
+
+@contextlib.contextmanager
+def verrou_domaine(domain):
+    with _verrous_lock:
+        entree = _verrous_domaines.setdefault(domain, [threading.Lock(), 0])
+        entree[1] += 1
+    try:
+        with entree[0]:
+            yield
+    finally:
+        with _verrous_lock:
+            entree[1] -= 1
+            if entree[1] == 0:
+                del _verrous_domaines[domain]
+
+def infos_domaine(domain):
+    """Valeurs des COLONNES_WHOIS d'un domaine (None sans données), depuis cache_whois ou les registres."""
+    cache = cache_whois.cache_partage()
+    if not cache:
+        return interroger_registres(domain)[0]
+    with verrou_domaine(domain):
+        present, valeurs = cache.obtenir(domain)
+        if present:
+            print(f"  ♻️ {domain} : {'données' if valeurs else 'pas de données'} (cache)")
+            return valeurs
+        valeurs, echec = interroger_registres(domain)
+        if valeurs is not None and not any(valeurs.values()):
+            # Aucun champ renseigné : registre défaillant plutôt que vraie fiche, gardé TTL_ECHEC et non 90 jours
+            valeurs, echec = None, True
+        expiration = valeurs['Whois_Expiration_Date'] if valeurs else None
+        cache.enregistrer(domain, valeurs, expiration, echec)
+        return valeurs
+
+def invalider_domaine(domain):
+    """Oublie les données mémorisées pour un domaine (la prochaine recherche interrogera les registres)."""
+    cache = cache_whois.cache_partage()
+    return cache.invalider(domain) if cache else 0
+
+def enrichir_ligne(row, position=""):
+    """Enrichit une ligne (RDAP AFNIC puis WHOIS standard, via le cache par domaine) à partir de son site web."""
+    for col in COLONNES_WHOIS:
+        row.setdefault(col, "")
+    
+    # On essaie de trouver un domaine via le site web, sinon via l'email
+    site_web = row.get('Site web', '') or row.get('Site Web', '')
+    # Si pas de site web, on peut essayer de déduire d'autres champs si dispo, mais ici on reste simple
+
+    domain = extract_domain(site_web)
+
+    # Si on a déjà les infos, on ne refait pas (sauf si on veut forcer)
+    # if row.get('Whois_Domain') and row.get('Whois_Creation_Date'):
+    #     return row
+
+    if domain:
+        print(f"Terminé {position}: Enrichment pour {domain}...")
+        valeurs = infos_domaine(domain)
+        row['Whois_Domain'] = domain
+        if valeurs:
+            row.update(valeurs)
+            print(f"  ✅ Données trouvées (Créé le: {row['Whois_Creation_Date']}, Tel: {row['Whois_Phone']})")
+        else:
+            print(f"  ❌ Pas de données WHOIS trouvées.")
+
+    else:
+        # print(f"  ⚠️ Pas de domaine extractible pour la ligne")
+        pass
+    return row
+
+def enrichir_lignes(rows, apres_ligne=None, ignorer=(), nb_workers=None):
+    """
+    Enrichit une liste de lignes en mémoire avec nb_workers domaines en parallèle (NB_WORKERS par défaut) ;
+    le débit de chaque registre est limité séparément. L'ordre des lignes est conservé.
+    apres_ligne(index, rows) est appelé (dans le thread appelant) après chaque ligne modifiée ;
+    les lignes dont l'index est dans ignorer (déjà traitées) sont laissées telles quelles.
+    """
+    rows = [dict(row) for row in rows]
+    a_traiter = [i for i in range(len(rows)) if i not in ignorer]
+    for i in a_traiter:
+        for col in COLONNES_WHOIS:
+            rows[i].setdefault(col, "")
+
+    def traiter(i):
+        ligne = dict(rows[i])
+        enrichir_ligne(ligne, f"({i+1}/{len(rows)}) ")
+        return i, ligne
+
+    with ThreadPoolExecutor(max_workers=nb_workers or NB_WORKERS, thread_name_prefix="whois") as executor:
+        futures = [executor.submit(traiter, i) for i in a_traiter]
+        for future in as_completed(futures):
+            try:
+                i, ligne = future.result()
+            except Exception as e:
+                print(f"⚠️ Erreur WHOIS : {e}")
+                continue
+            if ligne != rows[i]:
+                rows[i] = ligne
+                if apres_ligne:
+                    apres_ligne(i, rows)
+    return rows
+
+def enrichir_fichier(input_file=INPUT_FILE, output_file=OUTPUT_FILE, input_fallback=INPUT_FILE_FALLBACK):
     print("🚀 Démarrage de l'enrichissement WHOIS...")
     
-    if not os.path.exists(INPUT_FILE):
-        print(f"❌ Fichier d'entrée non trouvé : {INPUT_FILE}")
+    if not os.path.exists(input_file) and input_fallback:
+        input_file = input_fallback
+    
+    if not os.path.exists(input_file):
+        print(f"❌ Fichier d'entrée non trouvé : {input_file}")
         return
 
     rows = []
-    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+    with open(input_file, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         fieldnames = reader.fieldnames
         # Ajouter les nouvelles colonnes si elles n'existent pas
-        new_columns = ['Whois_Domain', 'Whois_Creation_Date', 'Whois_Expiration_Date', 'Whois_Registrar', 'Mail Whois', 'Whois_Name', 'Whois_Org', 'Whois_Address', 'Whois_City', 'Whois_Zipcode', 'Whois_Country', 'Whois_Updated_Date', 'Whois_Phone']
-        for col in new_columns:
+        for col in COLONNES_WHOIS:
             if col not in fieldnames:
                 fieldnames.append(col)
         
         for row in reader:
             rows.append(row)
 
-    print(f"📋 {len(rows)} lignes chargées depuis {INPUT_FILE}.")
+    print(f"📋 {len(rows)} lignes chargées depuis {input_file}.")
     
-    processed_count = 0
-    
-    for i, row in enumerate(rows):
-        # On essaie de trouver un domaine via le site web, sinon via l'email
-        site_web = row.get('Site web', '') or row.get('Site Web', '')
-        # Si pas de site web, on peut essayer de déduire d'autres champs si dispo, mais ici on reste simple
-        
-        domain = extract_domain(site_web)
-        
-        # Si on a déjà les infos, on ne refait pas (sauf si on veut forcer)
-        # if row.get('Whois_Domain') and row.get('Whois_Creation_Date'):
-        #     continue
-            
-        if domain:
-            print(f"Terminé ({i+1}/{len(rows)}) : Enrichment pour {domain}...")
-            
-            # 1. Tentative RDAP (Prioritaire pour .fr)
-            rdap_data = get_rdap_info_fr(domain)
-            
-            if rdap_data:
-                 print(f"  ✨ RDAP Success (AFNIC) !")
-                 row['Whois_Domain'] = domain
-                 row['Whois_Creation_Date'] = rdap_data['creation_date']
-                 row['Whois_Expiration_Date'] = rdap_data['expiration_date']
-                 row['Whois_Updated_Date'] = rdap_data['updated_date']
-                 row['Whois_Registrar'] = rdap_data['registrar']
-                 row['Mail Whois'] = format_list(rdap_data['emails'])
-                 row['Whois_Phone'] = format_list(rdap_data['phones'])
-                 row['Whois_Address'] = format_list(rdap_data['address'])
-                 row['Whois_City'] = format_list(rdap_data['city'])
-                 row['Whois_Zipcode'] = format_list(rdap_data['zipcode'])
-                 row['Whois_Country'] = format_list(rdap_data['country'])
-                 print(f"  ✅ Données trouvées (Créé le: {row['Whois_Creation_Date']}, Tel: {row['Whois_Phone']})")
-                 
-            else:
-                # 2. Fallback WHOIS Standard
-                w_info = get_whois_info(domain)
-                
-                if w_info:
-                    row['Whois_Domain'] = domain
-                    row['Whois_Creation_Date'] = format_date(w_info.creation_date)
-                    row['Whois_Expiration_Date'] = format_date(w_info.expiration_date)
-                    row['Whois_Registrar'] = w_info.registrar
-                    row['Mail Whois'] = format_list(w_info.emails)
-                    row['Whois_Name'] = format_list(w_info.name)
-                    row['Whois_Org'] = format_list(w_info.org)
-                    row['Whois_Address'] = format_list(w_info.address)
-                    row['Whois_City'] = format_list(w_info.city)
-                    row['Whois_Zipcode'] = format_list(w_info.zipcode)
-                    row['Whois_Country'] = format_list(w_info.country)
-                    row['Whois_Updated_Date'] = format_date(w_info.updated_date)
-                    
-                    # Tentative de récupération des téléphones (champs variables selon les TLD)
-                    phones = []
-                    for p_field in ['phone', 'registrant_phone', 'admin_phone', 'tech_phone', 'registrar_phone']:
-                        val = getattr(w_info, p_field, None) or w_info.get(p_field)
-                        if val:
-                            phones.append(str(val))
-                    row['Whois_Phone'] = ", ".join(list(set(phones)))
-                    
-                    print(f"  ✅ Données trouvées (Créé le: {row['Whois_Creation_Date']})")
-                else:
-                    row['Whois_Domain'] = domain
-                    print(f"  ❌ Pas de données WHOIS trouvées.")
-            
-            # Petite pause pour être gentil avec les serveurs WHOIS
-            time.sleep(random.uniform(0.5, 1.5))
-        else:
-            # print(f"  ⚠️ Pas de domaine extractible pour la ligne {i+1}")
-            pass
-            
-        processed_count += 1
-        
-        # Sauvegarde régulière (toutes les 5 lignes)
-        if processed_count % 5 == 0:
-            sauvegarder_resultats(OUTPUT_FILE, fieldnames, rows)
+    # Sauvegarde incrémentale : seules les lignes modifiées sont ajoutées au journal
+    # (reprise après interruption), le CSV est écrit une seule fois à la fin
+    journal = journal_resultats.JournalResultats(output_file)
+    deja_traitees = journal.rejouer(rows)
+    try:
+        rows = enrichir_lignes(rows, lambda index, lignes: journal.ecrire(index, lignes[index]), deja_traitees)
+    finally:
+        journal.fermer()
+
+    # Compactage final
+    journal.compacter(fieldnames, rows)
+    print(f"💾 Enrichissement terminé. Fichier sauvegardé : {output_file}")
 
-    # Sauvegarde finale
-    sauvegarder_resultats(OUTPUT_FILE, fieldnames, rows)
-    print(f"💾 Enrichissement terminé. Fichier sauvegardé : {OUTPUT_FILE}")
+def main():
+    parser = argparse.ArgumentParser(description="Enrichissement WHOIS / RDAP des domaines")
+    parser.add_argument("--entree", default=INPUT_FILE, help="Fichier CSV enrichi GMB")
+    parser.add_argument("--entree-secours", default=INPUT_FILE_FALLBACK,
+                        help="Fichier utilisé si --entree n'existe pas (sortie de la recherche des dirigeants)")
+    parser.add_argument("--sortie", default=OUTPUT_FILE, help="Fichier CSV final enrichi WHOIS")
+    args = parser.parse_args()
+    enrichir_fichier(args.entree, args.sortie, args.entree_secours)
 
 if __name__ == "__main__":
     main()
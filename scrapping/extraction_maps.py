@@ -0,0 +1,123 @@
+import urllib.parse
+
+# === EXTRACTION GOOGLE MAPS EN UN SEUL APPEL ===
+# Chaque find_elements / get_attribute est un aller-retour HTTP avec le driver.
+# Ici, un script injecté lit toute la page d'un coup et renvoie un objet structuré :
+# - urls  : liens vers les fiches (/maps/place/) ;
+# - liste : cartes de la liste de résultats (nom, téléphone, adresse, site, rangée de boutons affichée) ;
+# - fiche : panneau de fiche ouvert (nom, téléphone, site, adresse).
+# Utilisé par scraper.py et enrichisseur_gmb.py.
+
+# arguments[0] : false = seulement les URLs (boucle de scroll), true = tout le contenu
+SCRIPT_PAGE = r"""
+var details = arguments[0];
+var liens = Array.prototype.slice.call(document.querySelectorAll("a[href*='/maps/place/']"));
+var resultat = {urls: [], liste: [], fiche: {}};
+var vues = {};
+liens.forEach(function (lien) {
+    if (!vues[lien.href]) { vues[lien.href] = true; resultat.urls.push(lien.href); }
+});
+if (!details) return resultat;
+
+function texte(el) { return el ? (el.innerText || el.textContent || "").trim() : ""; }
+function attribut(el, nom) { return el ? (el.getAttribute(nom) || "") : ""; }
+
+var motifTel = /(?:\+33|0)\s?[1-9](?:[\s.-]?\d{2}){4}/;
+var motifAdresse = /\d.*\b(rue|av|avenue|bd|boulevard|chemin|route|place|all[ée]e|impasse|quai|cours|zac|za|lieu-dit)\b/i;
+
+// Cartes de la liste de résultats (la rangée de boutons affichée sans lien « Site Web »
+// signifie que l'établissement n'a pas de site)
+liens.forEach(function (lien) {
+    var carte = lien.closest("div[role='article']") || lien.parentElement;
+    var contenu = carte ? carte.innerText || "" : "";
+    var adresse = "";
+    contenu.split("\n").forEach(function (ligne) {
+        ligne.split("·").forEach(function (morceau) {
+            morceau = morceau.trim();
+            if (!adresse && motifAdresse.test(morceau) && !motifTel.test(morceau)) adresse = morceau;
+        });
+    });
+    var site = carte && carte.querySelector("a[data-value='Site Web'], a[data-value='Website'], a[aria-label*='site Web'], a[aria-label*='Website']");
+    resultat.liste.push({
+        url: lien.href,
+        nom: attribut(lien, "aria-label"),
+        tel: (contenu.match(motifTel) || [""])[0],
+        site: site ? site.href : "",
+        adresse: adresse,
+        actions: !!(carte && carte.querySelector("a[data-value], button[data-value]"))
+    });
+});
+
+// Panneau de fiche
+var tel = document.querySelector("button[data-item-id^='phone:tel:']") ||
+          document.querySelector("button[aria-label*='Appeler']") ||
+          document.querySelector("div[aria-label*='Appeler']");
+var site = document.querySelector("a[data-item-id*='authority']");
+var adresse = document.querySelector("button[data-item-id='address']");
+var adresseCopie = document.querySelector("button[aria-label*=\"Copier l'adresse\"] div");
+resultat.fiche = {
+    nom: texte(document.querySelector("h1")),
+    tel: attribut(tel, "aria-label") || texte(tel),
+    site: site ? site.href : "",
+    adresse: attribut(adresse, "aria-label") || texte(adresse) || texte(adresseCopie)
+};
+return resultat;
+"""
+
+PAGE_VIDE = {"urls": [], "liste": [], "fiche": {}}
+
+def lire_page(driver, details=True):
+    """Lit la page Maps courante en un seul execute_script (structure vide en cas d'erreur)."""
+    try:
+        return driver.execute_script(SCRIPT_PAGE, details) or PAGE_VIDE
+    except Exception as e:
+        print(f"  ⚠️ Lecture de la page Maps impossible : {e}")
+        return PAGE_VIDE
+
+def urls_fiches(driver):
+    """URLs des fiches présentes dans la page (sans lire le reste du contenu)."""
+    return lire_page(driver, details=False).get("urls", [])
+
+def fiches_liste(driver):
+    """Cartes de la liste de résultats, indexées par URL de fiche."""
+    return {fiche["url"]: fiche for fiche in lire_page(driver).get("liste", []) if fiche.get("url")}
+
+def lire_fiche(driver):
+    """Panneau de fiche ouvert : dictionnaire nom / tel / site / adresse, nettoyés."""
+    fiche = lire_page(driver).get("fiche") or {}
+    return {
+        "nom": fiche.get("nom", ""),
+        "tel": nettoyer_telephone(fiche.get("tel", "")),
+        "site": normaliser_site(fiche.get("site", "")),
+        "adresse": nettoyer_adresse(fiche.get("adresse", "")),
+    }
+
+def nettoyer_telephone(tel):
+    """Enlève les libellés des boutons ("Appeler le ", "Numéro de téléphone: "...)."""
+    if not tel:
+        return ""
+    for libelle in ["Appeler le ", "Appeler ", "Numéro de téléphone: ", "Numero de telephone: ", "Téléphone: "]:
+        tel = tel.replace(libelle, "")
+    return tel.strip()
+
+def nettoyer_adresse(adresse):
+    if not adresse:
+        return ""
+    for libelle in ["Adresse: ", "Adresse : ", "Address: "]:
+        adresse = adresse.replace(libelle, "")
+    return adresse.strip()
+
+def normaliser_site(site):
+    """Réduit l'URL du site à scheme://domaine/ (lien de redirection Google déballé)."""
+    if not site:
+        return ""
+    try:
+        parsed = urllib.parse.urlparse(site)
+        if "google." in parsed.netloc and parsed.path == "/url":
+            cible = urllib.parse.parse_qs(parsed.query).get("q", [""])[0]
+            parsed = urllib.parse.urlparse(cible) if cible else parsed
+        if parsed.netloc:
+            return f"{parsed.scheme}://{parsed.netloc}/"
+    except:
+        pass
+    return site
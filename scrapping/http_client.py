@@ -0,0 +1,90 @@
+import threading
+import urllib.parse
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# === CLIENT HTTP PARTAGÉ ===
+# Une requests.Session par hôte : les connexions TCP/TLS sont réutilisées d'un appel à l'autre
+# (et entre threads) au lieu d'être rouvertes à chaque requests.get.
+
+# Timeouts communs à toutes les étapes : (connexion, lecture)
+TIMEOUT = (5, 10)
+
+# Connexions gardées ouvertes par hôte (≥ nombre de threads qui interrogent le même hôte)
+TAILLE_POOL = 32
+
+# Nouvelles tentatives sur erreurs réseau et erreurs serveur transitoires.
+# Les 429 ne sont pas rejoués ici (ni leur Retry-After attendu) : c'est le rôle du limiteur (limiteur.py).
+TENTATIVES = 3
+BACKOFF = 0.5
+STATUTS_A_REJOUER = (500, 502, 503, 504)
+# Sites visités par l'enrichisseur : un site mort ne doit pas bloquer une page ~1 minute
+# (3 tentatives x timeouts) : pas de nouvelle tentative sur erreur réseau, une seule sur erreur serveur
+TENTATIVES_SITES = 1
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+# Nombre d'hôtes gardés en mémoire (les sites visités par l'enrichisseur sont très nombreux) :
+# au-delà, la session la moins récemment utilisée est oubliée. Elle n'est pas fermée explicitement
+# (un autre thread peut être en plein milieu d'une requête) : ses connexions sont libérées par le GC.
+MAX_HOTES = 256
+
+_sessions = OrderedDict()
+_lock = threading.Lock()
+
+def creer_session(tentatives=TENTATIVES, tentatives_reseau=TENTATIVES):
+    retry = Retry(
+        total=tentatives,
+        connect=tentatives_reseau,
+        read=tentatives_reseau,
+        backoff_factor=BACKOFF,
+        status_forcelist=STATUTS_A_REJOUER,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        raise_on_status=False,
+        # Sans cela, urllib3 rejoue aussi les 429 / 413 / 503 porteurs d'un Retry-After, en dormant le délai
+        # annoncé sans plafond : le 429 doit revenir tout de suite au limiteur (plafond, pénalité, reessais_429)
+        respect_retry_after_header=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=TAILLE_POOL, max_retries=retry)
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def session_pour(url, site=False):
+    """Session partagée (thread-safe) associée à l'hôte de l'URL (site=True : profil de tentatives des sites)."""
+    parsed = urllib.parse.urlsplit(url)
+    cle = (f"{parsed.scheme}://{parsed.netloc.lower()}", site)
+    with _lock:
+        session = _sessions.get(cle)
+        if session is None:
+            if site:
+                session = creer_session(TENTATIVES_SITES, 0)
+            else:
+                session = creer_session()
+            _sessions[cle] = session
+            if len(_sessions) > MAX_HOTES:
+                # Pas de close() : la session peut encore servir une requête dans un autre thread
+                _sessions.popitem(last=False)
+        else:
+            _sessions.move_to_end(cle)
+        return session
+
+def get(url, timeout=TIMEOUT, **kwargs):
+    """Équivalent de requests.get avec connexions réutilisées, nouvelles tentatives et timeouts communs."""
+    return session_pour(url).get(url, timeout=timeout, **kwargs)
+
+def get_site(url, timeout=TIMEOUT, **kwargs):
+    """Comme get(), pour les pages des sites d'entreprises : échec rapide si le site ne répond pas."""
+    return session_pour(url, site=True).get(url, timeout=timeout, **kwargs)
+
+def fermer():
+    """Ferme toutes les connexions ouvertes."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
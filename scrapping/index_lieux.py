@@ -0,0 +1,110 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
+
+# === CONFIGURATION ===
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+FICHIER_INDEX_LIEUX = os.path.join(CACHE_DIR, "lieux.sqlite")
+
+# Une fiche scrapée depuis moins de 30 jours est réutilisée telle quelle
+TTL_SECONDES = int(os.environ.get("PLOUF_INDEX_LIEUX_TTL", str(30 * 24 * 3600)))
+# PLOUF_INDEX_LIEUX=0 désactive l'index (toutes les fiches sont rescrapées)
+INDEX_ACTIF = os.environ.get("PLOUF_INDEX_LIEUX", "1") != "0"
+
+def identifiant_lieu(url):
+    """
+    Identifiant stable d'un lieu Google Maps extrait d'une URL /maps/place/ :
+    identifiant de fiche (!1s0x...:0x..., présent dans les liens de la liste de résultats) en priorité,
+    sinon place id (!19sChIJ...).
+    Retourne None si l'URL n'en contient pas.
+    """
+    if not url:
+        return None
+    url = urllib.parse.unquote(url)
+    match = re.search(r"!1s(0x[0-9a-fA-F]+:0x[0-9a-fA-F]+)", url)
+    if match:
+        return match.group(1).lower()
+    match = re.search(r"!19s(ChIJ[^!?&/]+)", url)
+    if match:
+        return match.group(1)
+    return None
+
+class IndexLieux:
+    """
+    Index persistant (SQLite) des fiches Google Maps déjà scrapées, par identifiant de lieu,
+    avec la date du dernier scraping. Partagé entre mots-clés et exécutions.
+    """
+
+    def __init__(self, chemin=FICHIER_INDEX_LIEUX, ttl=TTL_SECONDES):
+        self.chemin = chemin
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        self.connexion = sqlite3.connect(chemin, check_same_thread=False)
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        self.connexion.execute("""
+            CREATE TABLE IF NOT EXISTS lieux (
+                identifiant TEXT PRIMARY KEY,
+                nom TEXT,
+                telephone TEXT,
+                site TEXT,
+                adresse TEXT,
+                url TEXT,
+                date_scraping REAL NOT NULL
+            )
+        """)
+        self.connexion.commit()
+
+    def obtenir(self, identifiant):
+        """Retourne (nom, téléphone, site, adresse) si la fiche a été scrapée il y a moins de ttl, sinon None."""
+        if not identifiant:
+            return None
+        with self.lock:
+            entree = self.connexion.execute(
+                "SELECT nom, telephone, site, adresse, date_scraping FROM lieux WHERE identifiant = ?", (identifiant,)
+            ).fetchone()
+        if entree is None or time.time() - entree[4] >= self.ttl:
+            return None
+        return entree[0], entree[1], entree[2], entree[3]
+
+    def enregistrer(self, identifiant, nom, tel, site, adresse, url=""):
+        if not identifiant or not nom:
+            return
+        with self.lock:
+            self.connexion.execute(
+                "INSERT OR REPLACE INTO lieux (identifiant, nom, telephone, site, adresse, url, date_scraping) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (identifiant, nom, tel, site, adresse, url, time.time())
+            )
+            self.connexion.commit()
+
+    def oublier(self, identifiant=None):
+        """Supprime une fiche (ou tout l'index) pour forcer un nouveau scraping."""
+        with self.lock:
+            if identifiant is None:
+                curseur = self.connexion.execute("DELETE FROM lieux")
+            else:
+                curseur = self.connexion.execute("DELETE FROM lieux WHERE identifiant = ?", (identifiant,))
+            self.connexion.commit()
+            return curseur.rowcount
+
+    def fermer(self):
+        with self.lock:
+            self.connexion.close()
+
+_index_partage = None
+_index_lock = threading.Lock()
+
+def index_partage():
+    """Index commun au processus (None si désactivé)."""
+    global _index_partage
+    if not INDEX_ACTIF:
+        return None
+    with _index_lock:
+        if _index_partage is None:
+            _index_partage = IndexLieux()
+        return _index_partage
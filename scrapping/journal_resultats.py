@@ -0,0 +1,79 @@
+import os
+import csv
+import json
+import threading
+
+# === JOURNAL INCRÉMENTAL DES RÉSULTATS ===
+# Pendant un enrichissement (GMB, WHOIS), seules les lignes modifiées sont ajoutées en fin de journal
+# (<fichier de sortie>.journal, une ligne JSON par ligne modifiée) : une écriture de quelques centaines
+# d'octets au lieu de la réécriture de tout le CSV. À la fin, le CSV est écrit une seule fois
+# (compactage) et le journal supprimé. Après une interruption, le journal est rejoué au redémarrage.
+
+class JournalResultats:
+
+    def __init__(self, fichier_sortie):
+        self.fichier_sortie = fichier_sortie
+        self.chemin = f"{fichier_sortie}.journal"
+        self.lock = threading.Lock()
+        self.fichier = None
+
+    def relire(self):
+        """Lignes journalisées par un traitement interrompu : {index: ligne} (la dernière version l'emporte)."""
+        lignes = {}
+        if not os.path.exists(self.chemin):
+            return lignes
+        with open(self.chemin, 'r', encoding='utf-8') as f:
+            for texte in f:
+                try:
+                    entree = json.loads(texte)
+                except ValueError:
+                    # Dernière ligne tronquée par l'interruption
+                    continue
+                lignes[entree["index"]] = entree["ligne"]
+        return lignes
+
+    def rejouer(self, rows):
+        """Réapplique le journal sur les lignes chargées ; retourne les index restaurés."""
+        restaurees = set()
+        for index, ligne in self.relire().items():
+            if index < len(rows):
+                rows[index].update(ligne)
+                restaurees.add(index)
+        if restaurees:
+            print(f"♻️ {len(restaurees)} ligne(s) reprise(s) du journal {os.path.basename(self.chemin)}")
+        return restaurees
+
+    def ecrire(self, index, ligne):
+        """Ajoute une ligne modifiée en fin de journal."""
+        texte = json.dumps({"index": index, "ligne": ligne}, ensure_ascii=False) + "\n"
+        with self.lock:
+            if self.fichier is None:
+                dossier = os.path.dirname(self.chemin)
+                if dossier:
+                    os.makedirs(dossier, exist_ok=True)
+                self.fichier = open(self.chemin, 'a', encoding='utf-8')
+            self.fichier.write(texte)
+            self.fichier.flush()
+
+    def fermer(self):
+        with self.lock:
+            if self.fichier is not None:
+                self.fichier.close()
+                self.fichier = None
+
+    def compacter(self, fieldnames, rows):
+        """Écrit le CSV final (fichier temporaire puis remplacement atomique) et supprime le journal."""
+        self.fermer()
+        dossier = os.path.dirname(self.fichier_sortie)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        temporaire = f"{self.fichier_sortie}.tmp"
+        with open(temporaire, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporaire, self.fichier_sortie)
+        if os.path.exists(self.chemin):
+            os.remove(self.chemin)
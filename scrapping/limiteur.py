@@ -0,0 +1,174 @@
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# === LIMITATION DE DÉBIT ET DISJONCTEURS PAR FOURNISSEUR ===
+# Un Fournisseur (API, registre...) combine :
+# - un seau à jetons dont le débit baisse de moitié à chaque 429 (et respecte Retry-After)
+#   puis remonte progressivement tant que les réponses sont bonnes ;
+# - un disjoncteur qui, après plusieurs échecs consécutifs (erreurs serveur ou réseau), fait ignorer
+#   le fournisseur pendant un moment au lieu d'attendre des timeouts sur chaque ligne.
+# Un 429 n'est pas un échec : la requête attend Retry-After (ou le débit réduit) et est refaite
+# auprès du même fournisseur, pour ne pas dégrader le résultat en passant au suivant.
+
+# Attente maximale acceptée sur un 429 avant de réessayer (secondes) ; au-delà, TropDeRequetes est levée
+ATTENTE_MAX_429 = 30
+
+class ErreurFournisseur(Exception):
+    pass
+
+class TropDeRequetes(ErreurFournisseur):
+    """Le fournisseur a répondu 429."""
+    def __init__(self, nom, retry_after=None):
+        super().__init__(f"{nom} : trop de requêtes (429)" + (f", réessayer dans {retry_after:.0f}s" if retry_after else ""))
+        self.retry_after = retry_after
+
+class CircuitOuvert(ErreurFournisseur):
+    """Le fournisseur est temporairement ignoré après des échecs répétés."""
+    def __init__(self, nom):
+        super().__init__(f"{nom} : temporairement désactivé (trop d'échecs)")
+
+def lire_retry_after(valeur):
+    """En-tête Retry-After (secondes ou date HTTP) -> secondes, ou None."""
+    if not valeur:
+        return None
+    try:
+        return max(0.0, float(valeur))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(valeur)
+        return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+    except Exception:
+        return None
+
+class LimiteurDebit:
+    """Seau à jetons adaptatif (augmentation additive, diminution multiplicative). Thread-safe."""
+
+    def __init__(self, debit, capacite=None, debit_min=None):
+        self.debit_max = float(debit)
+        self.debit = float(debit)
+        self.debit_min = float(debit_min) if debit_min else self.debit_max / 10
+        self.capacite = capacite or max(1.0, self.debit_max)
+        self.jetons = self.capacite
+        self.dernier = time.monotonic()
+        self.pause_jusqua = 0.0
+        self.lock = threading.Lock()
+
+    def acquerir(self):
+        """Bloque jusqu'à ce qu'une requête soit autorisée."""
+        while True:
+            with self.lock:
+                maintenant = time.monotonic()
+                if maintenant < self.pause_jusqua:
+                    attente = self.pause_jusqua - maintenant
+                else:
+                    self.jetons = min(self.capacite, self.jetons + (maintenant - self.dernier) * self.debit)
+                    self.dernier = maintenant
+                    if self.jetons >= 1:
+                        self.jetons -= 1
+                        return
+                    attente = (1 - self.jetons) / self.debit
+            time.sleep(attente)
+
+    def penaliser(self, retry_after=None):
+        """Réponse 429 : débit divisé par deux et pause (Retry-After ou 1s)."""
+        with self.lock:
+            self.debit = max(self.debit_min, self.debit / 2)
+            self.pause_jusqua = max(self.pause_jusqua, time.monotonic() + (retry_after if retry_after is not None else 1.0))
+            self.jetons = 0
+            self.dernier = self.pause_jusqua
+
+    def succes(self):
+        with self.lock:
+            self.debit = min(self.debit_max, self.debit + self.debit_max / 20)
+
+class Disjoncteur:
+    """Fermé -> ouvert après `seuil_echecs` échecs consécutifs ; une requête d'essai après `duree_ouverture`."""
+
+    FERME = "fermé"
+    OUVERT = "ouvert"
+    DEMI_OUVERT = "demi-ouvert"
+
+    def __init__(self, seuil_echecs=5, duree_ouverture=60):
+        self.seuil_echecs = seuil_echecs
+        self.duree_ouverture = duree_ouverture
+        self.etat = self.FERME
+        self.echecs = 0
+        self.ouvert_depuis = 0.0
+        self.essai_en_cours = False
+        self.lock = threading.Lock()
+
+    def autoriser(self):
+        with self.lock:
+            if self.etat == self.FERME:
+                return True
+            if self.etat == self.OUVERT and time.monotonic() - self.ouvert_depuis >= self.duree_ouverture:
+                self.etat = self.DEMI_OUVERT
+                self.essai_en_cours = False
+            if self.etat == self.DEMI_OUVERT and not self.essai_en_cours:
+                self.essai_en_cours = True
+                return True
+            return False
+
+    def succes(self):
+        with self.lock:
+            self.etat = self.FERME
+            self.echecs = 0
+            self.essai_en_cours = False
+
+    def abandonner(self):
+        """Requête sans verdict (429) : la requête d'essai d'un disjoncteur demi-ouvert peut être refaite."""
+        with self.lock:
+            self.essai_en_cours = False
+
+    def echec(self):
+        with self.lock:
+            self.echecs += 1
+            if self.etat == self.DEMI_OUVERT or self.echecs >= self.seuil_echecs:
+                if self.etat != self.OUVERT:
+                    print(f"🔌 Disjoncteur ouvert pour {self.duree_ouverture}s ({self.echecs} échecs)")
+                self.etat = self.OUVERT
+                self.ouvert_depuis = time.monotonic()
+                self.essai_en_cours = False
+
+class Fournisseur:
+    """Limiteur + disjoncteur d'un service externe ; un 429 est réessayé jusqu'à reessais_429 fois."""
+
+    def __init__(self, nom, debit, seuil_echecs=5, duree_ouverture=60, reessais_429=3):
+        self.nom = nom
+        self.limiteur = LimiteurDebit(debit)
+        self.disjoncteur = Disjoncteur(seuil_echecs, duree_ouverture)
+        self.reessais_429 = reessais_429
+
+    def executer(self, requete):
+        """
+        Exécute requete() (qui retourne une réponse HTTP) en respectant le débit.
+        Sur un 429, attend Retry-After (ou le débit réduit) puis refait la requête, au plus reessais_429 fois.
+        Lève CircuitOuvert si le fournisseur est désactivé, TropDeRequetes si les 429 persistent,
+        ErreurFournisseur sur une erreur serveur ; les erreurs réseau sont propagées.
+        """
+        for tentative in range(self.reessais_429 + 1):
+            if not self.disjoncteur.autoriser():
+                raise CircuitOuvert(self.nom)
+            self.limiteur.acquerir()
+            try:
+                reponse = requete()
+            except Exception:
+                self.disjoncteur.echec()
+                raise
+            if reponse.status_code == 429:
+                retry_after = lire_retry_after(reponse.headers.get("Retry-After"))
+                # Le seau fait attendre la prochaine requête (Retry-After ou 1s) et réduit le débit
+                self.limiteur.penaliser(retry_after)
+                self.disjoncteur.abandonner()
+                if tentative < self.reessais_429 and (retry_after is None or retry_after <= ATTENTE_MAX_429):
+                    continue
+                raise TropDeRequetes(self.nom, retry_after)
+            if reponse.status_code >= 500:
+                self.disjoncteur.echec()
+                raise ErreurFournisseur(f"{self.nom} : erreur serveur {reponse.status_code}")
+            self.limiteur.succes()
+            self.disjoncteur.succes()
+            return reponse
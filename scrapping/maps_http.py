@@ -0,0 +1,153 @@
+import os
+import re
+import json
+import urllib.parse
+
+import requests
+
+import http_client
+import limiteur
+
+# === RECHERCHE GOOGLE MAPS EN HTTP SIMPLE (VOIE RAPIDE) ===
+# La page de recherche Google Maps embarque les résultats dans window.APP_INITIALIZATION_STATE
+# (chaînes JSON préfixées par ")]}'"). On les lit directement, sans navigateur.
+# Si la page est bloquée (429, /sorry/, consentement) ou ne contient aucun résultat,
+# rechercher() retourne une liste vide et scraper.py passe par Selenium.
+# Le format n'est pas documenté : les champs sont lus par position, avec des valeurs par défaut.
+
+# PLOUF_MAPS_HTTP=0 désactive la voie rapide
+MAPS_HTTP_ACTIF = os.environ.get("PLOUF_MAPS_HTTP", "1") != "0"
+
+URL_RECHERCHE = "https://www.google.com/maps/search/{requete}?hl=fr"
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Language": "fr-FR,fr;q=0.9",
+}
+# Cookies de consentement : évite la redirection vers consent.google.com
+COOKIES = {"CONSENT": "YES+", "SOCS": "CAI"}
+
+# Débit modéré et désactivation pendant 10 minutes après 3 blocages consécutifs
+FOURNISSEUR = limiteur.Fournisseur("Google Maps HTTP", debit=2, seuil_echecs=3, duree_ouverture=600, reessais_429=0)
+
+PREFIXE_JSON = ")]}'"
+
+class MapsBloque(Exception):
+    """Google a refusé la requête (page /sorry/, consentement ou 429)."""
+
+# --- Analyse du contenu ---
+
+def _valeur(donnees, *chemin):
+    """donnees[i][j]... ou "" si un indice manque."""
+    for indice in chemin:
+        try:
+            donnees = donnees[indice]
+        except (IndexError, KeyError, TypeError):
+            return ""
+    return donnees if donnees is not None else ""
+
+def _charger_json(texte):
+    texte = texte.strip()
+    if texte.startswith(PREFIXE_JSON):
+        texte = texte[len(PREFIXE_JSON):]
+    try:
+        return json.loads(texte)
+    except ValueError:
+        return None
+
+def _blocs_json(contenu):
+    """Structures JSON embarquées : réponse ")]}'" directe ou chaînes de APP_INITIALIZATION_STATE."""
+    if contenu.lstrip().startswith(PREFIXE_JSON):
+        donnees = _charger_json(contenu)
+        return [donnees] if donnees is not None else []
+    match = re.search(r"window\.APP_INITIALIZATION_STATE\s*=\s*(.*?);\s*window\.APP_FLAGS", contenu, re.S)
+    if not match:
+        return []
+    etat = _charger_json(match.group(1))
+    if etat is None:
+        return []
+    blocs = []
+    a_visiter = [etat]
+    while a_visiter:
+        element = a_visiter.pop()
+        if isinstance(element, list):
+            a_visiter.extend(element)
+        elif isinstance(element, str) and element.startswith(PREFIXE_JSON):
+            donnees = _charger_json(element)
+            if donnees is not None:
+                blocs.append(donnees)
+    return blocs
+
+def _est_lieu(donnees):
+    """Bloc de données d'un lieu : identifiant de fiche "0x...:0x..." en [10] et nom en [11]."""
+    return (
+        isinstance(donnees, list)
+        and len(donnees) > 11
+        and isinstance(donnees[10], str)
+        and re.fullmatch(r"0x[0-9a-fA-F]+:0x[0-9a-fA-F]+", donnees[10]) is not None
+        and isinstance(donnees[11], str)
+    )
+
+def _lieux(donnees):
+    """Parcourt la structure et retourne les blocs de lieux dans l'ordre d'apparition."""
+    lieux = []
+    a_visiter = [donnees]
+    while a_visiter:
+        element = a_visiter.pop(0)
+        if _est_lieu(element):
+            lieux.append(element)
+        elif isinstance(element, list):
+            a_visiter[0:0] = element
+    return lieux
+
+def url_fiche(identifiant, nom=""):
+    """URL /maps/place/ reconnue par index_lieux.identifiant_lieu (même format que la liste de résultats)."""
+    return f"https://www.google.com/maps/place/{urllib.parse.quote(nom or 'lieu')}/data=!4m2!3m1!1s{identifiant}"
+
+def lieu_vers_fiche(lieu):
+    site = _valeur(lieu, 7, 0)
+    return {
+        "url": url_fiche(lieu[10], lieu[11]),
+        "nom": lieu[11],
+        "tel": _valeur(lieu, 178, 0, 0) or "",
+        "site": site,
+        "adresse": _valeur(lieu, 39) or _valeur(lieu, 18) or "",
+        # Le bloc est complet : pas de site en [7] = pas de site web
+        "actions": True,
+    }
+
+def extraire_fiches(contenu):
+    """Fiches (url, nom, tel, site, adresse, actions) contenues dans une page ou une réponse Maps."""
+    fiches = []
+    vues = set()
+    for bloc in _blocs_json(contenu):
+        for lieu in _lieux(bloc):
+            if lieu[10] in vues:
+                continue
+            vues.add(lieu[10])
+            fiches.append(lieu_vers_fiche(lieu))
+    return fiches
+
+def verifier_reponse(reponse):
+    """Lève MapsBloque si Google a renvoyé une page de blocage ou de consentement."""
+    if reponse.status_code in (403, 429) or "/sorry/" in reponse.url or "consent.google" in reponse.url:
+        raise MapsBloque(f"Google Maps a bloqué la requête ({reponse.status_code} {reponse.url})")
+
+# --- Requête ---
+
+def rechercher(mot_cle, max_fiches=20):
+    """Fiches d'une recherche Google Maps en HTTP simple ; liste vide si bloqué ou sans résultat."""
+    url = URL_RECHERCHE.format(requete=urllib.parse.quote(mot_cle))
+    try:
+        reponse = FOURNISSEUR.executer(lambda: http_client.get(url, headers=HEADERS, cookies=COOKIES))
+        verifier_reponse(reponse)
+    except limiteur.CircuitOuvert:
+        return []
+    except (limiteur.TropDeRequetes, MapsBloque) as e:
+        # Pour Google, un 429 est un blocage : pas de nouvel essai, il compte pour le disjoncteur
+        FOURNISSEUR.disjoncteur.echec()
+        print(f"  ⚠️ {e}")
+        return []
+    except (limiteur.ErreurFournisseur, requests.RequestException) as e:
+        print(f"  ⚠️ Recherche HTTP impossible : {e}")
+        return []
+    return extraire_fiches(reponse.text)[:max_fiches]
@@ -0,0 +1,197 @@
+import os
+import threading
+import time
+
+import psutil
+
+# === SURVEILLANCE MÉMOIRE DES NAVIGATEURS ===
+# Un thread échantillonne régulièrement la mémoire résidente (RSS) de chaque navigateur
+# (driver + processus du navigateur et de ses onglets) et son nombre de pages chargées.
+# Un navigateur est marqué pour recyclage s'il dépasse MAX_RSS_MO, ou si l'ensemble des navigateurs
+# dépasse le budget global (les plus gros d'abord) ; il est recyclé par le pool à son retour
+# (immédiatement s'il est inoccupé). Un nouveau navigateur ne démarre que si le budget le permet.
+
+# Mémoire maximale d'un navigateur (Mo ; 0 = pas de limite)
+MAX_RSS_MO = int(os.environ.get("PLOUF_POOL_MAX_RSS_MO", "1500"))
+# Budget mémoire commun à tous les navigateurs du processus (Mo ; par défaut 75 % de la RAM)
+BUDGET_MO = int(os.environ.get("PLOUF_BUDGET_MEMOIRE_MO", "0")) or int(psutil.virtual_memory().total * 0.75 / 2**20)
+# Intervalle entre deux échantillons (secondes)
+INTERVALLE = float(os.environ.get("PLOUF_MEMOIRE_INTERVALLE", "5"))
+# Estimation d'un navigateur qui démarre, tant qu'aucun n'a été mesuré (Mo)
+ESTIMATION_DEMARRAGE_MO = 400
+
+def pid_navigateur(driver):
+    """PID du processus du driver (geckodriver / chromedriver), parent du navigateur."""
+    try:
+        return driver.service.process.pid
+    except:
+        return None
+
+def rss_mo(driver):
+    """Mémoire résidente (Mo) du driver et de tous ses processus enfants ; None si non mesurable."""
+    pid = pid_navigateur(driver)
+    if pid is None:
+        return None
+    try:
+        processus = psutil.Process(pid)
+        famille = [processus] + processus.children(recursive=True)
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return None
+    total = 0
+    for p in famille:
+        try:
+            total += p.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    return total / 2**20
+
+class SurveillanceMemoire:
+    """Mesures et seuils mémoire des navigateurs suivis (pool_navigateurs.Bail). Thread-safe."""
+
+    def __init__(self, budget_mo=BUDGET_MO, max_rss_mo=MAX_RSS_MO, intervalle=INTERVALLE):
+        self.budget_mo = budget_mo
+        self.max_rss_mo = max_rss_mo
+        self.intervalle = intervalle
+        self.lock = threading.Lock()
+        self.baux = {}  # id(bail) -> bail
+        self.mesures = {}  # id(bail) -> RSS en Mo
+        self.rappels = []
+        self.thread = None
+        self.arret = threading.Event()
+        self.stats = {"echantillons": 0, "recycles_memoire": 0, "recycles_budget": 0, "max_total_mo": 0.0}
+
+    # --- Navigateurs suivis ---
+
+    def suivre(self, bail):
+        with self.lock:
+            self.baux[id(bail)] = bail
+        self.demarrer()
+
+    def oublier(self, bail):
+        with self.lock:
+            self.baux.pop(id(bail), None)
+            self.mesures.pop(id(bail), None)
+
+    def abonner(self, rappel):
+        """rappel() est appelé après chaque vérification (le pool y recycle ses navigateurs inoccupés marqués)."""
+        with self.lock:
+            self.rappels.append(rappel)
+
+    def desabonner(self, rappel):
+        with self.lock:
+            if rappel in self.rappels:
+                self.rappels.remove(rappel)
+
+    # --- Mesures ---
+
+    def mesurer(self, bail):
+        memoire = rss_mo(bail.driver)
+        with self.lock:
+            if memoire is not None and id(bail) in self.baux:
+                self.mesures[id(bail)] = memoire
+        return memoire
+
+    def total_mo(self):
+        with self.lock:
+            return sum(self.mesures.values())
+
+    def estimation_navigateur_mo(self):
+        with self.lock:
+            if not self.mesures:
+                return ESTIMATION_DEMARRAGE_MO
+            return sum(self.mesures.values()) / len(self.mesures)
+
+    def budget_disponible(self):
+        """Un navigateur de plus tient-il dans le budget ?"""
+        if not self.budget_mo:
+            return True
+        return self.total_mo() + self.estimation_navigateur_mo() <= self.budget_mo
+
+    def verifier(self):
+        """Échantillonne tous les navigateurs et marque ceux à recycler (seuil individuel puis budget global)."""
+        with self.lock:
+            baux = list(self.baux.values())
+        for bail in baux:
+            self.mesurer(bail)
+        with self.lock:
+            mesures = {id(b): self.mesures.get(id(b), 0) for b in baux}
+            total = sum(mesures.values())
+            self.stats["echantillons"] += 1
+            self.stats["max_total_mo"] = max(self.stats["max_total_mo"], total)
+            for bail in baux:
+                if self.max_rss_mo and mesures[id(bail)] > self.max_rss_mo and not bail.recycler:
+                    bail.recycler = f"{mesures[id(bail)]:.0f} Mo"
+                    self.stats["recycles_memoire"] += 1
+            if self.budget_mo and total > self.budget_mo:
+                # Les plus gros d'abord, jusqu'à revenir sous le budget (on en garde toujours un)
+                restant = total - sum(mesures[id(b)] for b in baux if b.recycler)
+                candidats = sorted((b for b in baux if not b.recycler), key=lambda b: mesures[id(b)], reverse=True)
+                for bail in candidats[:-1]:
+                    if restant <= self.budget_mo:
+                        break
+                    bail.recycler = f"budget global {total:.0f}/{self.budget_mo} Mo"
+                    restant -= mesures[id(bail)]
+                    self.stats["recycles_budget"] += 1
+            rappels = list(self.rappels)
+        for rappel in rappels:
+            try:
+                rappel()
+            except Exception as e:
+                print(f"⚠️ Surveillance mémoire : {e}")
+        return total
+
+    # --- Thread d'échantillonnage ---
+
+    def demarrer(self):
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return self
+            self.arret.clear()
+            self.thread = threading.Thread(target=self._boucle, name="surveillance-memoire", daemon=True)
+            self.thread.start()
+        return self
+
+    def _boucle(self):
+        while not self.arret.wait(self.intervalle):
+            self.verifier()
+
+    def arreter(self):
+        self.arret.set()
+
+    def metriques(self):
+        """Mesures courantes : mémoire de chaque navigateur, pages chargées, total et budget."""
+        with self.lock:
+            baux = list(self.baux.values())
+            mesures = dict(self.mesures)
+            stats = dict(self.stats)
+        maintenant = time.monotonic()
+        navigateurs = [
+            {"rss_mo": round(mesures.get(id(b), 0), 1), "pages": b.pages, "age_s": round(maintenant - b.cree_le),
+             "a_recycler": bool(b.recycler)}
+            for b in baux
+        ]
+        stats["max_total_mo"] = round(stats["max_total_mo"], 1)
+        return {
+            "total_mo": round(sum(mesures.values()), 1),
+            "budget_mo": self.budget_mo,
+            "max_navigateur_mo": self.max_rss_mo,
+            "navigateurs": navigateurs,
+            **stats,
+        }
+
+    def resume(self):
+        m = self.metriques()
+        return (f"{len(m['navigateurs'])} navigateur(s), {m['total_mo']:.0f}/{m['budget_mo']} Mo "
+                f"(pic {m['max_total_mo']:.0f} Mo), recyclages : {m['recycles_memoire']} seuil, "
+                f"{m['recycles_budget']} budget")
+
+_surveillance_partagee = None
+_surveillance_lock = threading.Lock()
+
+def surveillance_partagee():
+    """Surveillance commune au processus : tous les pools partagent le même budget."""
+    global _surveillance_partagee
+    with _surveillance_lock:
+        if _surveillance_partagee is None:
+            _surveillance_partagee = SurveillanceMemoire()
+        return _surveillance_partagee
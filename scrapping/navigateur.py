@@ -0,0 +1,232 @@
+import os
+import glob
+import shutil
+import threading
+import time
+import functools
+
+# === BLOCAGE DES RESSOURCES LOURDES DANS LES NAVIGATEURS ===
+# Pour extraire du texte, les images, polices, vidéos, tuiles de carte et scripts de mesure d'audience
+# ne servent à rien : ils coûtent de la bande passante et du CPU sur les machines de scraping.
+# Le profil appliqué se règle avec PLOUF_BLOCAGE : liste de catégories séparées par des virgules
+# (par défaut toutes), ou "aucun" pour tout charger.
+#
+# - Chrome : préférences de contenu + Network.setBlockedURLs (motifs d'URL, via CDP) ;
+# - Firefox : préférences par type de ressource + fichier PAC qui envoie les hôtes bloqués
+#   vers un proxy inexistant (Firefox ne voit que l'hôte des URL https dans un PAC).
+
+CATEGORIES = {
+    "image": {
+        "motifs": ["*.png", "*.png?*", "*.jpg", "*.jpg?*", "*.jpeg", "*.gif", "*.webp", "*.ico", "*.svg"],
+        "hotes": ["googleusercontent.com", "streetviewpixels-pa.googleapis.com"],
+    },
+    "font": {
+        "motifs": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+        "hotes": ["fonts.gstatic.com", "fonts.googleapis.com"],
+    },
+    "media": {
+        "motifs": ["*.mp4", "*.webm", "*.mp3", "*.ogg", "*.m3u8"],
+        "hotes": [],
+    },
+    "tuiles": {
+        "motifs": ["*google.com/maps/vt*", "*google.fr/maps/vt*", "*/maps/rpc/vt*", "*/kh/v=*"],
+        "hotes": ["khms0.google.com", "khms1.google.com", "khms2.google.com", "khms3.google.com",
+                  "mt0.google.com", "mt1.google.com", "mt2.google.com", "mt3.google.com"],
+    },
+    "analytics": {
+        "motifs": ["*/gen_204*", "*/log?format=*", "*/maps/preview/log204*"],
+        "hotes": ["google-analytics.com", "googletagmanager.com", "doubleclick.net",
+                  "googlesyndication.com", "googleadservices.com"],
+    },
+}
+
+def categories_actives(valeur=None):
+    """Catégories bloquées d'après PLOUF_BLOCAGE (ou la valeur fournie)."""
+    valeur = valeur if valeur is not None else os.environ.get("PLOUF_BLOCAGE", ",".join(CATEGORIES))
+    valeur = valeur.strip().lower()
+    if valeur in ("", "aucun", "0", "non"):
+        return []
+    return [c.strip() for c in valeur.split(",") if c.strip() in CATEGORIES]
+
+def motifs_bloques(categories):
+    motifs = []
+    for categorie in categories:
+        motifs.extend(CATEGORIES[categorie]["motifs"])
+        motifs.extend(f"*{hote}*" for hote in CATEGORIES[categorie]["hotes"])
+    return motifs
+
+def hotes_bloques(categories):
+    return [hote for categorie in categories for hote in CATEGORIES[categorie]["hotes"]]
+
+# --- Chrome ---
+
+def options_chrome(options, categories=None):
+    """Préférences Chrome (à appliquer avant la création du driver)."""
+    categories = categories_actives() if categories is None else categories
+    prefs = {}
+    if "image" in categories:
+        prefs["profile.managed_default_content_settings.images"] = 2
+        options.add_argument("--blink-settings=imagesEnabled=false")
+    if "media" in categories:
+        options.add_argument("--autoplay-policy=user-gesture-required")
+    if "tuiles" in categories:
+        # La carte est dessinée en WebGL : sans GPU ni WebGL, pas de rendu de tuiles
+        options.add_argument("--disable-webgl")
+    if prefs:
+        options.add_experimental_option("prefs", prefs)
+    return options
+
+def appliquer_chrome(driver, categories=None):
+    """Blocage par motif d'URL via le protocole DevTools (à appeler juste après la création du driver)."""
+    categories = categories_actives() if categories is None else categories
+    motifs = motifs_bloques(categories)
+    if not motifs:
+        return driver
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": motifs})
+    except Exception as e:
+        print(f"⚠️ Blocage des ressources indisponible sur ce driver : {e}")
+    return driver
+
+# --- Firefox ---
+
+def script_pac(hotes):
+    conditions = " ||\n        ".join(f'dnsDomainIs(host, "{hote}") || host == "{hote}"' for hote in hotes)
+    return (
+        "function FindProxyForURL(url, host) {\n"
+        f"    if ({conditions}) return \"PROXY 127.0.0.1:9\";\n"
+        "    return \"DIRECT\";\n"
+        "}\n"
+    )
+
+def options_firefox(options, categories=None):
+    """Préférences Firefox (à appliquer avant la création du driver)."""
+    categories = categories_actives() if categories is None else categories
+    if "image" in categories:
+        options.set_preference("permissions.default.image", 2)
+    if "font" in categories:
+        options.set_preference("gfx.downloadable_fonts.enabled", False)
+    if "media" in categories:
+        options.set_preference("media.autoplay.default", 5)
+        options.set_preference("media.autoplay.blocking_policy", 2)
+    if "tuiles" in categories:
+        options.set_preference("webgl.disabled", True)
+    hotes = hotes_bloques(categories)
+    if hotes:
+        import urllib.parse
+        options.set_preference("network.proxy.type", 2)
+        options.set_preference("network.proxy.autoconfig_url",
+                               "data:application/x-ns-proxy-autoconfig," + urllib.parse.quote(script_pac(hotes)))
+    return options
+
+def appliquer(driver, categories=None):
+    """Blocage après création, quel que soit le navigateur (seul Chrome en a besoin)."""
+    if hasattr(driver, "execute_cdp_cmd"):
+        appliquer_chrome(driver, categories)
+    return driver
+
+# === FABRIQUE DE DRIVERS ===
+# Les binaires (navigateur et driver) sont résolus une seule fois par processus puis mis en cache :
+# recréer un driver (recyclage, reprise après erreur) ne coûte plus que le démarrage du navigateur.
+# Ordre de résolution : variable d'environnement, driver fourni dans scrapping/chromedriver/,
+# PATH, puis webdriver-manager en dernier recours (réseau / cache disque).
+# Chaque phase du démarrage est chronométrée (STATS_DEMARRAGE).
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CHROMEDRIVER_DIR = os.path.join(BASE_DIR, "chromedriver")
+CHEMINS_FIREFOX = ["/usr/lib/firefox/firefox", "/usr/bin/firefox", "/usr/local/bin/firefox"]
+
+class StatistiquesDemarrage:
+    """Durée cumulée et nombre de démarrages par phase (résolution, lancement, configuration). Thread-safe."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.donnees = {}
+
+    def enregistrer(self, phase, duree):
+        with self.lock:
+            total, nombre = self.donnees.get(phase, (0.0, 0))
+            self.donnees[phase] = (total + duree, nombre + 1)
+
+    def resume(self):
+        with self.lock:
+            if not self.donnees:
+                return "aucun démarrage"
+            return " | ".join(
+                f"{phase} : {total:.1f}s / {nombre} (moy. {total / nombre:.2f}s)"
+                for phase, (total, nombre) in sorted(self.donnees.items())
+            )
+
+STATS_DEMARRAGE = StatistiquesDemarrage()
+
+def _executable(chemin):
+    return bool(chemin) and os.path.isfile(chemin) and os.access(chemin, os.X_OK)
+
+@functools.lru_cache(maxsize=None)
+def binaire_firefox():
+    """Binaire Firefox : FIREFOX_BIN, emplacements connus (hors Snap) puis PATH. None si introuvable."""
+    binaire = os.environ.get("FIREFOX_BIN")
+    if binaire:
+        return binaire
+    for chemin in CHEMINS_FIREFOX:
+        if os.path.exists(chemin):
+            return chemin
+    return shutil.which("firefox")
+
+@functools.lru_cache(maxsize=None)
+def chemin_geckodriver():
+    """geckodriver : GECKODRIVER_BIN, PATH, sinon webdriver-manager (une seule fois par processus)."""
+    chemin = os.environ.get("GECKODRIVER_BIN") or shutil.which("geckodriver")
+    if _executable(chemin):
+        return chemin
+    from webdriver_manager.firefox import GeckoDriverManager
+    return GeckoDriverManager().install()
+
+@functools.lru_cache(maxsize=None)
+def chemin_chromedriver():
+    """chromedriver : CHROMEDRIVER_BIN, driver fourni dans scrapping/chromedriver/, PATH, sinon webdriver-manager."""
+    chemin = os.environ.get("CHROMEDRIVER_BIN")
+    if _executable(chemin):
+        return chemin
+    for chemin in sorted(glob.glob(os.path.join(CHROMEDRIVER_DIR, "**", "chromedriver"), recursive=True)):
+        if _executable(chemin):
+            return chemin
+    chemin = shutil.which("chromedriver")
+    if _executable(chemin):
+        return chemin
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+def _demarrer(nom, resoudre, lancer):
+    debut = time.monotonic()
+    chemin = resoudre()
+    apres_resolution = time.monotonic()
+    driver = lancer(chemin)
+    apres_lancement = time.monotonic()
+    appliquer(driver)
+    fin = time.monotonic()
+    phases = [("résolution", apres_resolution - debut), ("lancement", apres_lancement - apres_resolution),
+              ("configuration", fin - apres_lancement)]
+    for phase, duree in phases:
+        STATS_DEMARRAGE.enregistrer(f"{nom} {phase}", duree)
+    print(f"⏱️ {nom} démarré en {fin - debut:.1f}s (" + ", ".join(f"{phase} {duree:.1f}s" for phase, duree in phases) + ")")
+    return driver
+
+def demarrer_firefox(options):
+    """Driver Firefox avec le binaire et le geckodriver en cache et le blocage des ressources appliqué."""
+    from selenium import webdriver
+    from selenium.webdriver.firefox.service import Service as FirefoxService
+
+    if not options.binary_location and binaire_firefox():
+        options.binary_location = binaire_firefox()
+    return _demarrer("Firefox", chemin_geckodriver,
+                     lambda chemin: webdriver.Firefox(service=FirefoxService(chemin), options=options))
+
+def demarrer_chrome(options):
+    """Driver Chrome avec le chromedriver en cache et le blocage des ressources appliqué."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service as ChromeService
+
+    return _demarrer("Chrome", chemin_chromedriver,
+                     lambda chemin: webdriver.Chrome(service=ChromeService(chemin), options=options))
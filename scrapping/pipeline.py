@@ -0,0 +1,173 @@
+import os
+import csv
+import queue
+import threading
+
+import points_reprise
+import scraper
+import enrichisseur
+import recherche_dirigeants
+import enrichisseur_gmb
+import enrichisseur_whois
+import consolidation_prospects
+
+# === PIPELINE EN FLUX ===
+# Chaque fiche scrapée traverse immédiatement les étapes (site web -> dirigeants -> GMB -> whois)
+# via des files bornées : les étapes réseau travaillent pendant que le navigateur scrape.
+# Seul le résultat consolidé est écrit sur disque.
+
+# Taille des files entre étapes (au-delà, l'étape amont attend : contre-pression)
+TAILLE_FILE = 100
+
+# Nombre de workers par étape
+WORKERS_SITES = 16  # threads qui alimentent le moteur asynchrone partagé (enrichisseur.MoteurEnrichissement)
+WORKERS_DIRIGEANTS = recherche_dirigeants.MAX_WORKERS
+WORKERS_GMB = enrichisseur_gmb.NB_WORKERS  # un navigateur emprunté au pool par ligne
+WORKERS_WHOIS = enrichisseur_whois.NB_WORKERS
+
+# Marqueur de fin de flux
+FIN = object()
+
+def ecrire_csv(chemin, lignes, colonnes=None):
+    """Écrit une liste de dictionnaires dans un CSV (colonnes = clés de la première ligne par défaut)."""
+    if colonnes is None:
+        colonnes = list(lignes[0].keys()) if lignes else []
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    with open(chemin, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=colonnes, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(lignes)
+
+class Etape:
+    """
+    Une étape du flux : nb_workers threads lisent (index, ligne) dans entree, appliquent
+    traiter(ligne) et écrivent le résultat dans sortie. Une erreur sur une ligne est
+    journalisée et la ligne passe telle quelle à l'étape suivante.
+    """
+
+    def __init__(self, nom, traiter, entree, sortie, nb_workers=1, fermer=None):
+        self.nom = nom
+        self.traiter = traiter
+        self.entree = entree
+        self.sortie = sortie
+        self.fermer = fermer
+        self.restants = nb_workers
+        self.lock = threading.Lock()
+        self.threads = [
+            threading.Thread(target=self._boucle, name=f"etape-{nom}-{i}", daemon=True)
+            for i in range(nb_workers)
+        ]
+
+    def demarrer(self):
+        for t in self.threads:
+            t.start()
+        return self
+
+    def _boucle(self):
+        try:
+            while True:
+                element = self.entree.get()
+                if element is FIN:
+                    # On remet le marqueur pour les autres workers de l'étape
+                    self.entree.put(FIN)
+                    break
+                index, ligne = element
+                try:
+                    ligne = self.traiter(dict(ligne))
+                except Exception as e:
+                    print(f"⚠️ Étape {self.nom} : erreur sur la ligne {index+1} : {e}")
+                self.sortie.put((index, ligne))
+        finally:
+            with self.lock:
+                self.restants -= 1
+                dernier = self.restants == 0
+            if dernier:
+                if self.fermer:
+                    try:
+                        self.fermer()
+                    except Exception as e:
+                        print(f"⚠️ Étape {self.nom} : erreur à la fermeture : {e}")
+                self.sortie.put(FIN)
+
+def executer_pipeline(mots_cles, max_fiches=5, workspace=None, pool=None):
+    """
+    Scraping -> Web -> Dirigeants -> GMB -> Whois -> Consolidation, en flux et sans sous-processus.
+    Les navigateurs (scraping et GMB) sont empruntés à pool (pool partagé du processus par défaut).
+    Retourne la liste des prospects consolidés (dédoublonnés, dans l'ordre du scraping) ;
+    si un workspace est fourni, ils sont aussi écrits dans workspace.fichier_consolide.
+    Avec un workspace, le scraping est journalisé dans workspace.fichier_progression : relancé sur le
+    même workspace après une interruption, le pipeline repart des fiches déjà scrapées (réinjectées
+    dans le flux) et ne scrape que les mots-clés non terminés.
+    """
+    debug_dir = workspace.debug_dir if workspace else scraper.DEBUG_DIR
+
+    pool = pool or scraper.pool_partage()
+
+    files = [queue.Queue(maxsize=TAILLE_FILE) for _ in range(5)]
+    moteur_sites = enrichisseur.MoteurEnrichissement().demarrer()
+    session_gmb = enrichisseur_gmb.SessionGMB(pool)
+    etapes = [
+        Etape("sites", moteur_sites.enrichir, files[0], files[1], WORKERS_SITES, fermer=moteur_sites.arreter),
+        Etape("dirigeants", recherche_dirigeants.enrichir_ligne, files[1], files[2], WORKERS_DIRIGEANTS),
+        Etape("gmb", session_gmb.enrichir, files[2], files[3], WORKERS_GMB, fermer=session_gmb.fermer),
+        Etape("whois", enrichisseur_whois.enrichir_ligne, files[3], files[4], WORKERS_WHOIS),
+    ]
+    for etape in etapes:
+        etape.demarrer()
+
+    # 1. Scraping Google Maps (producteur) : chaque fiche part aussitôt dans le flux
+    erreurs = []
+    compteur = {"index": 0}
+
+    def publier(ligne):
+        files[0].put((compteur["index"], dict(zip(scraper.COLONNES_RESULTAT, ligne))))
+        compteur["index"] += 1
+
+    def scraping():
+        reprise = None
+        try:
+            if workspace:
+                workspace.creer()
+                reprise = points_reprise.PointsReprise(workspace.fichier_progression)
+                deja_scrapees = reprise.lignes(importees=False, echecs=False)
+                if deja_scrapees:
+                    print(f"♻️ Reprise : {len(deja_scrapees)} fiche(s) déjà scrapée(s) réinjectée(s) dans le flux")
+                for ligne in deja_scrapees:
+                    publier(ligne)
+            print(f"DEBUG: Scraping de {len(mots_cles)} mot(s)-clé(s)...")
+            if not scraper.parcourir_mots_cles(mots_cles, publier, max_fiches, debug_dir, reprise, pool=pool):
+                erreurs.append(Exception("Impossible d'initialiser le driver"))
+        except Exception as e:
+            erreurs.append(e)
+        finally:
+            if reprise:
+                reprise.fermer()
+            files[0].put(FIN)
+
+    producteur = threading.Thread(target=scraping, name="etape-scraping", daemon=True)
+    producteur.start()
+
+    # 2. Collecte en sortie du flux (ordre du scraping rétabli à la fin)
+    resultats = []
+    while True:
+        element = files[-1].get()
+        if element is FIN:
+            break
+        resultats.append(element)
+    producteur.join()
+
+    if erreurs:
+        raise erreurs[0]
+
+    lignes = [ligne for _, ligne in sorted(resultats, key=lambda r: r[0])]
+
+    # 3. Consolidation
+    print("DEBUG: Consolidation finale...")
+    prospects = consolidation_prospects.consolider_lignes(lignes)
+    if workspace:
+        workspace.creer()
+        prospects = consolidation_prospects.ajouter_prospects(prospects, workspace.fichier_consolide)
+        if not os.path.exists(workspace.fichier_consolide):
+            # Aucun prospect : on écrit tout de même un fichier pour le résultat du job
+            ecrire_csv(workspace.fichier_consolide, prospects)
+    return prospects
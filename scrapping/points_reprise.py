@@ -0,0 +1,144 @@
+import os
+import csv
+import json
+import sqlite3
+import threading
+import time
+
+# === POINTS DE REPRISE DU SCRAPING ===
+# Journal SQLite d'une exécution du scraper : chaque fiche est enregistrée avec sa ligne de résultat
+# dans une transaction, et chaque mot-clé terminé est marqué. Après un arrêt brutal, la reprise
+# saute exactement les mots-clés terminés et, dans le mot-clé interrompu, les fiches déjà écrites :
+# ni doublon ni perte. Le CSV de résultats est régénéré à partir du journal.
+# Une fiche (ou un mot-clé) en erreur est enregistrée sous une clé "echec:<url>" : elle figure dans
+# les résultats mais n'est pas considérée comme traitée, et sa ligne est remplacée si la reprise réussit.
+
+PREFIXE_ECHEC = "echec:"
+
+class PointsReprise:
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+        self.lock = threading.Lock()
+        dossier = os.path.dirname(chemin)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        self.connexion = sqlite3.connect(chemin, check_same_thread=False)
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        # Chaque commit est sur disque avant de rendre la main (résiste à une coupure)
+        self.connexion.execute("PRAGMA synchronous=FULL")
+        self.connexion.execute("""
+            CREATE TABLE IF NOT EXISTS lignes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                index_mot_cle INTEGER NOT NULL,
+                mot_cle TEXT NOT NULL,
+                url TEXT NOT NULL,
+                ligne TEXT NOT NULL,
+                UNIQUE (index_mot_cle, url)
+            )
+        """)
+        self.connexion.execute("""
+            CREATE TABLE IF NOT EXISTS mots_cles (
+                index_mot_cle INTEGER PRIMARY KEY,
+                mot_cle TEXT NOT NULL,
+                date_fin REAL NOT NULL
+            )
+        """)
+        self.connexion.commit()
+
+    def enregistrer_ligne(self, index_mot_cle, mot_cle, url, ligne):
+        """
+        Enregistre la ligne d'une fiche (url vide pour une ligne propre au mot-clé, ex. aucun résultat).
+        Retourne False si cette fiche était déjà enregistrée pour ce mot-clé.
+        """
+        with self.lock, self.connexion:
+            curseur = self.connexion.execute(
+                "INSERT OR IGNORE INTO lignes (index_mot_cle, mot_cle, url, ligne) VALUES (?, ?, ?, ?)",
+                (index_mot_cle, mot_cle, url or "", json.dumps(list(ligne), ensure_ascii=False))
+            )
+            if url and curseur.rowcount > 0:
+                # La fiche a abouti : la ligne d'erreur d'une tentative précédente disparaît
+                self.connexion.execute(
+                    "DELETE FROM lignes WHERE index_mot_cle = ? AND url = ?", (index_mot_cle, PREFIXE_ECHEC + url)
+                )
+            return curseur.rowcount > 0
+
+    def enregistrer_echec(self, index_mot_cle, mot_cle, url, ligne):
+        """
+        Enregistre la ligne d'une fiche en erreur (url vide : erreur du mot-clé entier), sans la marquer
+        comme traitée : la reprise la refera. Retourne False si cette erreur était déjà enregistrée.
+        """
+        return self.enregistrer_ligne(index_mot_cle, mot_cle, PREFIXE_ECHEC + (url or ""), ligne)
+
+    def terminer_mot_cle(self, index_mot_cle, mot_cle):
+        with self.lock, self.connexion:
+            # Le mot-clé a abouti : l'erreur globale d'une tentative précédente disparaît
+            self.connexion.execute(
+                "DELETE FROM lignes WHERE index_mot_cle = ? AND url = ?", (index_mot_cle, PREFIXE_ECHEC)
+            )
+            self.connexion.execute(
+                "INSERT OR REPLACE INTO mots_cles (index_mot_cle, mot_cle, date_fin) VALUES (?, ?, ?)",
+                (index_mot_cle, mot_cle, time.time())
+            )
+
+    def mots_cles_termines(self, mots_cles):
+        """Index des mots-clés déjà terminés (seulement si le mot-clé à cet index est inchangé)."""
+        with self.lock:
+            lignes = self.connexion.execute("SELECT index_mot_cle, mot_cle FROM mots_cles").fetchall()
+        return {index for index, mot_cle in lignes if index < len(mots_cles) and mots_cles[index] == mot_cle}
+
+    def urls_traitees(self, index_mot_cle):
+        """Fiches déjà enregistrées pour un mot-clé (reprise d'un mot-clé interrompu)."""
+        with self.lock:
+            lignes = self.connexion.execute(
+                "SELECT url FROM lignes WHERE index_mot_cle = ? AND url != ''", (index_mot_cle,)
+            ).fetchall()
+        return {url for (url,) in lignes if not url.startswith(PREFIXE_ECHEC)}
+
+    def lignes(self, importees=True, echecs=True):
+        """
+        Toutes les lignes enregistrées, dans l'ordre des mots-clés puis de l'écriture
+        (importees=False : sans les lignes de importer_csv ; echecs=False : sans les lignes d'erreur).
+        """
+        with self.lock:
+            resultats = self.connexion.execute(
+                "SELECT url, ligne FROM lignes WHERE index_mot_cle >= ? ORDER BY index_mot_cle, id",
+                (-1 if importees else 0,)
+            ).fetchall()
+        return [json.loads(ligne) for url, ligne in resultats if echecs or not url.startswith(PREFIXE_ECHEC)]
+
+    def importer_csv(self, fichier):
+        """
+        Reprend les lignes d'un CSV de résultats existant (exécutions précédentes) pour qu'elles restent
+        en tête du fichier régénéré. Index -1 : elles ne correspondent à aucun mot-clé de cette exécution.
+        """
+        if not os.path.exists(fichier):
+            return 0
+        with open(fichier, 'r', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            lignes = [ligne for ligne in reader if ligne]
+        with self.lock, self.connexion:
+            self.connexion.executemany(
+                "INSERT OR IGNORE INTO lignes (index_mot_cle, mot_cle, url, ligne) VALUES (-1, '', ?, ?)",
+                [(f"import:{i}", json.dumps(ligne, ensure_ascii=False)) for i, ligne in enumerate(lignes)]
+            )
+        return len(lignes)
+
+    def exporter_csv(self, fichier, colonnes):
+        """Réécrit le CSV de résultats à partir du journal (fichier temporaire puis remplacement atomique)."""
+        dossier = os.path.dirname(fichier)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        temporaire = f"{fichier}.tmp"
+        with open(temporaire, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(colonnes)
+            writer.writerows(self.lignes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporaire, fichier)
+
+    def fermer(self):
+        with self.lock:
+            self.connexion.close()
@@ -0,0 +1,281 @@
+import os
+import time
+import threading
+import contextlib
+
+import memoire_navigateurs
+
+# === POOL DE NAVIGATEURS ===
+# Navigateurs Selenium démarrés une fois puis prêtés aux étapes qui en ont besoin (scraping Maps, GMB) :
+# une demande courte ne paie ni le démarrage du navigateur ni le passage du consentement Google.
+# Chaque prêt (bail) est rendu après usage ; le navigateur est alors vérifié et recyclé s'il ne répond
+# plus, s'il a chargé trop de pages ou si la surveillance mémoire (memoire_navigateurs.py) l'a marqué.
+
+# Recyclage d'un navigateur après ce nombre de pages chargées
+MAX_PAGES = int(os.environ.get("PLOUF_POOL_MAX_PAGES", "500"))
+
+class Bail:
+    """Un navigateur prêté : driver, pages chargées depuis son démarrage, raison du recyclage demandé."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.cree_le = time.monotonic()
+        self.recycler = None
+        self._compter_pages()
+
+    def _compter_pages(self):
+        # driver.get est compté sur l'instance : les étapes n'ont rien à signaler
+        get = self.driver.get
+
+        def get_compte(url):
+            self.pages += 1
+            return get(url)
+
+        self.driver.get = get_compte
+
+class NavigateurIndisponible(Exception):
+    """Aucun navigateur n'a pu démarrer."""
+
+class PretDiffere:
+    """
+    Prêt d'un navigateur emprunté seulement au premier accès à driver : une tâche qui peut aboutir
+    sans navigateur (recherche HTTP complète) n'en occupe pas. rendre() le rend au pool s'il a été loué.
+    """
+
+    def __init__(self, pool, timeout=None):
+        self.pool = pool
+        self.timeout = timeout
+        self.bail = None
+
+    @property
+    def loue(self):
+        return self.bail is not None
+
+    @property
+    def driver(self):
+        if self.bail is None:
+            self.bail = self.pool.louer(self.timeout)
+            if self.bail is None:
+                raise NavigateurIndisponible("Impossible d'initialiser le driver")
+        return self.bail.driver
+
+    def recycler(self, raison):
+        """Remplace le navigateur loué (qui ne répond plus) par un autre du pool ; retourne le nouveau driver."""
+        if self.bail is not None:
+            bail, self.bail = self.bail, None
+            self.bail = self.pool.recycler(bail, raison, self.timeout)
+        return self.driver
+
+    def rendre(self):
+        if self.bail is not None:
+            bail, self.bail = self.bail, None
+            self.pool.rendre(bail)
+
+class PoolNavigateurs:
+    """
+    Pool borné de navigateurs : fabrique() crée un driver (None en cas d'échec), preparer(driver)
+    le met en condition après création (consentement...). prechauffes navigateurs sont gardés prêts.
+    La mémoire est suivie par surveillance (surveillance partagée du processus par défaut) : au-delà
+    du budget, le pool n'ouvre pas de navigateur supplémentaire et attend qu'un bail soit rendu.
+    """
+
+    def __init__(self, fabrique, taille=2, prechauffes=0, preparer=None, max_pages=MAX_PAGES, surveillance=None):
+        self.fabrique = fabrique
+        self.taille = max(1, taille)
+        self.prechauffes = min(prechauffes, self.taille)
+        self.preparer = preparer
+        self.max_pages = max_pages
+        self.surveillance = surveillance or memoire_navigateurs.surveillance_partagee()
+        self.surveillance.abonner(self.recycler_libres)
+        self.condition = threading.Condition()
+        self.libres = []
+        self.total = 0  # navigateurs existants ou en cours de démarrage
+        self.ferme = False
+        self.stats = {"demarres": 0, "echecs_demarrage": 0, "recycles": 0, "baux": 0,
+                      "duree_demarrage": 0.0}
+
+    # --- Cycle de vie d'un navigateur ---
+
+    def _demarrer(self):
+        """Crée un navigateur (la place a déjà été réservée dans self.total). None en cas d'échec."""
+        debut = time.monotonic()
+        try:
+            driver = self.fabrique()
+        except Exception as e:
+            print(f"⚠️ Démarrage du navigateur impossible : {e}")
+            driver = None
+        if driver is None:
+            with self.condition:
+                self.total -= 1
+                self.stats["echecs_demarrage"] += 1
+                self.condition.notify()
+            return None
+        bail = Bail(driver)
+        self.surveillance.suivre(bail)
+        if self.preparer:
+            try:
+                self.preparer(driver)
+            except Exception as e:
+                print(f"⚠️ Préparation du navigateur : {e}")
+        duree = time.monotonic() - debut
+        with self.condition:
+            self.stats["demarres"] += 1
+            self.stats["duree_demarrage"] += duree
+        print(f"✅ Navigateur prêt en {duree:.1f}s")
+        return bail
+
+    def _detruire(self, bail, recycle=True):
+        self.surveillance.oublier(bail)
+        try:
+            bail.driver.quit()
+        except:
+            pass
+        with self.condition:
+            self.total -= 1
+            if recycle:
+                self.stats["recycles"] += 1
+            self.condition.notify()
+
+    def _sain(self, bail):
+        try:
+            bail.driver.execute_script("return 1")
+            return True
+        except:
+            return False
+
+    def _a_recycler(self, bail):
+        if self.ferme:
+            return "fermeture"
+        if bail.recycler:
+            return bail.recycler
+        if bail.pages >= self.max_pages:
+            return f"{bail.pages} pages"
+        memoire = self.surveillance.mesurer(bail)
+        if self.surveillance.max_rss_mo and memoire is not None and memoire > self.surveillance.max_rss_mo:
+            return f"{memoire:.0f} Mo"
+        if not self._sain(bail):
+            return "ne répond plus"
+        return None
+
+    # --- Prêts ---
+
+    def louer(self, timeout=None):
+        """
+        Prête un navigateur (en démarre un si le pool n'est pas plein, sinon attend qu'un bail soit rendu).
+        Retourne None si aucun navigateur n'a pu démarrer ; lève TimeoutError après timeout secondes d'attente.
+        """
+        echeance = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            bail = None
+            with self.condition:
+                while True:
+                    if self.ferme:
+                        raise RuntimeError("Pool de navigateurs fermé")
+                    if self.libres:
+                        bail = self.libres.pop()
+                        break
+                    # Toujours au moins un navigateur ; au-delà, seulement si le budget mémoire le permet
+                    if self.total < self.taille and (self.total == 0 or self.surveillance.budget_disponible()):
+                        self.total += 1
+                        break
+                    # Le budget se libère sans notification : on revérifie à chaque échantillon
+                    attente = self.surveillance.intervalle
+                    if echeance is not None:
+                        attente = min(attente, echeance - time.monotonic())
+                        if attente <= 0:
+                            raise TimeoutError("Aucun navigateur disponible")
+                    self.condition.wait(attente)
+            if bail is None:
+                bail = self._demarrer()
+                if bail is None:
+                    return None
+            elif bail.recycler or not self._sain(bail):
+                print(f"🔄 Navigateur inactif recyclé ({bail.recycler or 'ne répond plus'})")
+                self._detruire(bail)
+                continue
+            with self.condition:
+                self.stats["baux"] += 1
+            return bail
+
+    def rendre(self, bail):
+        """Reprend un navigateur prêté : remis à disposition, ou recyclé si besoin."""
+        raison = self._a_recycler(bail)
+        if raison:
+            if not self.ferme:
+                print(f"🔄 Recyclage du navigateur ({raison})")
+            self._detruire(bail, recycle=not self.ferme)
+            if not self.ferme:
+                self.prechauffer()
+            return
+        with self.condition:
+            self.libres.append(bail)
+            self.condition.notify()
+
+    def recycler(self, bail, raison, timeout=None):
+        """
+        Recycle un navigateur prêté qui ne fonctionne plus et en prête un autre (démarré par le pool :
+        préparé, compté et suivi par la surveillance mémoire). Retourne le nouveau bail, ou None.
+        """
+        bail.recycler = raison
+        self.rendre(bail)
+        return self.louer(timeout)
+
+    @contextlib.contextmanager
+    def bail(self, timeout=None):
+        bail = self.louer(timeout)
+        if bail is None:
+            raise Exception("Impossible d'initialiser le driver")
+        try:
+            yield bail
+        finally:
+            self.rendre(bail)
+
+    def recycler_libres(self):
+        """Ferme les navigateurs inoccupés marqués par la surveillance mémoire."""
+        with self.condition:
+            a_recycler = [bail for bail in self.libres if bail.recycler]
+            self.libres = [bail for bail in self.libres if not bail.recycler]
+        for bail in a_recycler:
+            print(f"🔄 Recyclage d'un navigateur inoccupé ({bail.recycler})")
+            self._detruire(bail)
+
+    def prechauffer(self, nombre=None):
+        """Démarre en arrière-plan les navigateurs manquants pour en avoir `nombre` prêts (prechauffes par défaut)."""
+        nombre = self.prechauffes if nombre is None else nombre
+        with self.condition:
+            a_demarrer = max(0, min(nombre - len(self.libres), self.taille - self.total))
+            if self.total > 0 and not self.surveillance.budget_disponible():
+                a_demarrer = 0
+            self.total += a_demarrer
+
+        def demarrer():
+            bail = self._demarrer()
+            if bail is not None:
+                with self.condition:
+                    self.libres.append(bail)
+                    self.condition.notify()
+
+        for _ in range(a_demarrer):
+            threading.Thread(target=demarrer, name="prechauffage-navigateur", daemon=True).start()
+        return a_demarrer
+
+    def statistiques(self):
+        with self.condition:
+            stats = dict(self.stats)
+            stats["taille"] = self.taille
+            stats["prets"] = len(self.libres)
+            stats["en_service"] = self.total - len(self.libres)
+        demarres = stats.pop("duree_demarrage")
+        stats["demarrage_moyen_s"] = round(demarres / stats["demarres"], 2) if stats["demarres"] else None
+        return stats
+
+    def fermer(self):
+        """Ferme les navigateurs disponibles ; ceux encore prêtés sont fermés à leur retour."""
+        self.surveillance.desabonner(self.recycler_libres)
+        with self.condition:
+            self.ferme = True
+            libres, self.libres = self.libres, []
+            self.condition.notify_all()
+        for bail in libres:
+            self._detruire(bail, recycle=False)
@@ -5,6 +5,10 @@ import requests
 import urllib.parse
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import cache_siren
+import http_client
+import limiteur
+
 # === CONFIGURATION ===
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 RESULTATS_ENRICHIS_DIR = os.path.join(BASE_DIR, "resultats_enrichis")
@@ -13,9 +17,20 @@ INPUT_FILE = os.path.join(RESULTATS_ENRICHIS_DIR, "resultats_enrichis_complets.c
 RESULTATS_DIRIGEANTS_DIR = os.path.join(BASE_DIR, "resultats_dirigeants")
 OUTPUT_FILE = os.path.join(RESULTATS_DIRIGEANTS_DIR, "resultats_dirigeants.csv")
 
-# Créer le dossier de sortie
-if not os.path.exists(RESULTATS_DIRIGEANTS_DIR):
-    os.makedirs(RESULTATS_DIRIGEANTS_DIR)
+# Recherches simultanées : le débit réel est borné par fournisseur (limiteur.py)
+MAX_WORKERS = 20
+
+# Débit maximal (requêtes/s) de chaque fournisseur, adapté à la baisse sur les 429
+FOURNISSEURS = {
+    "api_gouv": limiteur.Fournisseur("API Gouv", debit=7),
+    "pappers": limiteur.Fournisseur("Pappers API", debit=5),
+    "annuaire": limiteur.Fournisseur("Annuaire", debit=7),
+    "pappers_scraping": limiteur.Fournisseur("Pappers Scraping", debit=1),
+}
+
+def appeler_fournisseur(nom, url, **kwargs):
+    """GET vers un fournisseur en respectant son débit et son disjoncteur."""
+    return FOURNISSEURS[nom].executer(lambda: http_client.get(url, **kwargs))
 
 def clean_company_name(nom):
     """
@@ -58,7 +73,7 @@ def search_via_api_gouv(query):
     try:
         encoded_query = urllib.parse.quote(query)
         url = f"https://recherche-entreprises.api.gouv.fr/search?q={encoded_query}&per_page=1"
-        response = requests.get(url, timeout=5)
+        response = appeler_fournisseur("api_gouv", url)
         
         if response.status_code == 200:
             data = response.json()
@@ -91,6 +106,8 @@ def search_via_api_gouv(query):
                     "pappers_url": f"https://www.pappers.fr/entreprise/{siren}" if siren else "",
                     "source": "API Gouv"
                 }
+    except (limiteur.ErreurFournisseur, requests.RequestException):
+        raise
     except Exception as e:
         pass
     return None
@@ -99,7 +116,7 @@ def search_via_pappers(query):
     """API 2: Pappers Suggestions"""
     try:
         url = f"https://suggestions.pappers.fr/v2?q={query}&cibles=nom_entreprise"
-        response = requests.get(url, timeout=5, headers={"User-Agent": "Mozilla/5.0"})
+        response = appeler_fournisseur("pappers", url)
         
         if response.status_code == 200:
             data = response.json()
@@ -118,6 +135,8 @@ def search_via_pappers(query):
                     "pappers_url": f"https://www.pappers.fr/entreprise/{siren}" if siren else "",
                     "source": "Pappers"
                 }
+    except (limiteur.ErreurFournisseur, requests.RequestException):
+        raise
     except Exception as e:
         pass
     return None
@@ -127,7 +146,7 @@ def search_via_annuaire(query):
     try:
         encoded_query = urllib.parse.quote(query)
         url = f"https://annuaire-entreprises.data.gouv.fr/api/v1/search?q={encoded_query}&per_page=1"
-        response = requests.get(url, timeout=5)
+        response = appeler_fournisseur("annuaire", url)
         
         if response.status_code == 200:
             data = response.json()
@@ -160,6 +179,8 @@ def search_via_annuaire(query):
                     "pappers_url": f"https://www.pappers.fr/entreprise/{siren}" if siren else "",
                     "source": "Annuaire Entreprises"
                 }
+    except (limiteur.ErreurFournisseur, requests.RequestException):
+        raise
     except Exception as e:
         pass
     return None
@@ -178,7 +199,7 @@ def search_via_pappers_scraping(query):
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"
         }
         
-        response = requests.get(url, timeout=10, headers=headers)
+        response = appeler_fournisseur("pappers_scraping", url, headers=headers)
         
         if response.status_code == 200:
             soup = BeautifulSoup(response.text, 'html.parser')
@@ -208,18 +229,14 @@ def search_via_pappers_scraping(query):
                         "pappers_url": f"https://www.pappers.fr{href}",
                         "source": "Pappers Scraping"
                     }
+    except (limiteur.ErreurFournisseur, requests.RequestException):
+        raise
     except Exception as e:
         pass
     return None
 
-def search_company_info(nom, adresse):
-    """
-    Recherche en cascade avec 4 méthodes différentes.
-    S'arrête dès qu'une méthode trouve un résultat.
-    """
-    if not nom:
-        return None
-    
+def construire_requete(nom, adresse):
+    """Requête envoyée aux APIs : nom nettoyé + code postal."""
     # Nettoyage avancé du nom
     clean_nom = clean_company_name(nom)
     
@@ -234,8 +251,26 @@ def search_company_info(nom, adresse):
     if cp_match:
         code_postal = cp_match.group(0)
     
+    return f"{clean_nom} {code_postal}".strip()
+
+def search_company_info(nom, adresse):
+    """
+    Recherche en cascade avec 4 méthodes différentes.
+    S'arrête dès qu'une méthode trouve un résultat.
+    Les résultats (y compris « non trouvé ») sont mémorisés dans cache_siren.
+    """
+    if not nom:
+        return None
+    
     # Construction de la requête
-    query = f"{clean_nom} {code_postal}".strip()
+    query = construire_requete(nom, adresse)
+    
+    cache = cache_siren.cache_partage()
+    if cache:
+        present, result = cache.obtenir(query)
+        if present:
+            print(f"♻️ {nom[:40]}... {'trouvé' if result else 'non trouvé'} (cache)")
+            return result
     
     # Cascade d'APIs
     apis = [
@@ -245,36 +280,81 @@ def search_company_info(nom, adresse):
         ("Pappers Scraping", search_via_pappers_scraping)
     ]
     
+    erreur = False
     for api_name, api_func in apis:
         try:
             result = api_func(query)
             if result:
                 print(f"✅ {nom[:40]}... trouvé via {api_name}")
+                if cache:
+                    cache.enregistrer(query, result)
                 return result
+        except limiteur.CircuitOuvert:
+            # Fournisseur désactivé temporairement : on passe directement au suivant
+            erreur = True
+            continue
         except Exception as e:
             print(f"⚠️ Erreur {api_name} pour {nom[:40]}: {e}")
+            erreur = True
             continue
     
     print(f"❌ {nom[:40]}... non trouvé (4 méthodes testées)")
+    # Pas de cache négatif si une méthode a échoué : la recherche n'est pas concluante
+    if cache and not erreur:
+        cache.enregistrer(query, None)
     return None
 
+def invalider_recherche(nom, adresse):
+    """Oublie le résultat mémorisé pour une entreprise (la prochaine recherche interrogera les APIs)."""
+    cache = cache_siren.cache_partage()
+    return cache.invalider(construire_requete(nom, adresse)) if cache else 0
+
+# Colonnes ajoutées par la recherche des dirigeants
+COLONNES_DIRIGEANTS = ["SIRET", "Dirigeants", "Code NAF", "Lien Pappers", "Source", "Status Recherche"]
+
+def valeurs_recherche(nom, adresse):
+    """Retourne les valeurs des COLONNES_DIRIGEANTS pour une entreprise."""
+    try:
+        info = search_company_info(nom, adresse)
+        if info:
+            return [info['siret'], info['dirigeant'], info['activite'], info['pappers_url'], info['source'], "Trouvé"]
+        return ["", "", "", "", "", "Non trouvé"]
+    except Exception as e:
+        return ["", "", "", "", "", f"Erreur: {e}"]
+
 def process_row(row, header_map):
     """Traite une ligne CSV individuellement."""
     try:
         nom = row[header_map['Nom']] if 'Nom' in header_map else row[0]
         adresse = row[header_map['Adresse']] if 'Adresse' in header_map else ""
         
-        info = search_company_info(nom, adresse)
-        
         # On ajoute les infos trouvées aux données existantes
-        row_data = list(row)
-        if info:
-            return row_data + [info['siret'], info['dirigeant'], info['activite'], info['pappers_url'], info['source'], "Trouvé"]
-        else:
-            return row_data + ["", "", "", "", "", "Non trouvé"]
+        return list(row) + valeurs_recherche(nom, adresse)
     except Exception as e:
         return list(row) + ["", "", "", "", "", f"Erreur: {e}"]
 
+def enrichir_ligne(row):
+    """Version dictionnaire de process_row : retourne une copie de la ligne avec les COLONNES_DIRIGEANTS."""
+    ligne = dict(row)
+    ligne.update(zip(COLONNES_DIRIGEANTS, valeurs_recherche(row.get('Nom', ''), row.get('Adresse', ''))))
+    return ligne
+
+def enrichir_lignes(rows, progress_callback=None, max_workers=MAX_WORKERS):
+    """
+    Recherche les dirigeants pour une liste de lignes en mémoire (utilisée par pipeline.py).
+    L'ordre des lignes est conservé.
+    """
+    total_rows = len(rows)
+    processed_rows = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for i, result in enumerate(executor.map(enrichir_ligne, rows)):
+            processed_rows.append(result)
+            if progress_callback:
+                progress_callback(i+1, total_rows, f"Traitement : {i+1}/{total_rows}")
+            elif i % 10 == 0:
+                print(f"✅ Avancement : {i+1}/{total_rows}")
+    return processed_rows
+
 def process_file(input_file, output_file, progress_callback=None):
     """
     Fonction principale pour traiter le fichier.
@@ -286,8 +366,8 @@ def process_file(input_file, output_file, progress_callback=None):
 
     # Créer le dossier de sortie si nécessaire
     output_dir = os.path.dirname(output_file)
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
 
     # Lecture du fichier d'entrée
     with open(input_file, 'r', encoding='utf-8') as f:
@@ -306,11 +386,11 @@ def process_file(input_file, output_file, progress_callback=None):
     header_map = {col: i for i, col in enumerate(header)}
     
     # Nouvel en-tête
-    new_header = header + ["SIRET", "Dirigeants", "Code NAF", "Lien Pappers", "Source", "Status Recherche"]
+    new_header = header + COLONNES_DIRIGEANTS
     
     processed_rows = []
     
-    with ThreadPoolExecutor(max_workers=5) as executor:
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
         future_to_row = {executor.submit(process_row, row, header_map): row for row in rows}
         
         for i, future in enumerate(as_completed(future_to_row)):
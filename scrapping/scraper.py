@@ -1,43 +1,54 @@
 import time
 import csv
+import re
+import argparse
 import urllib.parse
-import subprocess
 import sys
 import os.path
-from selenium import webdriver
+import queue
+import threading
+import atexit
 from selenium.webdriver.common.by import By
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from datetime import datetime
-import shutil
 import os
 
+import attentes
+import extraction_maps
+import index_lieux
+import maps_http
+import navigateur
+import points_reprise
+import pool_navigateurs
+
 # === CONFIGURATION ===
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MOTS_CLES_CSV = os.path.join(BASE_DIR, "mots_cles.csv")
 RESULTATS_DIR = os.path.join(BASE_DIR, "resultats")
 FICHIER_RESULTAT = os.path.join(RESULTATS_DIR, "resultats_complets.csv")
-FICHIER_PROGRESSION = os.path.join(RESULTATS_DIR, "progression.txt")
-ENRICHISSEUR_SCRIPT = os.path.join(BASE_DIR, "enrichisseur.py")
+FICHIER_PROGRESSION = os.path.join(RESULTATS_DIR, "progression.sqlite")  # Points de reprise (points_reprise.py)
+
+# Colonnes du fichier de résultats bruts
+COLONNES_RESULTAT = ["Mot-clé", "Nom", "Téléphone", "Site web", "Adresse"]
 
 # Mode headless (true = invisible, false = visible)
 MODE_HEADLESS = True  # Le mode headless est activé pour éviter les perturbations
 
 # Nombre maximum de fiches à traiter par mot-clé
-MAX_FICHES_PAR_MOT_CLE = 20  # Valeur par défaut
-if len(sys.argv) > 1:
-    try:
-        MAX_FICHES_PAR_MOT_CLE = int(sys.argv[1])
-        print(f"📊 Limite fixée par argument : {MAX_FICHES_PAR_MOT_CLE} fiches")
-    except:
-        pass
+MAX_FICHES_PAR_MOT_CLE = 20  # Valeur par défaut (surchargée par l'argument de la ligne de commande)
 
-# Délais d'attente (en secondes) - augmenter pour la stabilité sur serveur
-DELAI_CHARGEMENT_PAGE = 5  # Augmenté à 5 secondes pour le serveur
-DELAI_SCROLL = 2  # Augmenté à 2 secondes
-DELAI_TRAITEMENT_FICHE = 1  # Réduit de 3 à 1 seconde
+# Délais d'attente MAXIMUM (en secondes) : on n'attend que le temps nécessaire (voir attentes.py),
+# ces valeurs ne servent que de plafond quand la page tarde - augmenter pour la stabilité sur serveur
+DELAI_CHARGEMENT_PAGE = 10  # Apparition de la liste de résultats
+DELAI_SCROLL = 3  # Arrivée de nouvelles fiches après un scroll
+DELAI_TRAITEMENT_FICHE = 5  # Affichage du panneau d'une fiche (h1)
+DELAI_CONSENTEMENT = 5  # Sortie de la page de consentement après le clic
+
+# Extraction depuis la liste de résultats : les fiches déjà complètes dans la liste
+# ne sont pas ouvertes (une page de fiche n'est chargée que pour les champs manquants)
+EXTRACTION_LISTE = os.environ.get("PLOUF_EXTRACTION_LISTE", "1") != "0"
 
 # Paramètres pour éviter le blocage
 MOTS_CLES_AVANT_PAUSE = 100  # Augmenté de 50 à 100 pour accélérer le traitement
@@ -45,20 +56,21 @@ DUREE_PAUSE = 30  # Réduit de 60 à 30 secondes pour accélérer le traitement
 MAX_TENTATIVES_CONNEXION = 3
 DELAI_ENTRE_TENTATIVES = 10
 DEBUG_DIR = os.path.join(RESULTATS_DIR, "debug")
-if not os.path.exists(DEBUG_DIR):
-    os.makedirs(DEBUG_DIR)
 
-# Créer le dossier de résultats s'il n'existe pas
-if not os.path.exists(RESULTATS_DIR):
-    os.makedirs(RESULTATS_DIR)
+# Nombre de navigateurs qui scrapent en parallèle (chacun consomme ~300-500 Mo ; au-delà du budget
+# mémoire PLOUF_BUDGET_MEMOIRE_MO, les workers attendent qu'un navigateur se libère - memoire_navigateurs.py)
+NB_NAVIGATEURS = int(os.environ.get("PLOUF_NAVIGATEURS", "3"))
+
+# Pool de navigateurs partagé par le processus (API) : taille totale (scraping + GMB) et
+# nombre de navigateurs gardés prêts à l'emploi
+TAILLE_POOL = int(os.environ.get("PLOUF_POOL_NAVIGATEURS", str(NB_NAVIGATEURS + 1)))
+NAVIGATEURS_PRECHAUFFES = int(os.environ.get("PLOUF_POOL_PRECHAUFFES", "1"))
 
 # === Selenium Setup ===
 def initialiser_driver():
     # 1. Tentative avec Firefox (original)
     try:
         from selenium.webdriver.firefox.options import Options as FirefoxOptions
-        from selenium.webdriver.firefox.service import Service as FirefoxService
-        from webdriver_manager.firefox import GeckoDriverManager
         
         firefox_options = FirefoxOptions()
         if MODE_HEADLESS:
@@ -66,7 +78,7 @@ def initialiser_driver():
         
         firefox_options.set_preference("dom.webdriver.enabled", False)
         firefox_options.set_preference("useAutomationExtension", False)
-        firefox_options.set_preference("permissions.default.image", 2)
+        navigateur.options_firefox(firefox_options)
         firefox_options.add_argument("--width=1920")
         firefox_options.add_argument("--height=1080")
         firefox_options.add_argument("--disable-gpu")
@@ -78,31 +90,15 @@ def initialiser_driver():
         import random
         firefox_options.add_argument(f"--user-agent={random.choice(user_agents)}")
         
-        # Détection binaire Firefox
-        binary_loc = os.environ.get("FIREFOX_BIN")
-        if not binary_loc:
-            possible_paths = ["/usr/lib/firefox/firefox", "/usr/bin/firefox", "/usr/local/bin/firefox"]
-            for path in possible_paths:
-                if os.path.exists(path):
-                    binary_loc = path
-                    break
-        if not binary_loc:
-            binary_loc = shutil.which("firefox")
-        if binary_loc:
-            firefox_options.binary_location = binary_loc
-
+        # Binaire Firefox et geckodriver résolus une fois par processus (navigateur.py)
         print("🦊 Tentative d'initialisation de Firefox...")
-        service = FirefoxService(GeckoDriverManager().install())
-        driver = webdriver.Firefox(service=service, options=firefox_options)
-        return driver
+        return navigateur.demarrer_firefox(firefox_options)
     except Exception as e:
         print(f"⚠️ Firefox non disponible ou erreur : {e}")
 
     # 2. Tentative avec Chrome (fallback)
     try:
         from selenium.webdriver.chrome.options import Options as ChromeOptions
-        from selenium.webdriver.chrome.service import Service as ChromeService
-        from webdriver_manager.chrome import ChromeDriverManager
         
         chrome_options = ChromeOptions()
         if MODE_HEADLESS:
@@ -117,27 +113,37 @@ def initialiser_driver():
         ]
         import random
         chrome_options.add_argument(f"--user-agent={random.choice(user_agents)}")
+        navigateur.options_chrome(chrome_options)
         
         print("🌐 Tentative d'initialisation de Chrome...")
-        service = ChromeService(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        return driver
+        return navigateur.demarrer_chrome(chrome_options)
     except Exception as e:
         print(f"❌ Chrome non disponible ou erreur : {e}")
         
     return None
 
-# Initialiser le driver
-driver = initialiser_driver()
-if driver is None:
-    print("❌ Impossible d'initialiser le driver. Vérifiez votre installation de Firefox ou Chrome.")
-    print("💡 Si vous êtes sur serveur Ubuntu, assurez-vous de ne PAS utiliser Snap pour Firefox.")
-    sys.exit(1)
-else:
-    print("✅ Driver initialisé avec succès")
+def preparer_driver(driver):
+    """Ouvre Google Maps et passe le consentement : les recherches suivantes arrivent directement sur Maps."""
+    driver.get("https://www.google.com/maps?hl=fr")
+    if "consent" in driver.current_url:
+        handle_cookie_consent(driver)
+
+_pool_partage = None
+_pool_lock = threading.Lock()
+
+def pool_partage():
+    """Pool de navigateurs commun au processus (API) : préchauffés, prêtés au scraping et à l'étape GMB."""
+    global _pool_partage
+    with _pool_lock:
+        if _pool_partage is None:
+            _pool_partage = pool_navigateurs.PoolNavigateurs(
+                initialiser_driver, taille=TAILLE_POOL, prechauffes=NAVIGATEURS_PRECHAUFFES, preparer=preparer_driver
+            )
+            atexit.register(_pool_partage.fermer)
+        return _pool_partage
 
 # Fonction pour gérer les consentements de cookies (uniquement sur la page principale)
-def handle_cookie_consent():
+def handle_cookie_consent(driver):
     try:
         # Attendre que la page soit chargée et que le bouton de consentement soit visible
         wait = WebDriverWait(driver, 5)  # Réduit de 10 à 5 secondes
@@ -160,7 +166,7 @@ def handle_cookie_consent():
                     if btn.is_displayed():
                         btn.click()
                         print(f"✅ Consentement accepté (bouton direct: {selector})")
-                        time.sleep(2)
+                        attentes.attendre_consentement(driver, DELAI_CONSENTEMENT)
                         return True
             except:
                 continue
@@ -177,7 +183,7 @@ def handle_cookie_consent():
                             btn.click()
                             print(f"✅ Consentement accepté (dans iframe {index})")
                             driver.switch_to.default_content()
-                            time.sleep(2)
+                            attentes.attendre_consentement(driver, DELAI_CONSENTEMENT)
                             return True
                 driver.switch_to.default_content()
             except:
@@ -190,389 +196,526 @@ def handle_cookie_consent():
         print(f"⚠️ Erreur lors de la gestion du consentement: {e}")
         return False
 
-# Fonction pour sauvegarder la progression
-def sauvegarder_progression(index_mot_cle):
-    try:
-        with open(FICHIER_PROGRESSION, 'w') as f:
-            f.write(str(index_mot_cle))
-        print(f"✅ Progression sauvegardée: mot-clé {index_mot_cle}")
-    except Exception as e:
-        print(f"⚠️ Erreur lors de la sauvegarde de la progression: {e}")
-        # Tentative de sauvegarde dans un fichier de secours
-        try:
-            with open(f"{FICHIER_PROGRESSION}.backup", 'w') as f:
-                f.write(str(index_mot_cle))
-            print(f"✅ Progression sauvegardée dans le fichier de secours")
-        except:
-            pass
-
-# Fonction pour charger la progression
-def charger_progression():
-    try:
-        if os.path.exists(FICHIER_PROGRESSION):
-            with open(FICHIER_PROGRESSION, 'r') as f:
-                index = int(f.read().strip())
-            print(f"✅ Progression chargée: reprise au mot-clé {index+1}")
-            return index
-        elif os.path.exists(f"{FICHIER_PROGRESSION}.backup"):
-            # Utiliser le fichier de secours si le fichier principal est corrompu
-            with open(f"{FICHIER_PROGRESSION}.backup", 'r') as f:
-                index = int(f.read().strip())
-            print(f"✅ Progression chargée depuis le fichier de secours: reprise au mot-clé {index+1}")
-            return index
-        else:
-            print("✅ Aucune progression sauvegardée, démarrage depuis le début")
-            return 0
-    except Exception as e:
-        print(f"⚠️ Erreur lors du chargement de la progression: {e}")
-        return 0
-
-# === Lire les mots-clés depuis le fichier CSV ===
-mots_cles = []
-try:
-    with open(MOTS_CLES_CSV, 'r', encoding='utf-8') as csvfile:
-        # Le fichier a une colonne 'mot_cle' avec un en-tête
+def lire_mots_cles(fichier_mots_cles=MOTS_CLES_CSV):
+    """Lit la colonne 'mot_cle' (avec en-tête) du fichier CSV des mots-clés."""
+    mots_cles = []
+    with open(fichier_mots_cles, 'r', encoding='utf-8') as csvfile:
         reader = csv.reader(csvfile)
-        # Lire l'en-tête
-        header = next(reader, None)
+        # Ignorer l'en-tête
+        next(reader, None)
         for row in reader:
             if row and len(row) > 0 and row[0].strip():  # Vérifier que la ligne n'est pas vide et contient un mot-clé
                 mots_cles.append(row[0].strip())
-except Exception as e:
-    print(f"⚠️ Erreur lors de la lecture du fichier CSV: {e}")
-    exit(1)
+    return mots_cles
 
-if not mots_cles:
-    print(f"⚠️ Aucun mot-clé trouvé dans {MOTS_CLES_CSV}")
-    exit(1)
-
-print(f"✅ {len(mots_cles)} mots-clés chargés depuis {MOTS_CLES_CSV}")
-print(f"✅ Limitation à {MAX_FICHES_PAR_MOT_CLE} fiches par mot-clé pour accélérer le traitement")
-
-# Charger la progression précédente
-index_debut = charger_progression()
-
-# Vérifier si le fichier de résultats existe déjà
-fichier_existe = os.path.exists(FICHIER_RESULTAT)
-
-# Préparer le fichier CSV unique pour tous les résultats
-with open(FICHIER_RESULTAT, 'a' if fichier_existe else 'w', newline='', encoding='utf-8') as csvfile:
-    csv_writer = csv.writer(csvfile)
+def ouvrir_recherche(navigateur, google_maps_url):
+    """
+    Ouvre la recherche Google Maps (avec tentatives multiples et gestion du consentement)
+    dans le navigateur prêté (pool_navigateurs.PretDiffere). Retourne le driver utilisé :
+    après des erreurs répétées, le pool en a fourni un autre.
+    """
+    tentative = 0
+    success = False
+    driver = navigateur.driver
     
-    # Écrire l'en-tête seulement si le fichier n'existe pas déjà
-    if not fichier_existe:
-        csv_writer.writerow(["Mot-clé", "Nom", "Téléphone", "Site web", "Adresse"])
-    
-    # === Traiter chaque mot-clé ===
-    for index, mot_cle in enumerate(mots_cles[index_debut:], start=index_debut):
-        print(f"\n🔍 Traitement du mot-clé {index+1}/{len(mots_cles)}: {mot_cle}")
-        
-        # Sauvegarder la progression régulièrement
-        if index % 5 == 0:
-            sauvegarder_progression(index)
-        
-        # Faire une pause tous les MOTS_CLES_AVANT_PAUSE mots-clés pour éviter le blocage
-        if index > 0 and index % MOTS_CLES_AVANT_PAUSE == 0:
-            print(f"⏸️ Pause de {DUREE_PAUSE} secondes pour éviter le blocage...")
-            time.sleep(DUREE_PAUSE)
-            
-            # Réinitialiser le driver périodiquement pour éviter les fuites de mémoire
-            print("🔄 Réinitialisation périodique du driver...")
-            driver.quit()
-            driver = initialiser_driver()
-            if driver is None:
-                print("⚠️ Échec de la réinitialisation périodique du driver, tentative de récupération...")
-                time.sleep(10)
-                driver = initialiser_driver()
-                if driver is None:
-                    raise Exception("Impossible de réinitialiser le driver après plusieurs tentatives")
-        
+    while tentative < MAX_TENTATIVES_CONNEXION and not success:
         try:
-            # Utiliser .com avec hl=fr pour stabiliser la langue et les sélecteurs
-            encoded_keyword = urllib.parse.quote(mot_cle)
-            google_maps_url = f"https://www.google.com/maps/search/{encoded_keyword}?hl=fr"
+            # Ouvrir Google Maps avec le mot-clé
+            print(f"📡 Navigation vers: {google_maps_url}")
+            driver.get(google_maps_url)
+            attentes.attendre_resultats(driver, DELAI_CHARGEMENT_PAGE)
+            print(f"📄 Titre de la page : {driver.title}")
+            print(f"🔗 URL actuelle : {driver.current_url}")
             
-            # Tentatives multiples en cas d'erreur de connexion
-            tentative = 0
-            success = False
+            if "consent" in driver.current_url or "consent" in driver.title.lower():
+                print("🍪 Page de consentement détectée, tentative de bypass...")
+                handle_cookie_consent(driver)
             
-            while tentative < MAX_TENTATIVES_CONNEXION and not success:
-                try:
-                    # Ouvrir Google Maps avec le mot-clé
-                    print(f"📡 Navigation vers: {google_maps_url}")
-                    driver.get(google_maps_url)
-                    time.sleep(5)
-                    print(f"📄 Titre de la page : {driver.title}")
-                    print(f"🔗 URL actuelle : {driver.current_url}")
-                    
-                    if "consent" in driver.current_url or "consent" in driver.title.lower():
-                        print("🍪 Page de consentement détectée, tentative de bypass...")
-                        handle_cookie_consent()
-                    
-                    if "google maps" in driver.title.lower() or "maps" in driver.current_url.lower():
-                        success = True
-                    else:
-                        print("⚠️ La page ne semble pas être Google Maps. Tentative de continuation quand même...")
-                        success = True # On tente quand même 
-                except Exception as e:
-                    tentative += 1
-                    print(f"⚠️ Erreur de connexion (tentative {tentative}/{MAX_TENTATIVES_CONNEXION}): {e}")
-                    
-                    if tentative >= MAX_TENTATIVES_CONNEXION:
-                        raise Exception(f"Échec après {MAX_TENTATIVES_CONNEXION} tentatives")
-                    
-                    print(f"⏳ Attente de {DELAI_ENTRE_TENTATIVES} secondes avant nouvelle tentative...")
-                    time.sleep(DELAI_ENTRE_TENTATIVES)
-                    
-                    # Réinitialiser le driver en cas d'erreur persistante
-                    if tentative >= 2:
-                        print("🔄 Réinitialisation du driver...")
-                        driver.quit()
-                        driver = initialiser_driver()
-                        if driver is None:
-                            raise Exception("Impossible de réinitialiser le driver")
+            if "google maps" in driver.title.lower() or "maps" in driver.current_url.lower():
+                success = True
+            else:
+                print("⚠️ La page ne semble pas être Google Maps. Tentative de continuation quand même...")
+                success = True # On tente quand même 
+        except Exception as e:
+            tentative += 1
+            print(f"⚠️ Erreur de connexion (tentative {tentative}/{MAX_TENTATIVES_CONNEXION}): {e}")
+            
+            if tentative >= MAX_TENTATIVES_CONNEXION:
+                raise Exception(f"Échec après {MAX_TENTATIVES_CONNEXION} tentatives")
             
-            # Gérer le consentement des cookies
-            time.sleep(2)
-            handle_cookie_consent()
-            time.sleep(2)
+            print(f"⏳ Attente de {DELAI_ENTRE_TENTATIVES} secondes avant nouvelle tentative...")
+            time.sleep(DELAI_ENTRE_TENTATIVES)
+            
+            # Réinitialiser le driver en cas d'erreur persistante (remplacé par le pool)
+            if tentative >= 2:
+                print("🔄 Réinitialisation du driver...")
+                driver = navigateur.recycler("erreurs de connexion répétées")
+    
+    # Gérer le consentement des cookies (le clic attend lui-même la sortie de la page de consentement)
+    handle_cookie_consent(driver)
 
-            # Vérifier si on est sur la page de résultats ou bloqué
-            if "consent.google" in driver.current_url:
-                print("⚠️ Toujours bloqué sur la page de consentement, tentative forcée...")
-                driver.get(google_maps_url) # Recharger
-                time.sleep(3)
+    # Vérifier si on est sur la page de résultats ou bloqué
+    if "consent.google" in driver.current_url:
+        print("⚠️ Toujours bloqué sur la page de consentement, tentative forcée...")
+        driver.get(google_maps_url) # Recharger
+        attentes.attendre_resultats(driver, DELAI_CHARGEMENT_PAGE)
+    return driver
+
+def collecter_urls(driver, max_fiches):
+    """Fait défiler la liste de résultats et collecte les URLs des fiches."""
+    urls = {}  # dictionnaire utilisé comme ensemble ordonné (ordre d'affichage conservé)
+    max_attempts = 3
+    attempt = 0
+    
+    while attempt < max_attempts:
+        try:
+            # Essayer de trouver la zone scrollable (colonne de gauche)
+            try:
+                scrollable_div = driver.find_element(By.CSS_SELECTOR, "div[role='feed']")
+            except:
+                try:
+                    # Sélecteur de secours pour la zone de recherche
+                    scrollable_div = driver.find_element(By.XPATH, "//div[contains(@aria-label, 'Résultats')]")
+                except:
+                    scrollable_div = None
             
-            # Collecter les URLs des fiches
-            urls = set()
-            max_attempts = 3
-            attempt = 0
+            if not scrollable_div:
+                print("  ⚠️ Zone scrollable non trouvée, utilisation du body")
+                scrollable_div = driver.find_element(By.TAG_NAME, 'body')
             
-            while attempt < max_attempts:
+            # Scroll pour charger plus de résultats
+            previous_count = 0
+            same_count_tries = 0
+            max_scrolls = 10  # Réduit de 20 à 10 scrolls maximum par mot-clé
+            
+            for i in range(max_scrolls):
+                # Scroller dans la page puis attendre l'arrivée de nouvelles fiches
+                nombre_avant = attentes.nombre_fiches(driver)
                 try:
-                    # Essayer de trouver la zone scrollable (colonne de gauche)
-                    try:
-                        scrollable_div = driver.find_element(By.CSS_SELECTOR, "div[role='feed']")
-                    except:
-                        try:
-                            # Sélecteur de secours pour la zone de recherche
-                            scrollable_div = driver.find_element(By.XPATH, "//div[contains(@aria-label, 'Résultats')]")
-                        except:
-                            scrollable_div = None
-                    
-                    if not scrollable_div:
-                        print("  ⚠️ Zone scrollable non trouvée, utilisation du body")
-                        scrollable_div = driver.find_element(By.TAG_NAME, 'body')
-                    
-                    # Scroll pour charger plus de résultats
-                    previous_count = 0
+                    driver.execute_script("arguments[0].scrollTop += 1000", scrollable_div)
+                except:
+                    driver.execute_script("window.scrollBy(0, 1000);")
+                attentes.attendre_nouvelles_fiches(driver, nombre_avant, DELAI_SCROLL)
+                
+                # Collecter les liens vers les fiches (un seul appel au driver)
+                urls.update(dict.fromkeys(extraction_maps.urls_fiches(driver)))
+                
+                if len(urls) >= max_fiches:
+                    break
+                
+                current_count = len(urls)
+                print(f"  🌀 Scroll {i+1} → {current_count} fiches collectées")
+                
+                # Si on a atteint le nombre maximum de fiches, on arrête
+                if current_count >= max_fiches:
+                    print(f"  ✅ Nombre maximum de fiches atteint ({max_fiches}).")
+                    break
+                
+                if current_count == previous_count:
+                    same_count_tries += 1
+                else:
                     same_count_tries = 0
-                    max_scrolls = 10  # Réduit de 20 à 10 scrolls maximum par mot-clé
-                    
-                    for i in range(max_scrolls):
-                        # Scroller dans la page
-                        try:
-                            driver.execute_script("arguments[0].scrollTop += 1000", scrollable_div)
-                        except:
-                            driver.execute_script("window.scrollBy(0, 1000);")
-                        time.sleep(DELAI_SCROLL)
-                        
-                        # Collecter les liens vers les fiches (Vérification de plusieurs sélecteurs)
-                        place_selectors = [
-                            '//a[contains(@href, "/maps/place/")]',
-                            '//a[contains(@aria-label, "")]',
-                            '//div[contains(@class, "Nv2PK")]//a',
-                            '//div[contains(@class, "hfpxzc")]',
-                            '//a[contains(@class, "hfpxzc")]'
-                        ]
-                        
-                        for p_selector in place_selectors:
-                            links = driver.find_elements(By.XPATH, p_selector)
-                            for link in links:
-                                href = link.get_attribute("href")
-                                if href and "/maps/place/" in href:
-                                    urls.add(href)
-                        
-                        if len(urls) >= MAX_FICHES_PAR_MOT_CLE:
-                            break
-                        
-                        current_count = len(urls)
-                        print(f"  🌀 Scroll {i+1} → {current_count} fiches collectées")
-                        
-                        # Si on a atteint le nombre maximum de fiches, on arrête
-                        if current_count >= MAX_FICHES_PAR_MOT_CLE:
-                            print(f"  ✅ Nombre maximum de fiches atteint ({MAX_FICHES_PAR_MOT_CLE}).")
-                            break
-                        
-                        if current_count == previous_count:
-                            same_count_tries += 1
-                        else:
-                            same_count_tries = 0
-                            previous_count = current_count
-                        
-                        if same_count_tries >= 3:  # Réduit de 5 à 3 tentatives sans nouvelles fiches
-                            print("  ✅ Fin du scroll : plus de nouvelles fiches après 3 tentatives.")
-                            break
-                    
-                    # Si on a trouvé des URLs, on peut sortir de la boucle de tentatives
-                    if urls:
-                        break
-                    
-                    attempt += 1
-                    print(f"  ⚠️ Tentative {attempt}/{max_attempts} échouée. Réessai...")
-                    time.sleep(1)  # Réduit de 2 à 1 seconde
-                    
-                except Exception as e:
-                    print(f"  ⚠️ Erreur lors du scroll: {e}")
-                    attempt += 1
-                    time.sleep(1)  # Réduit de 2 à 1 seconde
+                    previous_count = current_count
+                
+                if same_count_tries >= 3:  # Réduit de 5 à 3 tentatives sans nouvelles fiches
+                    print("  ✅ Fin du scroll : plus de nouvelles fiches après 3 tentatives.")
+                    break
             
-            # === Traitement des fiches ===
-            urls = list(urls)[:MAX_FICHES_PAR_MOT_CLE]  # Limiter au nombre maximum de fiches
-            print(f"  ✅ {len(urls)} fiches prêtes à être scrapées pour le mot-clé: {mot_cle}")
+            # Si on a trouvé des URLs, on peut sortir de la boucle de tentatives
+            if urls:
+                break
             
-            if not urls:
-                print(f"  ⚠️ Aucune fiche trouvée pour le mot-clé: {mot_cle}")
-                # SAUVEGARDE IMAGE POUR DEBUG
-                debug_file = os.path.join(DEBUG_DIR, f"debug_{int(time.time())}.png")
-                driver.save_screenshot(debug_file)
-                print(f"  📸 Capture d'écran de débug sauvegardée: {debug_file}")
-                
-                # Écrire une ligne brute pour indiquer l'échec
-                csv_writer.writerow([mot_cle, "ERREUR_AUCUN_RESULTAT", "", "", ""])
-                continue
+            attempt += 1
+            print(f"  ⚠️ Tentative {attempt}/{max_attempts} échouée. Réessai...")
+            time.sleep(1)  # Réduit de 2 à 1 seconde
             
-            # En mode headless, pas besoin de créer un nouvel onglet, on peut directement naviguer
+        except Exception as e:
+            print(f"  ⚠️ Erreur lors du scroll: {e}")
+            attempt += 1
+            time.sleep(1)  # Réduit de 2 à 1 seconde
+    return urls
+
+def fiche_complete(fiche):
+    """Tous les champs sont connus : nom, téléphone, adresse avec code postal, site (ou absence certaine de site)."""
+    return bool(
+        fiche
+        and fiche.get("nom")
+        and fiche.get("tel")
+        and re.search(r"\b\d{5}\b", fiche.get("adresse") or "")
+        and (fiche.get("site") or fiche.get("actions"))
+    )
+
+def extraire_fiche(driver, url):
+    """Ouvre une fiche Google Maps et retourne (nom, téléphone, site, adresse), lus en un seul appel."""
+    driver.get(url)
+    attentes.attendre_fiche(driver, DELAI_TRAITEMENT_FICHE)
+    # Fiche ouverte sans passer par la recherche (voie HTTP) : le consentement peut ne pas être fait
+    if "consent.google" in driver.current_url:
+        handle_cookie_consent(driver)
+        driver.get(url)
+        attentes.attendre_fiche(driver, DELAI_TRAITEMENT_FICHE)
+    
+    fiche = extraction_maps.lire_fiche(driver)
+    return fiche["nom"], fiche["tel"], fiche["site"], fiche["adresse"]
+
+def traiter_mot_cle(navigateur, mot_cle, max_fiches, debug_dir, ecrire_ligne, urls_deja_traitees=None):
+    """
+    Recherche un mot-clé sur Google Maps et écrit une ligne par fiche via ecrire_ligne(ligne, url)
+    (ecrire_ligne(ligne, url, echec=True) pour une fiche en erreur, à refaire lors d'une reprise).
+    Les fiches de urls_deja_traitees (reprise d'un mot-clé interrompu) sont ignorées.
+    navigateur (pool_navigateurs.PretDiffere) n'est loué que si une page doit être chargée :
+    recherche Selenium (voie HTTP sans résultat) ou fiches incomplètes à ouvrir.
+    """
+    # Voie rapide : résultats lus en HTTP simple, sans charger la recherche dans le navigateur.
+    # Sans résultat (ou bloquée), on repasse par Selenium.
+    fiches_http = maps_http.rechercher(mot_cle, max_fiches) if maps_http.MAPS_HTTP_ACTIF else []
+    if fiches_http:
+        print(f"  ⚡ {len(fiches_http)} fiches lues en HTTP, sans navigateur")
+        urls = [fiche["url"] for fiche in fiches_http]
+        fiches_liste = {fiche["url"]: fiche for fiche in fiches_http}
+    else:
+        # Utiliser .com avec hl=fr pour stabiliser la langue et les sélecteurs
+        encoded_keyword = urllib.parse.quote(mot_cle)
+        google_maps_url = f"https://www.google.com/maps/search/{encoded_keyword}?hl=fr"
+        
+        driver = ouvrir_recherche(navigateur, google_maps_url)
+        
+        # Collecter les URLs des fiches
+        urls = collecter_urls(driver, max_fiches)
+        
+        # Informations déjà présentes dans la liste de résultats
+        fiches_liste = extraction_maps.fiches_liste(driver) if EXTRACTION_LISTE else {}
+    
+    # === Traitement des fiches ===
+    urls = list(urls)[:max_fiches]  # Limiter au nombre maximum de fiches
+    print(f"  ✅ {len(urls)} fiches prêtes à être scrapées pour le mot-clé: {mot_cle}")
+    
+    if not urls:
+        print(f"  ⚠️ Aucune fiche trouvée pour le mot-clé: {mot_cle}")
+        # SAUVEGARDE IMAGE POUR DEBUG (seulement si la recherche est passée par le navigateur)
+        if navigateur.loue:
+            os.makedirs(debug_dir, exist_ok=True)
+            debug_file = os.path.join(debug_dir, f"debug_{time.time_ns()}.png")
+            navigateur.driver.save_screenshot(debug_file)
+            print(f"  📸 Capture d'écran de débug sauvegardée: {debug_file}")
+        
+        # Écrire une ligne brute pour indiquer l'échec
+        ecrire_ligne([mot_cle, "ERREUR_AUCUN_RESULTAT", "", "", ""], "")
+        return
+    
+    if urls_deja_traitees:
+        print(f"  ⏩ {len(urls_deja_traitees)} fiche(s) déjà enregistrée(s) avant l'interruption")
+    
+    index = index_lieux.index_partage()
+    
+    def emettre(i, url, nom, tel, site, adresse, source="", indexer=True):
+        print(f"  ✅ {i+1}/{len(urls)} | {nom} | {tel} | {site}{source}")
+        ecrire_ligne([mot_cle, nom, tel, site, adresse], url)
+        if index and indexer:
+            index.enregistrer(index_lieux.identifiant_lieu(url), nom, tel, site, adresse, url)
+    
+    # Fiches déjà scrapées récemment (autre mot-clé ou exécution précédente) ou complètes dès la liste :
+    # aucune page à ouvrir
+    a_ouvrir = []
+    deja_connues = 0
+    for i, url in enumerate(urls):
+        if urls_deja_traitees and url in urls_deja_traitees:
+            continue
+        connue = index.obtenir(index_lieux.identifiant_lieu(url)) if index else None
+        fiche = fiches_liste.get(url)
+        if connue:
+            deja_connues += 1
+            emettre(i, url, *connue, source=" (index)", indexer=False)
+        elif fiche_complete(fiche):
+            emettre(i, url, fiche["nom"], fiche["tel"], extraction_maps.normaliser_site(fiche["site"]),
+                    fiche["adresse"], source=" (liste)")
+        else:
+            a_ouvrir.append((i, url))
+    if deja_connues:
+        print(f"  ♻️ {deja_connues} fiche(s) déjà connue(s) réutilisée(s)")
+    if fiches_liste:
+        print(f"  📋 {len(urls) - len(a_ouvrir) - deja_connues - len(urls_deja_traitees or ())} fiche(s) lue(s) dans la liste, {len(a_ouvrir)} page(s) à ouvrir")
+    if not a_ouvrir:
+        return
+    
+    # Des fiches sont à ouvrir : navigateur loué maintenant si la recherche n'en a pas eu besoin
+    driver = navigateur.driver
+    
+    # En mode headless, pas besoin de créer un nouvel onglet, on peut directement naviguer
+    if not MODE_HEADLESS:
+        # Créer un nouvel onglet pour traiter les fiches
+        driver.execute_script("window.open('about:blank', '_blank');")
+    
+    for i, url in a_ouvrir:
+        try:
             if not MODE_HEADLESS:
-                # Créer un nouvel onglet pour traiter les fiches
-                driver.execute_script("window.open('about:blank', '_blank');")
+                # En mode visible, utiliser le second onglet pour les fiches
+                driver.switch_to.window(driver.window_handles[1])
+            
+            # Extraire les informations de la fiche (les champs vides sont complétés par la liste)
+            nom, tel, site, adresse = extraire_fiche(driver, url)
+            fiche = fiches_liste.get(url) or {}
+            nom = nom or fiche.get("nom", "")
+            tel = tel or fiche.get("tel", "")
+            site = site or extraction_maps.normaliser_site(fiche.get("site", ""))
+            adresse = adresse or fiche.get("adresse", "")
+            
+            emettre(i, url, nom, tel, site, adresse)
+            
+            if not MODE_HEADLESS:
+                # Revenir à l'onglet principal en mode visible
+                driver.switch_to.window(driver.window_handles[0])
             
-            for i, url in enumerate(urls):
-                try:
-                    if MODE_HEADLESS:
-                        # En mode headless, on peut simplement naviguer vers l'URL
-                        driver.get(url)
-                    else:
-                        # En mode visible, utiliser le second onglet pour les fiches
-                        driver.switch_to.window(driver.window_handles[1])
-                        driver.get(url)
-                    
-                    time.sleep(DELAI_TRAITEMENT_FICHE)
-                    
-                    # Extraire les informations de la fiche
-                    nom, tel, site, adresse = "", "", "", ""
-                    
-                    try:
-                        nom_elements = driver.find_elements(By.XPATH, '//h1')
-                        if nom_elements:
-                            nom = nom_elements[0].text
-                    except:
-                        pass
-                    
-                    try:
-                        tel_elements = driver.find_elements(By.XPATH, '//button[contains(@aria-label, "Appeler")]')
-                        if tel_elements:
-                            tel = tel_elements[0].text
-                    except:
-                        pass
-                    
-                    try:
-                        site_elements = driver.find_elements(By.XPATH, '//a[contains(@data-item-id, "authority")]')
-                        if site_elements:
-                            site = site_elements[0].get_attribute("href")
-                            if site:
-                                try:
-                                    parsed = urllib.parse.urlparse(site)
-                                    if parsed.netloc:
-                                        site = f"{parsed.scheme}://{parsed.netloc}/"
-                                except:
-                                    pass
-                    except:
-                        pass
-                    
-                    try:
-                        adresse_elements = driver.find_elements(By.XPATH, '//button[contains(@aria-label, "Copier l\'adresse")]//div[1]')
-                        if adresse_elements:
-                            adresse = adresse_elements[0].text
-                    except:
-                        pass
-                    
-                    print(f"  ✅ {i+1}/{len(urls)} | {nom} | {tel} | {site}")
-                    csv_writer.writerow([mot_cle, nom, tel, site, adresse])
-                    csvfile.flush()  # Forcer l'écriture dans le fichier après chaque ligne
-                    
-                    if not MODE_HEADLESS:
-                        # Revenir à l'onglet principal en mode visible
-                        driver.switch_to.window(driver.window_handles[0])
-                    
-                except Exception as e:
-                    print(f"  ⚠️ Erreur lors du traitement de la fiche {i+1}: {e}")
-                    # Écrire une ligne avec le mot-clé mais des valeurs vides pour les autres colonnes
-                    csv_writer.writerow([mot_cle, "", "", "", ""])
-                    csvfile.flush()  # Forcer l'écriture dans le fichier après chaque ligne
-                    if not MODE_HEADLESS:
-                        try:
-                            # S'assurer qu'on revient à l'onglet principal en cas d'erreur
-                            driver.switch_to.window(driver.window_handles[0])
-                        except:
-                            pass
-        
         except Exception as e:
-            print(f"⚠️ Erreur lors du traitement du mot-clé {mot_cle}: {e}")
+            print(f"  ⚠️ Erreur lors du traitement de la fiche {i+1}: {e}")
             # Écrire une ligne avec le mot-clé mais des valeurs vides pour les autres colonnes
-            csv_writer.writerow([mot_cle, "", "", "", ""])
-            csvfile.flush()  # Forcer l'écriture dans le fichier après chaque ligne
-            
-            # Vérifier si le driver est toujours fonctionnel
-            try:
-                driver.current_url  # Simple test pour voir si le driver répond
-            except:
-                print("⚠️ Le driver semble être en erreur, tentative de réinitialisation...")
+            # (non marquée comme traitée : une reprise refera cette fiche)
+            ecrire_ligne([mot_cle, "", "", "", ""], url, echec=True)
+            if not MODE_HEADLESS:
                 try:
-                    driver.quit()
+                    # S'assurer qu'on revient à l'onglet principal en cas d'erreur
+                    driver.switch_to.window(driver.window_handles[0])
                 except:
                     pass
-                driver = initialiser_driver()
-                if driver is None:
-                    print("⚠️ Échec de la réinitialisation du driver, nouvelle tentative dans 30 secondes...")
-                    time.sleep(30)
-                    driver = initialiser_driver()
-                    if driver is None:
-                        print("❌ Impossible de réinitialiser le driver après plusieurs tentatives")
-                        raise Exception("Échec critique: impossible de réinitialiser le driver")
+
+def executer_navigateur(numero, pool, taches, ecrire_ligne, max_fiches, debug_dir, total, reprise=None):
+    """
+    Worker : des mots-clés pris dans la file partagée jusqu'à épuisement, chacun traité avec un
+    navigateur emprunté au pool seulement s'il en faut un (rendu après le mot-clé, recyclé par le pool si besoin) :
+    les mots-clés servis entièrement par la voie HTTP n'occupent aucun navigateur.
+    Avec reprise (PointsReprise), chaque fiche et chaque mot-clé terminé sans erreur y sont enregistrés
+    (un mot-clé interrompu ou dont une fiche a échoué est refait à la reprise, sans ses fiches déjà écrites).
+    Les lignes d'un mot-clé ne sont transmises à ecrire_ligne qu'une fois le navigateur rendu : une file
+    pleine en aval (pipeline) ne bloque jamais un navigateur dont l'étape GMB peut avoir besoin.
+    Retourne False si aucun driver n'a pu démarrer.
+    """
+    prefixe = f"[navigateur {numero}] " if NB_NAVIGATEURS > 1 else ""
+    
+    traites = 0
+    while True:
+        try:
+            index, mot_cle = taches.get_nowait()
+        except queue.Empty:
+            break
+        
+        navigateur = pool_navigateurs.PretDiffere(pool)
+        print(f"\n🔍 {prefixe}Traitement du mot-clé {index+1}/{total}: {mot_cle}")
+        
+        # Faire une pause tous les MOTS_CLES_AVANT_PAUSE mots-clés pour éviter le blocage
+        if traites > 0 and traites % MOTS_CLES_AVANT_PAUSE == 0:
+            print(f"⏸️ {prefixe}Pause de {DUREE_PAUSE} secondes pour éviter le blocage...")
+            time.sleep(DUREE_PAUSE)
+        
+        fiches_en_echec = []
+        emises = []
+        # Lignes du mot-clé, transmises après avoir rendu le navigateur
+        a_publier = []
         
-        # Sauvegarder la progression après chaque mot-clé
-        sauvegarder_progression(index + 1)
+        def ecrire(ligne, url="", echec=False, index=index, mot_cle=mot_cle, fiches_en_echec=fiches_en_echec,
+                   emises=emises, a_publier=a_publier):
+            # Le journal de reprise fait foi : une fiche déjà enregistrée n'est pas réémise
+            emises.append(url)
+            if echec:
+                fiches_en_echec.append(url)
+            if reprise is None:
+                a_publier.append(ligne)
+            elif echec:
+                if reprise.enregistrer_echec(index, mot_cle, url, ligne):
+                    a_publier.append(ligne)
+            elif reprise.enregistrer_ligne(index, mot_cle, url, ligne):
+                a_publier.append(ligne)
+        
+        try:
+            deja_traitees = reprise.urls_traitees(index) if reprise else None
+            traiter_mot_cle(navigateur, mot_cle, max_fiches, debug_dir, ecrire, deja_traitees)
+        except Exception as e:
+            if isinstance(e, pool_navigateurs.NavigateurIndisponible) and not emises:
+                print(f"❌ {prefixe}{e}.")
+                # Le mot-clé reste à faire pour un autre worker ou une reprise
+                taches.put((index, mot_cle))
+                return traites > 0
+            print(f"⚠️ {prefixe}Erreur lors du traitement du mot-clé {mot_cle}: {e}")
+            # Écrire une ligne avec le mot-clé mais des valeurs vides pour les autres colonnes
+            # (le mot-clé n'est pas marqué terminé : une reprise le refera)
+            ecrire([mot_cle, "", "", "", ""], echec=True)
+        else:
+            # Un mot-clé dont une fiche a échoué reste à reprendre (seules ces fiches seront refaites)
+            if reprise and not fiches_en_echec:
+                reprise.terminer_mot_cle(index, mot_cle)
+        finally:
+            # Un driver qui ne répond plus est remplacé par le pool
+            try:
+                navigateur.rendre()
+            finally:
+                for ligne in a_publier:
+                    ecrire_ligne(ligne)
+        
+        traites += 1
+    return True
 
-print("\n✅ Scraping terminé !")
-driver.quit()
+def parcourir_mots_cles(mots_cles, ecrire_ligne, max_fiches=MAX_FICHES_PAR_MOT_CLE, debug_dir=DEBUG_DIR,
+                        reprise=None, nb_navigateurs=None, pool=None):
+    """
+    Boucle principale : nb_navigateurs workers (NB_NAVIGATEURS par défaut) se partagent les mots-clés,
+    avec les navigateurs de pool (pool partagé du processus) ou d'un pool créé pour cet appel.
+    Chaque fiche est transmise à ecrire_ligne(ligne) (appels sérialisés par un verrou).
+    Avec reprise (PointsReprise), les mots-clés déjà terminés sont sautés et les fiches déjà
+    enregistrées d'un mot-clé interrompu ne sont pas refaites.
+    """
+    termines = reprise.mots_cles_termines(mots_cles) if reprise else set()
+    if termines:
+        print(f"✅ Reprise : {len(termines)} mot(s)-clé(s) déjà terminé(s) sur {len(mots_cles)}")
+    
+    taches = queue.Queue()
+    for index, mot_cle in enumerate(mots_cles):
+        if index not in termines:
+            taches.put((index, mot_cle))
+    if taches.empty():
+        print("\n✅ Scraping terminé !")
+        return True
+    nb_navigateurs = max(1, min(nb_navigateurs or NB_NAVIGATEURS, taches.qsize()))
+    
+    # Sortie partagée : les lignes d'un même appel ne sont jamais entremêlées
+    lock = threading.Lock()
+    
+    def ecrire_ligne_partagee(ligne):
+        with lock:
+            ecrire_ligne(ligne)
+    
+    if nb_navigateurs > 1:
+        print(f"🚀 Pool de {nb_navigateurs} navigateurs")
+    
+    pool_local = pool is None
+    if pool_local:
+        pool = pool_navigateurs.PoolNavigateurs(initialiser_driver, taille=nb_navigateurs)
+    
+    demarres = []
+    erreurs = []
+    
+    def worker(numero):
+        try:
+            demarres.append(executer_navigateur(numero, pool, taches, ecrire_ligne_partagee, max_fiches, debug_dir,
+                                                len(mots_cles), reprise))
+        except Exception as e:
+            erreurs.append(e)
+    
+    threads = [threading.Thread(target=worker, args=(numero + 1,), name=f"navigateur-{numero + 1}", daemon=True)
+               for numero in range(nb_navigateurs)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        if pool_local:
+            pool.fermer()
+    
+    if erreurs:
+        raise erreurs[0]
+    if not any(demarres):
+        print("❌ Impossible d'initialiser le driver. Vérifiez votre installation de Firefox ou Chrome.")
+        print("💡 Si vous êtes sur serveur Ubuntu, assurez-vous de ne PAS utiliser Snap pour Firefox.")
+        return False
+    
+    print("\n✅ Scraping terminé !")
+    print(f"⏱️ Temps d'attente : {attentes.STATS.resume()}")
+    print(f"⏱️ Démarrage des navigateurs : {navigateur.STATS_DEMARRAGE.resume()}")
+    print(f"🧠 Mémoire des navigateurs : {pool.surveillance.resume()}")
+    return True
 
-# Conserver le fichier de progression pour référence
-if os.path.exists(FICHIER_PROGRESSION):
-    # Renommer le fichier avec un timestamp au lieu de le supprimer
-    import time
+def scraper(mots_cles, fichier_resultat=FICHIER_RESULTAT, fichier_progression=FICHIER_PROGRESSION,
+            max_fiches=MAX_FICHES_PAR_MOT_CLE, debug_dir=DEBUG_DIR, nb_navigateurs=None):
+    """
+    Scrape tous les mots-clés et écrit les fiches dans fichier_resultat.
+    Chaque fiche est d'abord enregistrée dans le journal de reprise fichier_progression (SQLite) :
+    si une exécution précédente a été interrompue, elle reprend exactement où elle s'était arrêtée
+    et fichier_resultat est régénéré sans doublon à partir du journal.
+    """
+    if os.path.dirname(fichier_resultat):
+        os.makedirs(os.path.dirname(fichier_resultat), exist_ok=True)
+    
+    print(f"✅ Limitation à {max_fiches} fiches par mot-clé pour accélérer le traitement")
+    
+    nouveau_journal = not os.path.exists(fichier_progression)
+    reprise = points_reprise.PointsReprise(fichier_progression)
+    if nouveau_journal:
+        # Les résultats des exécutions précédentes sont conservés en tête du fichier
+        importees = reprise.importer_csv(fichier_resultat)
+        if importees:
+            print(f"✅ {importees} ligne(s) existante(s) conservée(s) dans {fichier_resultat}")
+    try:
+        ok = parcourir_mots_cles(mots_cles, lambda ligne: None, max_fiches, debug_dir, reprise, nb_navigateurs)
+    finally:
+        # Même après une erreur, le CSV reflète tout ce qui a été enregistré (la reprise le complétera)
+        reprise.exporter_csv(fichier_resultat, COLONNES_RESULTAT)
+        reprise.fermer()
+    if not ok:
+        return False
+    
+    # Conserver le journal de reprise pour référence
     timestamp = int(time.time())
-    os.rename(FICHIER_PROGRESSION, f"{FICHIER_PROGRESSION}.{timestamp}.completed")
-    print(f"✅ Fichier de progression sauvegardé comme {FICHIER_PROGRESSION}.{timestamp}.completed")
+    for suffixe in ["", "-wal", "-shm"]:
+        if os.path.exists(f"{fichier_progression}{suffixe}"):
+            os.rename(f"{fichier_progression}{suffixe}", f"{fichier_progression}.{timestamp}.completed{suffixe}")
+    print(f"✅ Journal de reprise sauvegardé comme {fichier_progression}.{timestamp}.completed")
+    return True
 
-# Supprimer le fichier de secours s'il existe
-if os.path.exists(f"{FICHIER_PROGRESSION}.backup"):
-    os.remove(f"{FICHIER_PROGRESSION}.backup")
+def lancer_enrichissement(fichier_resultat=FICHIER_RESULTAT, fichier_enrichi=None):
+    """Enrichit le fichier de résultats dans le même processus (plus de sous-processus enrichisseur.py)."""
+    print("\n🔄 Lancement automatique de l'enrichissement des données...")
+    
+    try:
+        import enrichisseur
+        if fichier_enrichi:
+            ok = enrichisseur.enrichir_fichier(fichier_resultat, fichier_enrichi)
+        else:
+            ok = enrichisseur.enrichir_fichier(fichier_resultat)
+        if ok:
+            print("\n✅ Processus complet terminé ! Les données ont été scrapées et enrichies.")
+        return ok
+    except Exception as e:
+        print(f"⚠️ Erreur lors du lancement de l'enrichissement: {e}")
+        print("Vous pouvez lancer manuellement l'enrichissement avec la commande: python enrichisseur.py")
+        return False
 
-# === Lancer l'enrichissement automatiquement ===
-print("\n🔄 Lancement automatique de l'enrichissement des données...")
+def main():
+    parser = argparse.ArgumentParser(description="Scraper Google Maps (Firefox, Chrome en secours)")
+    parser.add_argument("max_fiches", nargs="?", type=int, default=MAX_FICHES_PAR_MOT_CLE,
+                        help="Nombre maximum de fiches par mot-clé")
+    parser.add_argument("--mots-cles", default=MOTS_CLES_CSV, help="Fichier CSV des mots-clés")
+    parser.add_argument("--sortie", default=FICHIER_RESULTAT, help="Fichier CSV des résultats bruts")
+    parser.add_argument("--progression", default=None, help="Fichier de progression (reprise)")
+    parser.add_argument("--enrichi", default=None, help="Fichier CSV enrichi produit par enrichisseur.py")
+    parser.add_argument("--navigateurs", type=int, default=NB_NAVIGATEURS, help="Nombre de navigateurs en parallèle")
+    args = parser.parse_args()
+    
+    if args.max_fiches != MAX_FICHES_PAR_MOT_CLE:
+        print(f"📊 Limite fixée par argument : {args.max_fiches} fiches")
+    
+    # Dossier de travail des fichiers annexes (progression, captures de débug)
+    dossier_sortie = os.path.dirname(os.path.abspath(args.sortie))
+    fichier_progression = args.progression or os.path.join(dossier_sortie, "progression.sqlite")
+    debug_dir = os.path.join(dossier_sortie, "debug")
+    
+    # === Lire les mots-clés depuis le fichier CSV ===
+    try:
+        mots_cles = lire_mots_cles(args.mots_cles)
+    except Exception as e:
+        print(f"⚠️ Erreur lors de la lecture du fichier CSV: {e}")
+        sys.exit(1)
+    
+    if not mots_cles:
+        print(f"⚠️ Aucun mot-clé trouvé dans {args.mots_cles}")
+        sys.exit(1)
+    
+    print(f"✅ {len(mots_cles)} mots-clés chargés depuis {args.mots_cles}")
+    
+    if not scraper(mots_cles, args.sortie, fichier_progression, args.max_fiches, debug_dir, args.navigateurs):
+        sys.exit(1)
+    
+    # === Lancer l'enrichissement automatiquement ===
+    if not lancer_enrichissement(args.sortie, args.enrichi):
+        sys.exit(1)
 
-try:
-    # Vérifier que le script d'enrichissement existe
-    if not os.path.exists(ENRICHISSEUR_SCRIPT):
-        print(f"⚠️ Script d'enrichissement {ENRICHISSEUR_SCRIPT} non trouvé.")
-        exit(1)
-    
-    # Lancer le script d'enrichissement avec le même interpréteur Python
-    print(f"🚀 Exécution de {ENRICHISSEUR_SCRIPT}...")
-    subprocess.run([sys.executable, ENRICHISSEUR_SCRIPT])
-    
-    print("\n✅ Processus complet terminé ! Les données ont été scrapées et enrichies.")
-except Exception as e:
-    print(f"⚠️ Erreur lors du lancement de l'enrichissement: {e}")
-    print("Vous pouvez lancer manuellement l'enrichissement avec la commande: python enrichisseur.py")
+if __name__ == "__main__":
+    main()
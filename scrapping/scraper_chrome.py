@@ -4,15 +4,15 @@ import urllib.parse
 import subprocess
 import sys
 import os.path
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from datetime import datetime
 import os
 
+import navigateur
+
 # === CONFIGURATION ===
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MOTS_CLES_CSV = os.path.join(BASE_DIR, "mots_cles.csv")
@@ -99,12 +99,13 @@ user_agents = [
 import random
 options.add_argument(f"--user-agent={random.choice(user_agents)}")
 
+# Blocage des ressources lourdes (polices, tuiles de carte, mesure d'audience...)
+navigateur.options_chrome(options)
+
 # Fonction pour initialiser le driver avec de nouvelles options
 def initialiser_driver():
     try:
-        from webdriver_manager.chrome import ChromeDriverManager
-        service = ChromeService(ChromeDriverManager().install())
-        return webdriver.Chrome(service=service, options=options)
+        return navigateur.demarrer_chrome(options)
     except Exception as e:
         print(f"❌ Erreur critique d'initialisation du driver Chrome: {e}")
         return None
@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+import argparse
+import urllib.parse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import attentes
+import scraper
+
+# Benchmark du blocage des ressources (navigateur.py) : temps de chargement et volume
+# téléchargé d'une recherche Google Maps, sans blocage puis avec le profil choisi.
+
+MOTS_CLES = ["boulangerie 75011", "plombier 69003", "coiffeur 33000"]
+
+# Script exécuté après chargement : volume transféré (navigation + ressources) et durée
+SCRIPT_MESURE = """
+var total = 0, nombre = 0;
+performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource')).forEach(function (e) {
+    total += e.transferSize || 0;
+    nombre += 1;
+});
+return {octets: total, requetes: nombre};
+"""
+
+def mesurer(profil, mots_cles, repetitions):
+    os.environ["PLOUF_BLOCAGE"] = profil
+    driver = scraper.initialiser_driver()
+    if driver is None:
+        print("❌ Impossible d'initialiser le driver")
+        sys.exit(1)
+    mesures = []
+    try:
+        # Tampon de mesures assez grand pour une page Maps (250 entrées par défaut)
+        if hasattr(driver, "execute_cdp_cmd"):
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument",
+                                   {"source": "performance.setResourceTimingBufferSize(10000);"})
+        for _ in range(repetitions):
+            for mot_cle in mots_cles:
+                url = f"https://www.google.com/maps/search/{urllib.parse.quote(mot_cle)}?hl=fr"
+                debut = time.monotonic()
+                driver.get(url)
+                scraper.handle_cookie_consent(driver)
+                attentes.attendre_resultats(driver, 30)
+                duree = time.monotonic() - debut
+                # Laisser finir les chargements en arrière-plan (tuiles, polices) avant de compter
+                time.sleep(3)
+                resultat = driver.execute_script(SCRIPT_MESURE)
+                mesures.append((duree, resultat["octets"], resultat["requetes"]))
+                print(f"  {profil or 'aucun':<40} {mot_cle:<25} {duree:6.2f}s {resultat['octets'] / 1024:9.0f} Ko "
+                      f"{resultat['requetes']:5d} requêtes")
+    finally:
+        driver.quit()
+    return mesures
+
+def moyenne(valeurs):
+    return sum(valeurs) / len(valeurs) if valeurs else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du blocage des ressources des navigateurs")
+    parser.add_argument("--profil", default=",".join(scraper.navigateur.CATEGORIES),
+                        help="Catégories bloquées (image,font,media,tuiles,analytics)")
+    parser.add_argument("--repetitions", type=int, default=2)
+    parser.add_argument("mots_cles", nargs="*", default=MOTS_CLES)
+    args = parser.parse_args()
+
+    print("⏱️ Sans blocage")
+    avant = mesurer("aucun", args.mots_cles, args.repetitions)
+    print(f"⏱️ Avec blocage : {args.profil}")
+    apres = mesurer(args.profil, args.mots_cles, args.repetitions)
+
+    print("\n" + "=" * 60)
+    for nom, mesures in [("Sans blocage", avant), ("Avec blocage", apres)]:
+        print(f"{nom:<15} chargement moyen : {moyenne([m[0] for m in mesures]):6.2f}s | "
+              f"volume moyen : {moyenne([m[1] for m in mesures]) / 1024:8.0f} Ko | "
+              f"requêtes : {moyenne([m[2] for m in mesures]):6.0f}")
+    print("Note : transferSize vaut 0 pour les réponses en cache et les ressources d'autres domaines "
+          "sans Timing-Allow-Origin ; les volumes sont donc des minimums.")
+
+if __name__ == "__main__":
+    main()
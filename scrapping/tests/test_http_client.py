@@ -0,0 +1,46 @@
+import os
+import sys
+import threading
+import time
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_client
+
+# Test hors ligne du client HTTP partagé (http_client.py), via un serveur HTTP local.
+
+class ServeurLimite(BaseHTTPRequestHandler):
+    """Répond toujours 429 avec un Retry-After, et compte les requêtes reçues."""
+
+    requetes = 0
+
+    def do_GET(self):
+        type(self).requetes += 1
+        self.send_response(429)
+        self.send_header("Retry-After", "2")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+def test_429_non_rejoue():
+    serveur = HTTPServer(("127.0.0.1", 0), ServeurLimite)
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    ServeurLimite.requetes = 0
+    try:
+        debut = time.monotonic()
+        reponse = http_client.get(f"http://127.0.0.1:{serveur.server_port}/limite")
+        duree = time.monotonic() - debut
+        # Le 429 revient tel quel au limiteur : une seule requête, sans attendre le Retry-After
+        assert reponse.status_code == 429
+        assert ServeurLimite.requetes == 1
+        assert duree < 1
+    finally:
+        serveur.shutdown()
+        http_client.fermer()
+    print("✅ 429 avec Retry-After : transmis sans nouvelle tentative")
+
+if __name__ == "__main__":
+    test_429_non_rejoue()
@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import limiteur
+
+# Test hors ligne des 429 du limiteur (limiteur.py) : nouvelles tentatives auprès du même fournisseur,
+# plafond d'attente et disjoncteur, avec des réponses simulées (aucun accès réseau).
+
+class Reponse:
+    def __init__(self, status_code, retry_after=None):
+        self.status_code = status_code
+        self.headers = {"Retry-After": retry_after} if retry_after is not None else {}
+
+def requete_simulee(*statuts, retry_after="0"):
+    """requete() qui renvoie les statuts dans l'ordre (le dernier ensuite) ; appels comptés dans .appels."""
+    def requete():
+        code = statuts[min(requete.appels, len(statuts) - 1)]
+        requete.appels += 1
+        return Reponse(code, retry_after if code == 429 else None)
+    requete.appels = 0
+    return requete
+
+def test_429_puis_succes():
+    fournisseur = limiteur.Fournisseur("Test", debit=100, reessais_429=3)
+    requete = requete_simulee(429, 429, 200)
+    assert fournisseur.executer(requete).status_code == 200
+    assert requete.appels == 3
+    # Débit réduit par les 429
+    assert fournisseur.limiteur.debit < 100
+    print("✅ 429 puis succès : même fournisseur, débit réduit")
+
+def test_429_persistants():
+    fournisseur = limiteur.Fournisseur("Test", debit=100, reessais_429=2)
+    requete = requete_simulee(429)
+    try:
+        fournisseur.executer(requete)
+        assert False, "TropDeRequetes attendue"
+    except limiteur.TropDeRequetes:
+        pass
+    # La requête initiale + reessais_429 nouvelles tentatives
+    assert requete.appels == 3
+    print("✅ 429 persistants : TropDeRequetes après reessais_429 tentatives")
+
+def test_retry_after_trop_long():
+    fournisseur = limiteur.Fournisseur("Test", debit=100, reessais_429=3)
+    requete = requete_simulee(429, 200, retry_after=str(limiteur.ATTENTE_MAX_429 + 1))
+    debut = time.monotonic()
+    try:
+        fournisseur.executer(requete)
+        assert False, "TropDeRequetes attendue"
+    except limiteur.TropDeRequetes as e:
+        assert e.retry_after == limiteur.ATTENTE_MAX_429 + 1
+    # Abandon immédiat, sans attendre le Retry-After
+    assert requete.appels == 1
+    assert time.monotonic() - debut < 1
+    print("✅ Retry-After au-delà du plafond : TropDeRequetes sans attendre")
+
+def test_429_hors_disjoncteur():
+    fournisseur = limiteur.Fournisseur("Test", debit=100, seuil_echecs=2, reessais_429=0)
+    for _ in range(5):
+        try:
+            fournisseur.executer(requete_simulee(429))
+        except limiteur.TropDeRequetes:
+            pass
+    assert fournisseur.disjoncteur.echecs == 0
+    assert fournisseur.disjoncteur.etat == limiteur.Disjoncteur.FERME
+    # Disjoncteur demi-ouvert : une requête d'essai terminée par un 429 n'en bloque pas une autre
+    fournisseur.disjoncteur.duree_ouverture = 0
+    for _ in range(2):
+        try:
+            fournisseur.executer(requete_simulee(503))
+        except limiteur.ErreurFournisseur:
+            pass
+    assert fournisseur.disjoncteur.etat == limiteur.Disjoncteur.OUVERT
+    try:
+        fournisseur.executer(requete_simulee(429))
+    except limiteur.TropDeRequetes:
+        pass
+    assert fournisseur.executer(requete_simulee(200)).status_code == 200
+    assert fournisseur.disjoncteur.etat == limiteur.Disjoncteur.FERME
+    print("✅ 429 : jamais comptés comme échecs du disjoncteur")
+
+if __name__ == "__main__":
+    test_429_puis_succes()
+    test_429_persistants()
+    test_retry_after_trop_long()
+    test_429_hors_disjoncteur()
@@ -0,0 +1,113 @@
+import os
+import sys
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import index_lieux
+import limiteur
+import maps_http
+
+# Test hors ligne de la voie rapide HTTP Google Maps (maps_http.py) sur des pages enregistrées
+# dans tests/fixtures, servies par un serveur HTTP local.
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def lire_fixture(nom):
+    with open(os.path.join(FIXTURES, nom), 'r', encoding='utf-8') as f:
+        return f.read()
+
+class ServeurFixtures(BaseHTTPRequestHandler):
+    """/fixture/<nom> sert un fichier, /bloque redirige vers /sorry/, /limite répond 429."""
+
+    def do_GET(self):
+        if self.path.startswith("/bloque"):
+            self.send_response(302)
+            self.send_header("Location", "/sorry/index?continue=maps")
+            self.end_headers()
+            return
+        if self.path.startswith("/limite"):
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+        if self.path.startswith("/sorry/"):
+            nom = "maps_sorry.html"
+        else:
+            nom = self.path.split("/fixture/", 1)[-1].split("?", 1)[0]
+        contenu = lire_fixture(nom).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(contenu)))
+        self.end_headers()
+        self.wfile.write(contenu)
+
+    def log_message(self, *args):
+        pass
+
+def demarrer_serveur():
+    serveur = HTTPServer(("127.0.0.1", 0), ServeurFixtures)
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    return serveur, f"http://127.0.0.1:{serveur.server_port}"
+
+def rechercher_local(base, chemin, max_fiches=20):
+    """maps_http.rechercher() sur le serveur local, avec un fournisseur neuf (disjoncteur fermé)."""
+    maps_http.URL_RECHERCHE = base + chemin + "?q={requete}"
+    maps_http.FOURNISSEUR = limiteur.Fournisseur("Google Maps HTTP (test)", debit=100, seuil_echecs=3, reessais_429=0)
+    return maps_http.rechercher("boulangerie 75011", max_fiches)
+
+def test_page_recherche():
+    fiches = maps_http.extraire_fiches(lire_fixture("maps_recherche.html"))
+    assert [f["nom"] for f in fiches] == [
+        "Boulangerie Alexine", "Maison Landemaine Oberkampf", "Du Pain et des Idées", "Boulangerie Utopie"
+    ]
+    premiere = fiches[0]
+    assert premiere["tel"] == "01 43 57 12 34"
+    assert premiere["site"] == "https://www.boulangerie-alexine.fr/"
+    assert premiere["adresse"] == "40 Rue de la Roquette, 75011 Paris"
+    # L'URL produite donne le même identifiant de lieu que les liens de la liste Selenium
+    assert index_lieux.identifiant_lieu(premiere["url"]) == "0x47e66dfb5b9d9f0b:0x1c4a2a3e0b2d8f11"
+    # Champs absents : chaîne vide, jamais d'exception
+    assert fiches[2]["site"] == ""
+    assert fiches[3]["tel"] == ""
+    print(f"✅ Page de recherche : {len(fiches)} fiches")
+
+def test_reponse_json():
+    fiches = maps_http.extraire_fiches(lire_fixture("maps_recherche_tbm.txt"))
+    assert [f["nom"] for f in fiches] == ["Maison Landemaine Oberkampf", "Du Pain et des Idées"]
+    print(f"✅ Réponse JSON brute : {len(fiches)} fiches")
+
+def test_sans_resultat():
+    assert maps_http.extraire_fiches(lire_fixture("maps_recherche_vide.html")) == []
+    assert maps_http.extraire_fiches(lire_fixture("maps_sorry.html")) == []
+    assert maps_http.extraire_fiches("") == []
+    print("✅ Pages sans résultat : aucune fiche")
+
+def test_rechercher():
+    serveur, base = demarrer_serveur()
+    # rechercher_local remplace l'URL et le fournisseur du module : restaurés à la fin
+    originaux = maps_http.URL_RECHERCHE, maps_http.FOURNISSEUR
+    try:
+        fiches = rechercher_local(base, "/fixture/maps_recherche.html", max_fiches=3)
+        assert len(fiches) == 3
+        assert rechercher_local(base, "/fixture/maps_recherche_vide.html") == []
+        # Blocages : liste vide (le scraper passe alors par Selenium)
+        assert rechercher_local(base, "/bloque") == []
+        assert rechercher_local(base, "/limite") == []
+        # Après 3 blocages consécutifs, la voie rapide est désactivée sans requête
+        for _ in range(3):
+            maps_http.rechercher("boulangerie 75011")
+        maps_http.URL_RECHERCHE = base + "/fixture/maps_recherche.html?q={requete}"
+        assert not maps_http.FOURNISSEUR.disjoncteur.autoriser()
+        assert maps_http.rechercher("boulangerie 75011") == []
+    finally:
+        maps_http.URL_RECHERCHE, maps_http.FOURNISSEUR = originaux
+        serveur.shutdown()
+    print("✅ Recherche HTTP : résultats, blocages et disjoncteur")
+
+if __name__ == "__main__":
+    test_page_recherche()
+    test_reponse_json()
+    test_sans_resultat()
+    test_rechercher()
@@ -0,0 +1,42 @@
+import os
+import shutil
+import uuid
+
+# === CONFIGURATION ===
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKSPACES_DIR = os.path.join(BASE_DIR, "workspaces")
+
+class Workspace:
+    """
+    Dossier de travail isolé pour une exécution du pipeline.
+    Chaque étape (scraper, enrichisseur, dirigeants, GMB, whois, consolidation) lit et écrit
+    ses fichiers ici, ce qui permet de lancer plusieurs pipelines en parallèle.
+    """
+
+    def __init__(self, identifiant=None, racine=WORKSPACES_DIR):
+        self.identifiant = identifiant or uuid.uuid4().hex
+        self.dossier = os.path.join(racine, self.identifiant)
+
+        self.mots_cles = os.path.join(self.dossier, "mots_cles.csv")
+        self.fichier_raw = os.path.join(self.dossier, "resultats_complets.csv")
+        self.fichier_progression = os.path.join(self.dossier, "progression.sqlite")
+        self.debug_dir = os.path.join(self.dossier, "debug")
+        self.fichier_enrichi = os.path.join(self.dossier, "resultats_enrichis_complets.csv")
+        self.fichier_dirigeants = os.path.join(self.dossier, "resultats_dirigeants.csv")
+        self.fichier_gmb = os.path.join(self.dossier, "resultats_dirigeants_enrichis_gmb.csv")
+        self.fichier_whois = os.path.join(self.dossier, "resultats_finaux_complets.csv")
+        self.fichier_consolide = os.path.join(self.dossier, "base_prospects.csv")
+
+    def creer(self):
+        os.makedirs(self.dossier, exist_ok=True)
+        return self
+
+    def fichiers_intermediaires(self):
+        """Fichiers produits par les étapes, du plus enrichi au moins enrichi."""
+        return [self.fichier_whois, self.fichier_gmb, self.fichier_dirigeants, self.fichier_enrichi, self.fichier_raw]
+
+    def supprimer(self):
+        shutil.rmtree(self.dossier, ignore_errors=True)
+
+    def __repr__(self):
+        return f"Workspace({self.dossier!r})"